@@ -0,0 +1,279 @@
+"""
+Mesures de performance des chemins critiques
+
+Usage :
+    python -m benchmarks.bench --sortie resultats.json
+    python -m benchmarks.bench --sortie resultats.json --reference reference.json --seuil 0.2
+
+Chaque mesure est un débit (opérations par seconde, plus c'est haut mieux
+c'est), le meilleur de plusieurs répétitions. Les mesures de l'interface
+utilisent une fenêtre Tk cachée ; sans tkinter ou sans affichage
+disponible, seules celles qui n'en ont pas besoin sont faites.
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+
+from core.characters import NOMS_CLASSES
+from core.game import Game, ACTIONS
+from core.ia import IA, NIVEAUX
+
+REPETITIONS = 15
+TAILLES_HISTORIQUE = (10, 1000, 10000)
+
+
+def _meilleur_debit(fonction, operations, repetitions=REPETITIONS):
+    """
+    Débit de la meilleure répétition
+    Args:
+        fonction (callable): Fonction sans argument qui fait `operations` opérations
+        operations (int): Nombre d'opérations par appel
+    Returns:
+        float: Opérations par seconde
+    """
+    meilleur = float('inf')
+    gc_actif = gc.isenabled()
+    gc.disable()  # Comme timeit : le ramasse-miettes ajoute du bruit
+    try:
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            fonction()
+            meilleur = min(meilleur, time.perf_counter() - debut)
+    finally:
+        if gc_actif:
+            gc.enable()
+    return operations / meilleur
+
+
+def bench_tours(nb_tours=5000, seed=0):
+    """Tours joués par seconde avec Game.executer_action, pour chaque paire de classes"""
+    resultats = {}
+    rng = random.Random(seed)
+    actions = [rng.choice(ACTIONS) for _ in range(nb_tours)]
+    for classe1 in NOMS_CLASSES:
+        for classe2 in NOMS_CLASSES:
+            game = Game()
+            game.creer_personnage(classe1, 'A', 1)
+            game.creer_personnage(classe2, 'B', 2)
+
+            def jouer():
+                game.demarrer_combat()
+                executer = game.executer_action
+                for action in actions:
+                    if game.gagnant is not None:
+                        game.demarrer_combat()
+                    executer(action)
+
+            resultats[f"tours/{classe1}-{classe2}"] = _meilleur_debit(jouer, nb_tours)
+    return resultats
+
+
+def bench_etat_combat(appels=5000):
+    """Appels par seconde de get_etat_combat, lecture du dernier message comprise"""
+    resultats = {}
+    for taille in TAILLES_HISTORIQUE:
+        game = Game()
+        game.creer_personnage('guerrier', 'A', 1)
+        game.creer_personnage('guerrier', 'B', 2)
+        game.demarrer_combat()
+        while len(game.historique) < taille:
+            game.executer_action('defendre')  # Ne termine jamais le combat
+
+        def consulter():
+            for _ in range(appels):
+                etat = game.get_etat_combat()
+                etat['historique'][-1]
+
+        resultats[f"etat_combat/historique_{taille}"] = _meilleur_debit(consulter, appels)
+    return resultats
+
+
+def _positions(nombre, seed=0):
+    """Parties en cours à des positions variées, tirées de parties aléatoires"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < nombre:
+        game = Game(journalisation=False)
+        game.creer_personnage(rng.choice(NOMS_CLASSES), 'A', 1)
+        game.creer_personnage(rng.choice(NOMS_CLASSES), 'B', 2)
+        game.demarrer_combat()
+        for _ in range(rng.randrange(12)):
+            game.executer_action(rng.choice(ACTIONS))
+            if game.gagnant is not None:
+                break
+        else:
+            positions.append(game)
+    return positions
+
+
+def bench_ia(nb_positions=40):
+    """Décisions par seconde de IA.choisir_action pour chaque niveau, table vidée à chaque coup"""
+    positions = _positions(nb_positions)
+    resultats = {}
+    for niveau in NIVEAUX:
+        ia = IA(niveau)
+
+        def decider():
+            for game in positions:
+                ia.table.clear()  # Latence d'une décision sans réponse préparée
+                ia.choisir_action(game)
+
+        resultats[f"ia/{niveau}"] = _meilleur_debit(decider, nb_positions, 5)
+    return resultats
+
+
+def _combat_log():
+    """Classe CombatLog, None sans tkinter (serveur d'intégration continue...)"""
+    try:
+        from ui.combat_log import CombatLog
+    except ImportError:
+        return None
+    return CombatLog
+
+
+def _messages(nombre, seed=0):
+    """Messages réalistes tirés de parties aléatoires"""
+    rng = random.Random(seed)
+    game = Game()
+    messages = []
+    while len(messages) < nombre:
+        game.creer_personnage(rng.choice(NOMS_CLASSES), 'Joueur 1', 1)
+        game.creer_personnage(rng.choice(NOMS_CLASSES), 'Joueur 2', 2)
+        game.demarrer_combat()
+        while game.gagnant is None:
+            game.executer_action(rng.choice(ACTIONS))
+        messages.extend(game.historique)
+    return messages[:nombre]
+
+
+def bench_detection_tags(nb_messages=5000):
+    """Messages classés par seconde par CombatLog._detect_tags"""
+    CombatLog = _combat_log()
+    if CombatLog is None:
+        return {}
+    messages = _messages(nb_messages)
+    detecter = CombatLog._detect_tags  # N'utilise pas le widget
+
+    def classer():
+        for message in messages:
+            detecter(None, message)
+
+    return {"combat_log/detect_tags": _meilleur_debit(classer, nb_messages)}
+
+
+def bench_combat_log(nb_messages=5000):
+    """Messages affichés par seconde par CombatLog, dans une fenêtre cachée"""
+    CombatLog = _combat_log()
+    if CombatLog is None:
+        return {}
+    import tkinter as tk
+    try:
+        racine = tk.Tk()
+    except tk.TclError:
+        return {}
+    racine.withdraw()
+    try:
+        journal = CombatLog(racine)
+        messages = _messages(nb_messages)
+        entrees = [(message, journal._detect_tags(message)) for message in messages]
+
+        def un_par_un():
+            journal.clear()
+            for message in messages:
+                journal.add_message(message)
+
+        def par_lot():
+            journal.clear()
+            for i in range(0, nb_messages, 50):
+                journal.add_messages(entrees[i:i + 50])
+
+        return {
+            "combat_log/add_message": _meilleur_debit(un_par_un, nb_messages, 3),
+            "combat_log/add_messages_lot_50": _meilleur_debit(par_lot, nb_messages, 3),
+        }
+    finally:
+        racine.destroy()
+
+
+BENCHMARKS = (bench_tours, bench_etat_combat, bench_ia, bench_detection_tags, bench_combat_log)
+
+
+def executer(benchmarks=BENCHMARKS):
+    """
+    Lance les mesures
+    Returns:
+        dict: {'meta': {...}, 'resultats': {nom: opérations par seconde}}
+    """
+    resultats = {}
+    for bench in benchmarks:
+        resultats.update(bench())
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'plateforme': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'resultats': resultats,
+    }
+
+
+def comparer(resultats, reference, seuil=0.2):
+    """
+    Compare des mesures à une référence
+    Args:
+        resultats (dict): Débits mesurés
+        reference (dict): Débits de référence
+        seuil (float): Baisse relative tolérée avant de signaler une régression
+    Returns:
+        tuple: (lignes du rapport, liste des mesures en régression)
+    """
+    lignes, regressions = [], []
+    for nom in sorted(reference):
+        if nom not in resultats:
+            lignes.append(f"{nom:40} absent")
+            continue
+        rapport = resultats[nom] / reference[nom]
+        statut = 'ok'
+        if rapport < 1 - seuil:
+            statut = 'RÉGRESSION'
+            regressions.append(nom)
+        elif rapport > 1 + seuil:
+            statut = 'amélioration'
+        lignes.append(f"{nom:40} {reference[nom]:>14,.0f} -> {resultats[nom]:>14,.0f} /s  {rapport:6.2f}x  {statut}")
+    for nom in sorted(set(resultats) - set(reference)):
+        lignes.append(f"{nom:40} {resultats[nom]:>14,.0f} /s  nouveau")
+    return lignes, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesures de performance de Duel Heroes")
+    parser.add_argument('--sortie', help="Fichier JSON où écrire les résultats")
+    parser.add_argument('--reference', help="Résultats JSON de référence à comparer")
+    parser.add_argument('--seuil', type=float, default=0.2, help="Baisse tolérée (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    mesures = executer()
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(mesures, f, indent=2, ensure_ascii=False)
+
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            reference = json.load(f)['resultats']
+        lignes, regressions = comparer(mesures['resultats'], reference, args.seuil)
+        print("\n".join(lignes))
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de {args.seuil:.0%}", file=sys.stderr)
+            return 1
+    else:
+        for nom, debit in mesures['resultats'].items():
+            print(f"{nom:40} {debit:>14,.0f} /s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Contrôle du temps de démarrage des outils sans interface
+
+Lance quelques commandes de main.py avec `python -X importtime` et vérifie
+que le temps total d'import reste sous un budget et que tkinter et NumPy ne
+sont jamais chargés.
+
+    python -m benchmarks.demarrage --budget-ms 60
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES_INTERDITS = ('tkinter', '_tkinter', 'numpy')
+COMMANDES = (
+    ('rejouer', '--help'),
+    ('tournoi', 'guerrier:agressif', 'mage:agressif', '--parties', '1'),
+)
+
+
+def mesurer(commande, repetitions=3):
+    """
+    Temps d'import d'une commande de main.py
+    Args:
+        commande (tuple): Arguments passés à main.py
+        repetitions (int): Nombre de lancements, le plus rapide est retenu
+    Returns:
+        tuple: (temps total d'import en ms, ensemble des modules importés)
+    """
+    meilleur, modules = float('inf'), set()
+    for _ in range(repetitions):
+        sortie = subprocess.run(
+            [sys.executable, '-X', 'importtime', os.path.join(RACINE, 'main.py'), *commande],
+            capture_output=True, text=True, cwd=RACINE,
+        )
+        total, modules = 0, set()
+        for ligne in sortie.stderr.splitlines():
+            if not ligne.startswith('import time:') or 'cumulative' in ligne:
+                continue
+            _, cumul, nom = ligne[len('import time:'):].split('|')
+            modules.add(nom.strip())
+            if not nom.startswith('  '):  # Import de premier niveau
+                total += int(cumul)
+        meilleur = min(meilleur, total / 1000)
+    return meilleur, modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Budget de démarrage des outils sans interface")
+    parser.add_argument('--budget-ms', type=float, default=60.0, help="Temps d'import maximal par commande")
+    args = parser.parse_args(argv)
+
+    echec = False
+    for commande in COMMANDES:
+        duree, modules = mesurer(commande)
+        interdits = sorted(m for m in modules if m.split('.')[0] in MODULES_INTERDITS)
+        statut = 'ok'
+        if interdits:
+            statut = f"ÉCHEC, modules interdits : {', '.join(interdits)}"
+            echec = True
+        elif duree > args.budget_ms:
+            statut = f"ÉCHEC, budget {args.budget_ms:.0f} ms dépassé"
+            echec = True
+        print(f"{' '.join(commande):55} {duree:7.1f} ms  {statut}")
+    return 1 if echec else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
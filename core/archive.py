@@ -0,0 +1,261 @@
+"""
+Archive SQLite des parties terminées
+
+Chaque partie terminée devient une ligne de la table parties : noms,
+classes, vainqueur, nombre d'actions, histogramme des actions de chaque
+joueur et la suite des actions (un octet par action, comme core.replay),
+qui permet de rejouer la partie et d'en retrouver l'historique. La colonne
+hasard garde les réglages des mécaniques aléatoires de la partie
+(core.hasard.encoder_hasard), NULL sans mécaniques aléatoires.
+
+L'archive s'attache à une partie comme un enregistreur de replays
+(game.enregistreur = ArchiveParties(...)) ou reçoit des parties déjà jouées
+par ajouter(). Les lignes sont accumulées en mémoire et écrites par lots
+dans une seule transaction. Les statistiques sont calculées par SQLite sur
+des index couvrants, sans charger les lignes en Python.
+"""
+import sqlite3
+import time
+
+from core.characters import NOMS_CLASSES, classe_id
+from core.hasard import encoder_hasard, decoder_hasard
+from core.registre import ACTIONS
+
+_HISTOGRAMME = [f"j{joueur}_{action}" for joueur in (1, 2) for action in ACTIONS]
+_COLONNES = ['date', 'nom1', 'nom2', 'classe1', 'classe2', 'gagnant', 'tours', 'version_regles',
+             *_HISTOGRAMME, 'actions', 'hasard']
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS parties (
+    id INTEGER PRIMARY KEY,
+    date REAL NOT NULL,
+    nom1 TEXT NOT NULL,
+    nom2 TEXT NOT NULL,
+    classe1 INTEGER NOT NULL,
+    classe2 INTEGER NOT NULL,
+    gagnant INTEGER NOT NULL,
+    tours INTEGER NOT NULL,
+    version_regles INTEGER NOT NULL,
+    {', '.join(f'{colonne} INTEGER NOT NULL' for colonne in _HISTOGRAMME)},
+    actions BLOB NOT NULL,
+    hasard BLOB
+);
+CREATE INDEX IF NOT EXISTS parties_paire ON parties (classe1, classe2, id, gagnant, tours);
+"""
+_CODES = range(len(ACTIONS))
+_INSERTION = f"INSERT INTO parties ({', '.join(_COLONNES)}) VALUES ({', '.join('?' * len(_COLONNES))})"
+
+
+def _classe(classe):
+    """Identifiant d'une classe donnée par son nom ou son identifiant"""
+    return classe_id(classe) if isinstance(classe, str) else classe
+
+
+def _acteurs(classe1, classe2, actions, hasard):
+    """Joueur de chaque action d'une partie aux mécaniques aléatoires, retrouvé en la rejouant"""
+    from core.engine import step, etat_initial, REFUSEE
+    etat = etat_initial(classe1, classe2)
+    acteurs = bytearray()
+    for code in actions:
+        acteurs.append(2 if etat >> 27 & 1 else 1)
+        etat, issue, _ = step(etat, code, hasard)
+        if issue == REFUSEE:
+            raise ValueError("Action impossible dans la partie")
+    return acteurs
+
+
+class ArchiveParties:
+    """Base de parties terminées, écrite par lots"""
+
+    def __init__(self, chemin, taille_lot=1000):
+        """
+        Args:
+            chemin (str): Fichier SQLite, créé s'il n'existe pas
+            taille_lot (int): Parties gardées en mémoire avant une écriture
+        """
+        from core.solveur import version_regles
+        self.chemin = chemin
+        self.taille_lot = taille_lot
+        self.version_regles = version_regles()
+        self._connexion = sqlite3.connect(chemin)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.executescript(_SCHEMA)
+        colonnes = {ligne[1] for ligne in self._connexion.execute("PRAGMA table_info(parties)")}
+        if 'hasard' not in colonnes:  # Archive créée avant les mécaniques aléatoires
+            self._connexion.execute("ALTER TABLE parties ADD COLUMN hasard BLOB")
+        self._en_attente = []
+        self._actions = None  # Actions de la partie en cours, None hors partie
+        self._acteurs = None  # Joueur (1 ou 2) de chacune de ces actions
+        self._cote = 1  # Joueur de la prochaine action
+
+    # Enregistrement depuis un Game, même protocole que core.replay.EnregistreurReplay
+
+    def debut(self, game):
+        """Commence une nouvelle partie ; une partie non terminée n'est pas archivée"""
+        self._actions = bytearray()
+        self._acteurs = bytearray()
+        self._cote = game.get_joueur_actuel()
+
+    def enregistrer(self, game, code):
+        """Ajoute une action réussie ; archive la partie quand le combat se termine"""
+        if self._actions is None:
+            return
+        self._actions.append(code)
+        # Noté à chaque action : un joueur étourdi ne joue pas, son adversaire rejoue
+        self._acteurs.append(self._cote)
+        self._cote = game.get_joueur_actuel()
+        if game.moteur_combat.is_combat_over:
+            j1, j2 = game.joueur1, game.joueur2
+            self.ajouter(j1.nom, j2.nom, j1.identifiant, j2.identifiant,
+                         1 if game.gagnant is j1 else 2, self._actions, self._acteurs, game.hasard)
+            self._actions = self._acteurs = None
+
+    def terminer(self):
+        """Abandonne la partie en cours sans l'archiver"""
+        self._actions = self._acteurs = None
+
+    def ajouter(self, nom1, nom2, classe1, classe2, gagnant, actions, acteurs=None, hasard=None):
+        """
+        Ajoute une partie jouée
+        Args:
+            nom1, nom2 (str): Noms des personnages
+            classe1, classe2: Classes (nom ou identifiant)
+            gagnant (int): 1, 2, ou 0 pour une partie nulle
+            actions: Identifiants des actions réussies, dans l'ordre
+            acteurs: Joueur (1 ou 2) de chaque action ; si omis, les joueurs
+                alternent en commençant par le joueur 1, sauf étourdissement
+            hasard (MecaniquesAleatoires): Mécaniques aléatoires de la partie
+        """
+        actions = bytes(actions)
+        classe1, classe2 = _classe(classe1), _classe(classe2)
+        if acteurs is None and hasard is not None:
+            acteurs = _acteurs(classe1, classe2, actions, hasard)
+        if acteurs is None:
+            # Actions paires pour le joueur 1, impaires pour le joueur 2
+            joueur1, joueur2 = actions[0::2], actions[1::2]
+            histogramme = (*map(joueur1.count, _CODES), *map(joueur2.count, _CODES))
+        else:
+            histogramme = [0] * len(_HISTOGRAMME)
+            for code, acteur in zip(actions, acteurs):
+                histogramme[(acteur - 1) * len(ACTIONS) + code] += 1
+        self._en_attente.append((time.time(), nom1, nom2, classe1, classe2, gagnant, len(actions),
+                                 self.version_regles, *histogramme, actions,
+                                 None if hasard is None else encoder_hasard(hasard)))
+        if len(self._en_attente) >= self.taille_lot:
+            self.valider()
+
+    def valider(self):
+        """Écrit les parties en attente dans une seule transaction"""
+        if self._en_attente:
+            with self._connexion:
+                self._connexion.executemany(_INSERTION, self._en_attente)
+            self._en_attente.clear()
+
+    def fermer(self):
+        """Écrit les parties en attente et ferme la base"""
+        self.valider()
+        self._connexion.close()
+
+    # Consultation
+
+    def __len__(self):
+        self.valider()
+        return self._connexion.execute("SELECT count(*) FROM parties").fetchone()[0]
+
+    def taux_victoire(self, classe_a, classe_b, dernieres=None):
+        """
+        Bilan des parties entre deux classes, quel que soit le côté de chacune
+        Args:
+            classe_a, classe_b: Classes (nom ou identifiant)
+            dernieres (int): Ne compte que les N parties les plus récentes de la paire
+        Returns:
+            dict: {'parties', 'victoires_a', 'victoires_b', 'nuls', 'taux_a'}
+        """
+        self.valider()
+        a, b = _classe(classe_a), _classe(classe_b)
+        limite = -1 if dernieres is None else dernieres
+        # Chaque côté est lu à rebours sur l'index (classe1, classe2, id)
+        requete = """
+            SELECT count(*), coalesce(sum(vainqueur = ?), 0), coalesce(sum(vainqueur = ?), 0),
+                   coalesce(sum(vainqueur IS NULL), 0)
+            FROM (
+                SELECT id, vainqueur FROM (
+                    SELECT id, CASE gagnant WHEN 1 THEN classe1 WHEN 2 THEN classe2 END AS vainqueur
+                    FROM parties WHERE classe1 = ? AND classe2 = ? ORDER BY id DESC LIMIT ?)
+                UNION ALL
+                SELECT id, vainqueur FROM (
+                    SELECT id, CASE gagnant WHEN 1 THEN classe1 WHEN 2 THEN classe2 END AS vainqueur
+                    FROM parties WHERE classe1 = ? AND classe2 = ? AND classe1 != classe2
+                    ORDER BY id DESC LIMIT ?)
+                ORDER BY id DESC LIMIT ?
+            )
+        """
+        parties, victoires_a, victoires_b, nuls = self._connexion.execute(
+            requete, (a, b, a, b, limite, b, a, limite, limite)).fetchone()
+        if a == b:  # Un miroir : chaque partie décisive est une victoire de la classe
+            victoires_a = victoires_b = (parties - nuls) / 2
+        return {
+            'parties': parties,
+            'victoires_a': victoires_a,
+            'victoires_b': victoires_b,
+            'nuls': nuls,
+            'taux_a': victoires_a / parties if parties else 0.0,
+        }
+
+    def durees_par_paire(self):
+        """
+        Durée moyenne des combats par paire de classes (joueur 1, joueur 2)
+        Returns:
+            dict: (classe1, classe2) -> (nombre de parties, actions moyennes)
+        """
+        self.valider()
+        lignes = self._connexion.execute(
+            "SELECT classe1, classe2, count(*), avg(tours) FROM parties GROUP BY classe1, classe2")
+        return {(NOMS_CLASSES[c1], NOMS_CLASSES[c2]): (n, moyenne) for c1, c2, n, moyenne in lignes}
+
+    def histogramme_actions(self, classe):
+        """
+        Nombre total de chaque action jouée par une classe, des deux côtés
+        Returns:
+            dict: Nom d'action -> nombre
+        """
+        self.valider()
+        c = _classe(classe)
+        sommes = ', '.join(f"coalesce(sum({colonne}), 0)" for colonne in _HISTOGRAMME)
+        cote1 = self._connexion.execute(f"SELECT {sommes} FROM parties WHERE classe1 = ?", (c,)).fetchone()
+        cote2 = self._connexion.execute(f"SELECT {sommes} FROM parties WHERE classe2 = ?", (c,)).fetchone()
+        n = len(ACTIONS)
+        return {action: cote1[i] + cote2[n + i] for i, action in enumerate(ACTIONS)}
+
+    def partie(self, numero):
+        """
+        Relit une partie archivée sous forme de replay
+        Args:
+            numero (int): Identifiant de la partie (colonne id)
+        Returns:
+            core.replay.Replay: Partie, à rejouer avec core.replay.rejouer
+        """
+        from core.replay import Replay
+        self.valider()
+        ligne = self._connexion.execute(
+            "SELECT classe1, classe2, nom1, nom2, version_regles, actions, hasard FROM parties WHERE id = ?",
+            (numero,)).fetchone()
+        if ligne is None:
+            raise KeyError(numero)
+        classe1, classe2, nom1, nom2, version, actions, hasard = ligne
+        return Replay(numero, classe1, classe2, nom1, nom2, version, actions, True,
+                      None if hasard is None else decoder_hasard(hasard))
+
+    def historique(self, numero):
+        """
+        Messages du combat d'une partie archivée, reconstruits en la rejouant
+        Returns:
+            list[str]: Historique, comme Game.historique
+        """
+        from core.game import Game
+        from core.replay import rejouer
+        game = Game()
+        for game in rejouer(self.partie(numero), game):
+            pass
+        return list(game.historique)
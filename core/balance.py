@@ -0,0 +1,188 @@
+"""
+Balayage de paramètres d'équilibrage
+
+Évalue une grille de paramètres de règles : pour chaque point de la grille,
+chaque paire de classes est simulée en masse (core.simulation) et le point
+est résumé par les taux de victoire et la durée moyenne des combats.
+
+Les paramètres de la grille sont soit communs ('pv_max', 'energie_max'),
+soit propres à une classe ('mage.special_cost', 'archer.recharge'...). Un
+paramètre de classe donné sans nom de classe ('special_cost') s'applique à
+toutes les classes.
+
+Les résultats sont gardés dans un cache sur disque (une ligne JSON par point)
+indexé par une empreinte des règles complètes du point, des réglages de
+simulation et de la version de la mécanique : relancer un balayage ne
+calcule que les points nouveaux ou modifiés.
+"""
+import hashlib
+import itertools
+import json
+import os
+
+from core.characters import NOMS_CLASSES, regles_classe
+
+# À incrémenter quand la mécanique du combat change (invalide le cache)
+VERSION_MECANIQUE = 1
+PARAMETRES_COMMUNS = ('pv_max', 'energie_max')
+PARAMETRES_CLASSE = ('degats_normale', 'coups_normale', 'degats_speciale', 'ignore_defense',
+                     'special_cost', 'recharge')
+
+
+def points_grille(grille):
+    """
+    Énumère les points d'une grille
+    Args:
+        grille (dict): Nom de paramètre -> liste de valeurs
+    Returns:
+        list[dict]: Un dictionnaire de valeurs par point
+    """
+    noms = sorted(grille)
+    return [dict(zip(noms, valeurs)) for valeurs in itertools.product(*(grille[n] for n in noms))]
+
+
+def regles_point(point):
+    """
+    Règles complètes de toutes les classes pour un point de la grille
+    Args:
+        point (dict): Valeurs des paramètres modifiés
+    Returns:
+        list[dict]: Règles par classe, au format de regles_classe
+    Raises:
+        ValueError: Paramètre inconnu
+    """
+    regles = [regles_classe(cid) for cid in range(len(NOMS_CLASSES))]
+    for nom, valeur in point.items():
+        classe, _, parametre = nom.rpartition('.')
+        if parametre not in PARAMETRES_COMMUNS + PARAMETRES_CLASSE:
+            raise ValueError(f"Paramètre inconnu : {nom}")
+        if classe:
+            if parametre in PARAMETRES_COMMUNS:
+                raise ValueError(f"{parametre} est commun à toutes les classes")
+            cibles = [regles[NOMS_CLASSES.index(classe.lower())]]
+        else:
+            cibles = regles
+        for r in cibles:
+            r[parametre] = valeur
+    return regles
+
+
+def cle_point(regles, reglages):
+    """
+    Empreinte d'un point : règles complètes, réglages de simulation et version
+    Returns:
+        str: Clé hexadécimale du cache
+    """
+    contenu = json.dumps([VERSION_MECANIQUE, regles, reglages], sort_keys=True)
+    return hashlib.blake2b(contenu.encode(), digest_size=16).hexdigest()
+
+
+def evaluer_point(tache):
+    """
+    Simule toutes les paires de classes d'un point (exécuté dans un worker)
+    Args:
+        tache (tuple): (clé, règles, réglages)
+    Returns:
+        tuple: (clé, résultats par paire 'classe1-classe2')
+    """
+    from core.simulation import compiler_regles, simuler_duels, politique_agressive
+    cle, regles, reglages = tache
+    tables = compiler_regles(regles)
+    politique = politique_agressive if reglages['politique'] == 'agressif' else None
+    graine = int(cle[:16], 16)
+    paires = {}
+    for i, classe1 in enumerate(NOMS_CLASSES[:len(regles)]):
+        for j, classe2 in enumerate(NOMS_CLASSES[:len(regles)]):
+            r = simuler_duels(i, j, reglages['duels'], politique=politique, max_tours=reglages['max_tours'],
+                              seed=(graine, i, j), regles=tables)
+            paires[f"{classe1}-{classe2}"] = {
+                'taux_j1': r['victoires_j1'] / reglages['duels'],
+                'taux_j2': r['victoires_j2'] / reglages['duels'],
+                'nuls': r['nuls'] / reglages['duels'],
+                'tours_moyens': r['tours_moyens'],
+            }
+    return cle, paires
+
+
+class CacheBalayage:
+    """Résultats déjà calculés, une ligne JSON {cle, paires} par point"""
+
+    def __init__(self, chemin):
+        """
+        Args:
+            chemin (str): Fichier du cache, créé au premier résultat
+        """
+        self.chemin = chemin
+        self.resultats = {}
+        if os.path.exists(chemin):
+            with open(chemin, encoding='utf-8') as f:
+                for ligne in f:
+                    if ligne.strip():
+                        entree = json.loads(ligne)
+                        self.resultats[entree['cle']] = entree['paires']
+
+    def __contains__(self, cle):
+        return cle in self.resultats
+
+    def __getitem__(self, cle):
+        return self.resultats[cle]
+
+    def ajouter(self, cle, paires):
+        """Enregistre un point, écrit immédiatement pour survivre à une interruption"""
+        self.resultats[cle] = paires
+        with open(self.chemin, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'cle': cle, 'paires': paires}) + '\n')
+
+
+def balayer(grille, duels=20000, politique='aleatoire', max_tours=200, workers=1, cache=None):
+    """
+    Évalue tous les points d'une grille, en réutilisant le cache
+    Args:
+        grille (dict): Nom de paramètre -> liste de valeurs
+        duels (int): Duels simulés par paire de classes et par point
+        politique (str): 'aleatoire' ou 'agressif'
+        max_tours (int): Limite d'actions par duel
+        workers (int): Nombre de processus pour les points à calculer
+        cache (str): Fichier du cache, aucun cache si None
+    Returns:
+        list[dict]: Pour chaque point : {'parametres', 'cle', 'paires', 'cache' (bool)}
+    """
+    reglages = {'duels': duels, 'politique': politique, 'max_tours': max_tours}
+    memoire = CacheBalayage(cache) if cache else None
+    points = []
+    for point in points_grille(grille):
+        regles = regles_point(point)
+        points.append((point, cle_point(regles, reglages), regles))
+
+    a_calculer, vus = [], set()
+    for point, cle, regles in points:
+        if (memoire is None or cle not in memoire) and cle not in vus:
+            vus.add(cle)
+            a_calculer.append((cle, regles, reglages))
+
+    calcules = {}
+    executor = None
+    if workers <= 1 or len(a_calculer) <= 1:
+        resultats = map(evaluer_point, a_calculer)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers)
+        resultats = executor.map(evaluer_point, a_calculer)
+    try:
+        for cle, paires in resultats:
+            calcules[cle] = paires
+            if memoire is not None:
+                memoire.ajouter(cle, paires)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return [
+        {
+            'parametres': point,
+            'cle': cle,
+            'paires': calcules[cle] if cle in calcules else memoire[cle],
+            'cache': cle not in calcules,
+        }
+        for point, cle, _ in points
+    ]
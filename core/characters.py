@@ -1,6 +1,15 @@
 from abc import ABC, abstractmethod
+from core import instrumentation
+from core.registre import FICHIER_CLASSES, MAX_CLASSES, lire_definitions, completer_definition, compiler_actions
 
 class Personnage(ABC):
+    # Pas de __dict__ par instance : l'état tient dans ces attributs
+    __slots__ = ('nom', 'pv_max', 'pv', 'energie_max', 'energie', 'is_defending', 'special_cost')
+    montant_recharge = 10  # Énergie récupérée par recharger_energie
+    cout_special = 25  # Coût de base pour l'attaque spéciale
+    vitesse = 10  # Fréquence d'action en combat d'équipes (core.equipes)
+    chance_etourdissement = 0.0  # Avec les mécaniques aléatoires (core.hasard)
+
     def __init__(self, nom):
         """
         Classe abstraite représentant un personnage de base
@@ -13,7 +22,7 @@ class Personnage(ABC):
         self.energie_max = 50
         self.energie = self.energie_max
         self.is_defending = False
-        self.special_cost = 25  # Coût de base pour l'attaque spéciale
+        self.special_cost = self.cout_special
 
     @abstractmethod
     def attaque_normale(self, cible):
@@ -29,8 +38,10 @@ class Personnage(ABC):
         """Active le mode défense pour le tour"""
         self.is_defending = True
 
-    def recharger_energie(self, amount=10):
+    def recharger_energie(self, amount=None):
         """Recharge l'énergie du personnage"""
+        if amount is None:
+            amount = self.montant_recharge
         self.energie = min(self.energie + amount, self.energie_max)
 
     def recevoir_degats(self, degats):
@@ -43,85 +54,185 @@ class Personnage(ABC):
             self.is_defending = False
         
         self.pv = max(0, self.pv - degats)
+        if instrumentation.mesures is not None:
+            instrumentation.mesures.degats(self, degats)
         return degats
 
     def est_ko(self):
         """Vérifie si le personnage est K.O."""
         return self.pv <= 0
 
+    def porter_coups(self, cible, degats, coups, ignore_defense):
+        """
+        Applique une série de coups à la cible
+        Une attaque qui ignore la défense laisse la cible en position défensive.
+        Returns:
+            int: Total des dégâts réellement subis par la cible
+        """
+        if ignore_defense:
+            was_defending = cible.is_defending
+            cible.is_defending = False  # Ignore la défense
+            total = 0
+            for _ in range(coups):
+                total += cible.recevoir_degats(degats)
+            cible.is_defending = was_defending
+            return total
+        total = 0
+        for _ in range(coups):
+            total += cible.recevoir_degats(degats)
+        return total
 
-class Guerrier(Personnage):
-    def __init__(self, nom):
-        super().__init__(nom)
-        self.special_cost = 20
-
-    def attaque_normale(self, cible):
-        """Coup d'épée standard"""
-        degats = 15
-        degats_infliges = cible.recevoir_degats(degats)
-        return f"{self.nom} frappe avec son épée (-{degats_infliges} PV)"
-
-    def attaque_speciale(self, cible):
-        """Frappe puissante avec chance d'étourdissement"""
-        if self.energie >= self.special_cost:
-            self.energie -= self.special_cost
-            degats = 25
-            degats_infliges = cible.recevoir_degats(degats)
-            return f"{self.nom} lance une frappe puissante ! (-{degats_infliges} PV)"
-        return None
+    def frapper(self, cible):
+        """
+        Applique l'attaque de base sans construire de message
+        Returns:
+            int: Total des dégâts réellement subis par la cible
+        """
+        return self.porter_coups(cible, self.degats_normale, self.coups_normale, False)
 
+    def frapper_special(self, cible):
+        """
+        Applique l'attaque spéciale sans construire de message
+        Returns:
+            int: Dégâts réellement subis, None si l'énergie est insuffisante
+        """
+        if self.energie < self.special_cost:
+            return None
+        self.energie -= self.special_cost
+        return self.porter_coups(cible, self.degats_speciale, 1, self.special_ignore_defense)
 
-class Mage(Personnage):
-    def __init__(self, nom):
-        super().__init__(nom)
-        self.special_cost = 30
+    def decrire_normale(self, degats, multiplicateur=1):
+        """Message de l'attaque de base pour des dégâts subis donnés (multiplicateur : coup critique)"""
+        return self._decrire(self.message_normale, degats, self.degats_normale * multiplicateur, self.coups_normale)
 
-    def attaque_normale(self, cible):
-        """Boule de feu élémentaire"""
-        degats = 20
-        degats_infliges = cible.recevoir_degats(degats)
-        return f"{self.nom} lance une boule de feu (-{degats_infliges} PV)"
+    def decrire_speciale(self, degats, multiplicateur=1):
+        """Message de l'attaque spéciale pour des dégâts subis donnés (multiplicateur : coup critique)"""
+        return self._decrire(self.message_speciale, degats, self.degats_speciale * multiplicateur, 1)
 
-    def attaque_speciale(self, cible):
-        """Tempête élémentaire (ignore la défense)"""
-        if self.energie >= self.special_cost:
-            self.energie -= self.special_cost
-            degats = 35
-            was_defending = cible.is_defending
-            cible.is_defending = False  # Ignore la défense
-            degats_infliges = cible.recevoir_degats(degats)
-            cible.is_defending = was_defending
-            return f"{self.nom} invoque une tempête élémentaire ! (-{degats_infliges} PV)"
-        return None
+    def _decrire(self, message, degats, par_coup, coups):
+        """Seul le premier coup peut être réduit par la défense"""
+        return message.format(nom=self.nom, degats=degats,
+                              premier=degats - par_coup * (coups - 1), suivant=par_coup)
 
 
-class Archer(Personnage):
-    def __init__(self, nom):
-        super().__init__(nom)
-        self.special_cost = 15
+class PersonnageDeclare(Personnage):
+    """Personnage dont les règles viennent d'une définition du registre"""
+    __slots__ = ()
 
     def attaque_normale(self, cible):
-        """Tir rapide (double attaque)"""
-        degats1 = 12
-        degats2 = 12
-        total = 0
-        
-        msg = f"{self.nom} tire deux flèches rapides : "
-        degats_infliges = cible.recevoir_degats(degats1)
-        total += degats_infliges
-        msg += f"première (-{degats_infliges} PV), "
-        
-        degats_infliges = cible.recevoir_degats(degats2)
-        total += degats_infliges
-        msg += f"seconde (-{degats_infliges} PV)"
-        
-        return msg
+        """Attaque de base décrite par la définition de la classe"""
+        return self.decrire_normale(self.frapper(cible))
 
     def attaque_speciale(self, cible):
-        """Tir précis (dégâts critiques)"""
-        if self.energie >= self.special_cost:
-            self.energie -= self.special_cost
-            degats = 40
-            degats_infliges = cible.recevoir_degats(degats)
-            return f"{self.nom} décoche un tir précis ! (-{degats_infliges} PV)"
-        return None
+        """Attaque spéciale ; None si l'énergie est insuffisante"""
+        degats_infliges = self.frapper_special(cible)
+        if degats_infliges is None:
+            return None
+        return self.decrire_speciale(degats_infliges)
+
+
+def creer_classe(definition, identifiant):
+    """
+    Construit la classe Python d'une définition du registre
+    Args:
+        definition (dict): Définition complète (voir core.registre)
+        identifiant (int): Identifiant numérique de la classe
+    Returns:
+        type: Sous-classe de PersonnageDeclare
+    """
+    attributs = {
+        '__slots__': (),
+        '__module__': __name__,
+        '__doc__': f"Classe {definition['libelle']}, définie dans le registre des classes",
+        'identifiant': identifiant,
+        'definition': definition,
+        'actions': compiler_actions(definition),
+        'degats_normale': definition['degats_normale'],
+        'coups_normale': definition['coups_normale'],
+        'degats_speciale': definition['degats_speciale'],
+        'special_ignore_defense': definition['ignore_defense'],
+        'cout_special': definition['special_cost'],
+        'montant_recharge': definition['recharge'],
+        'vitesse': definition['vitesse'],
+        'chance_etourdissement': definition['etourdissement'],
+        'message_normale': definition['message_normale'],
+        'message_speciale': definition['message_speciale'],
+    }
+    return type(definition['libelle'], (PersonnageDeclare,), attributs)
+
+
+# Classes jouables : l'identifiant numérique d'une classe est son indice.
+# Ces listes sont complétées en place par enregistrer_classe.
+CLASSES = []
+NOMS_CLASSES = []
+REGISTRE = {}  # nom (et libellé en minuscules) -> classe
+
+
+def enregistrer_classe(definition):
+    """
+    Ajoute une classe jouable à partir de sa définition
+    Args:
+        definition (dict): Définition (voir core.registre)
+    Returns:
+        type: Classe créée, ou déjà enregistrée sous ce nom
+    """
+    definition = completer_definition(definition)
+    if definition['nom'] in REGISTRE:
+        return REGISTRE[definition['nom']]
+    if len(CLASSES) >= MAX_CLASSES:
+        raise ValueError(f"Au plus {MAX_CLASSES} classes peuvent être enregistrées")
+    classe = creer_classe(definition, len(CLASSES))
+    CLASSES.append(classe)
+    NOMS_CLASSES.append(definition['nom'])
+    REGISTRE[definition['nom']] = classe
+    REGISTRE.setdefault(definition['libelle'].lower(), classe)
+    return classe
+
+
+def charger_classes(chemin):
+    """
+    Enregistre les classes d'un fichier de définitions
+    Args:
+        chemin (str): Fichier JSON (même format que core/classes.json)
+    Returns:
+        list[type]: Classes du fichier
+    """
+    return [enregistrer_classe(d) for d in lire_definitions(chemin)]
+
+
+Guerrier, Mage, Archer = charger_classes(FICHIER_CLASSES)
+
+
+def classe_id(classe):
+    """
+    Convertit un nom de classe ('guerrier', 'mage', 'archer') en identifiant
+    Args:
+        classe (str|int): Nom de classe ou identifiant déjà numérique
+    Returns:
+        int: Identifiant de classe
+    """
+    if isinstance(classe, str):
+        return REGISTRE[classe.lower()].identifiant
+    return int(classe)
+
+
+def regles_classe(classe):
+    """
+    Paramètres de règles d'une classe
+    Args:
+        classe (str|int): Nom ou identifiant de classe
+    Returns:
+        dict: Dégâts, nombre de coups, coût de la spéciale, maxima...
+    """
+    c = CLASSES[classe_id(classe)]
+    p = c('')
+    return {
+        'degats_normale': c.degats_normale,
+        'coups_normale': c.coups_normale,
+        'degats_speciale': c.degats_speciale,
+        'ignore_defense': c.special_ignore_defense,
+        'special_cost': c.cout_special,
+        'pv_max': p.pv_max,
+        'energie_max': p.energie_max,
+        'recharge': c.montant_recharge,
+    }
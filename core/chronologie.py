@@ -0,0 +1,210 @@
+"""
+Historique des coups d'une partie : annuler, rétablir et variantes
+
+Chaque coup joué est un nœud d'un arbre dont la racine est le début du
+combat. Un nœud ne garde que la différence (XOR) entre l'état compact de la
+partie (core.etat) après le coup et celui d'avant, et quelques entiers
+(parent, coup, longueur du journal, liens vers les enfants), le tout dans
+des tableaux plats : une quarantaine d'octets par coup, sans copie d'objets.
+L'état complet n'est conservé qu'aux nœuds dont la profondeur est un
+multiple de l'intervalle de points de reprise.
+
+Annuler applique la différence du nœud courant à l'état courant, en temps
+constant. Rétablir rejoue le coup du dernier enfant visité. Jouer un autre
+coup après une annulation crée une variante sans effacer la ligne d'origine,
+et aller_a permet de passer d'une variante à l'autre.
+
+Un enregistreur (core.replay, core.archive) ne garde que des parties jouées
+d'un trait : revenir en arrière (annuler, aller_a vers un autre nœud)
+abandonne l'enregistrement de la partie en cours (enregistreur.terminer),
+et les coups suivants ne sont plus enregistrés jusqu'au prochain combat.
+"""
+from array import array
+
+from core.etat import compacter_partie
+
+AUCUN = -1  # Absence de parent ou d'enfant
+
+
+class Chronologie:
+    """Arbre des coups d'une partie, attaché à Game.chronologie"""
+
+    def __init__(self, intervalle=32):
+        """
+        Args:
+            intervalle (int): Profondeur entre deux états complets conservés
+        """
+        self.intervalle = intervalle
+        self.debut(None)
+
+    def debut(self, game):
+        """Repart d'un arbre vide dont la racine est l'état de la partie (appelé par Game)"""
+        self._parents = array('i')
+        self._differences = array('Q')
+        self._coups = array('B')
+        self._journal = array('I')
+        self._profondeurs = array('I')
+        self._premiers_enfants = array('i')
+        self._freres = array('i')
+        self._derniers_enfants = array('i')  # Enfant suivi par rétablir
+        self._reprises = {}
+        self.noeud = AUCUN
+        self.etat = 0
+        if game is not None:
+            self.etat = compacter_partie(game)
+            self.noeud = self._ajouter(AUCUN, 0, 0, len(game.journal))
+
+    def __len__(self):
+        return len(self._parents)
+
+    def _ajouter(self, parent, difference, coup, longueur_journal):
+        """Crée un nœud et le relie à son parent"""
+        noeud = len(self._parents)
+        profondeur = 0 if parent == AUCUN else self._profondeurs[parent] + 1
+        self._parents.append(parent)
+        self._differences.append(difference)
+        self._coups.append(coup)
+        self._journal.append(longueur_journal)
+        self._profondeurs.append(profondeur)
+        self._premiers_enfants.append(AUCUN)
+        self._derniers_enfants.append(AUCUN)
+        if parent == AUCUN:
+            self._freres.append(AUCUN)
+        else:
+            self._freres.append(self._premiers_enfants[parent])
+            self._premiers_enfants[parent] = noeud
+        if profondeur % self.intervalle == 0:
+            self._reprises[noeud] = self.etat
+        return noeud
+
+    def _enfant(self, noeud, coup):
+        """Enfant de noeud obtenu par ce coup, AUCUN s'il n'a pas encore été joué"""
+        enfant = self._premiers_enfants[noeud]
+        while enfant != AUCUN and self._coups[enfant] != coup:
+            enfant = self._freres[enfant]
+        return enfant
+
+    def enregistrer(self, game, code):
+        """
+        Ajoute le coup qui vient d'être joué (appelé par Game)
+        Un coup déjà joué depuis cette position réutilise son nœud.
+        Args:
+            game (Game): Partie après le coup
+            code (int): Identifiant de l'action jouée
+        """
+        parent = self.noeud
+        ancien, self.etat = self.etat, compacter_partie(game)
+        enfant = self._enfant(parent, code)
+        if enfant == AUCUN:
+            enfant = self._ajouter(parent, ancien ^ self.etat, code, len(game.journal))
+        self._derniers_enfants[parent] = enfant
+        self.noeud = enfant
+
+    def annuler(self, game):
+        """
+        Revient à la position d'avant le dernier coup, en temps constant
+        Returns:
+            bool: False au début du combat
+        """
+        parent = self._parents[self.noeud] if self.noeud != AUCUN else AUCUN
+        if parent == AUCUN:
+            return False
+        self.etat ^= self._differences[self.noeud]
+        self._derniers_enfants[parent] = self.noeud
+        self.noeud = parent
+        _abandonner_enregistrement(game)
+        game.journal.tronquer(self._journal[parent])
+        game.restaurer(self.etat)
+        return True
+
+    def retablir(self, game):
+        """
+        Rejoue le dernier coup annulé depuis la position courante
+        Returns:
+            bool: False s'il n'y a rien à rétablir
+        """
+        if self.noeud == AUCUN or self._derniers_enfants[self.noeud] == AUCUN:
+            return False
+        return game.executer_action(self._coups[self._derniers_enfants[self.noeud]])[0]
+
+    def etat_noeud(self, noeud):
+        """
+        État compact de la partie à un nœud, reconstruit depuis le point de
+        reprise le plus proche (au plus intervalle différences)
+        Returns:
+            int: État compact, voir core.etat
+        """
+        difference = 0
+        while noeud not in self._reprises:
+            difference ^= self._differences[noeud]
+            noeud = self._parents[noeud]
+        return self._reprises[noeud] ^ difference
+
+    def profondeur(self, noeud=None):
+        """Nombre de coups entre le début du combat et le nœud (courant par défaut)"""
+        return self._profondeurs[self.noeud if noeud is None else noeud]
+
+    def variantes(self, noeud=None):
+        """
+        Nœuds atteints en un coup depuis un nœud (courant par défaut)
+        Returns:
+            list[tuple]: (identifiant d'action, nœud), du plus ancien au plus récent
+        """
+        enfants = []
+        enfant = self._premiers_enfants[self.noeud if noeud is None else noeud]
+        while enfant != AUCUN:
+            enfants.append((self._coups[enfant], enfant))
+            enfant = self._freres[enfant]
+        enfants.reverse()
+        return enfants
+
+    def coups(self, noeud=None):
+        """Identifiants des actions jouées depuis le début jusqu'au nœud (courant par défaut)"""
+        noeud = self.noeud if noeud is None else noeud
+        coups = []
+        while self._parents[noeud] != AUCUN:
+            coups.append(self._coups[noeud])
+            noeud = self._parents[noeud]
+        coups.reverse()
+        return coups
+
+    def ancetre(self, noeud, profondeur):
+        """Nœud de la ligne menant à noeud situé à la profondeur donnée"""
+        while self._profondeurs[noeud] > profondeur:
+            noeud = self._parents[noeud]
+        return noeud
+
+    def aller_a(self, game, noeud):
+        """
+        Place la partie à un nœud quelconque de l'arbre
+        Sans journal, l'état est restauré directement. Avec un journal, les
+        coups menant de l'ancêtre commun au nœud sont rejoués pour en
+        reconstruire les événements.
+        Args:
+            game (Game): Partie suivie par cette chronologie
+            noeud (int): Nœud cible
+        """
+        commun = self.ancetre(self.noeud, self._profondeurs[noeud])
+        cible = self.ancetre(noeud, self._profondeurs[commun])
+        while commun != cible:
+            commun, cible = self._parents[commun], self._parents[cible]
+
+        depart = noeud if not game.journal.actif else commun
+        chemin = []
+        while noeud != depart:
+            chemin.append(self._coups[noeud])
+            noeud = self._parents[noeud]
+        if depart != self.noeud:
+            _abandonner_enregistrement(game)
+        with game.notifications_groupees():
+            self.etat = self.etat_noeud(depart)
+            self.noeud = depart
+            game.journal.tronquer(self._journal[depart])
+            game.restaurer(self.etat)
+            game.executer_actions(reversed(chemin))
+
+
+def _abandonner_enregistrement(game):
+    """Un retour en arrière rend la partie enregistrée injouable : son enregistrement est abandonné"""
+    if game.enregistreur is not None:
+        game.enregistreur.terminer()
@@ -0,0 +1,290 @@
+"""
+Classement Elo des joueurs et des politiques
+
+ClassementElo suit les parties une par une : chaque résultat met à jour les
+cotes des deux adversaires en temps constant. Les joueurs sont des clés
+quelconques (nom, 'archer:agressif'...).
+
+recalculer_elo refait un classement complet à partir de tableaux de
+résultats (des dizaines de millions de parties) avec NumPy : la suite des
+parties est découpée en lots où aucun joueur ne joue deux fois, et les
+parties d'un lot, indépendantes, sont calculées ensemble. Les cotes sont
+celles de ClassementElo à ~1e-12 près (np.power et l'opérateur ** de
+Python peuvent différer sur le dernier bit). Quand les lots sont trop
+courts pour NumPy (peu de joueurs), les parties sont calculées une par une,
+avec les opérations de ClassementElo. L'état du calcul peut être sauvegardé
+régulièrement dans un fichier de reprise, pour reprendre un recalcul
+interrompu ou prolonger un classement quand de nouvelles parties arrivent.
+
+Avec periode=N, recalculer_elo est un autre estimateur, plus rapide : les
+parties sont traitées par périodes de N parties, comme les périodes de
+classement de Glicko (scores attendus calculés avec les cotes du début de
+période, chaque joueur reçoit la moyenne de ses variations). Ses cotes
+diffèrent de celles du calcul partie par partie dès qu'un joueur joue
+plusieurs fois dans une période ; elles ne servent pas à construire un
+ClassementElo.
+"""
+import os
+
+COTE_INITIALE = 1500.0
+K = 32.0
+_LOT_MINIMAL = 64  # Longueur moyenne des lots en dessous de laquelle les parties sont calculées une par une
+_ECHANTILLON = 1 << 16  # Parties sur lesquelles cette longueur est mesurée
+
+
+class ClassementElo:
+    """Cotes Elo mises à jour à chaque partie"""
+
+    def __init__(self, k=K, initiale=COTE_INITIALE):
+        """
+        Args:
+            k (float): Variation maximale d'une cote sur une partie
+            initiale (float): Cote d'un nouveau joueur
+        """
+        self.k = k
+        self.initiale = initiale
+        self.cotes = {}
+        self.parties = {}
+
+    def cote(self, joueur):
+        """Cote actuelle d'un joueur, la cote initiale s'il n'a jamais joué"""
+        return self.cotes.get(joueur, self.initiale)
+
+    def attendu(self, joueur_a, joueur_b):
+        """Score attendu de joueur_a contre joueur_b, entre 0 et 1"""
+        return 1.0 / (1.0 + 10.0 ** ((self.cote(joueur_b) - self.cote(joueur_a)) / 400.0))
+
+    def enregistrer(self, joueur_a, joueur_b, score_a):
+        """
+        Met à jour les deux cotes après une partie
+        Args:
+            joueur_a, joueur_b: Adversaires
+            score_a (float): 1 si joueur_a gagne, 0 s'il perd, 0.5 pour un nul
+        """
+        variation = self.k * (score_a - self.attendu(joueur_a, joueur_b))
+        self.cotes[joueur_a] = self.cote(joueur_a) + variation
+        self.cotes[joueur_b] = self.cote(joueur_b) - variation
+        self.parties[joueur_a] = self.parties.get(joueur_a, 0) + 1
+        self.parties[joueur_b] = self.parties.get(joueur_b, 0) + 1
+
+    def enregistrer_partie(self, game, joueur1, joueur2):
+        """
+        Enregistre le résultat d'une partie terminée (ou nulle si game.gagnant est None)
+        Args:
+            game (Game): Partie jouée
+            joueur1, joueur2: Clés de classement des joueurs 1 et 2 de la partie
+        """
+        if game.gagnant is None:
+            score = 0.5
+        else:
+            score = 1.0 if game.gagnant is game.joueur1 else 0.0
+        self.enregistrer(joueur1, joueur2, score)
+
+    def classement(self):
+        """
+        Returns:
+            list[tuple]: (joueur, cote, parties), de la meilleure cote à la moins bonne
+        """
+        return sorted(((j, c, self.parties.get(j, 0)) for j, c in self.cotes.items()),
+                      key=lambda ligne: -ligne[1])
+
+    @classmethod
+    def depuis_resultats(cls, joueurs, indices_a, indices_b, scores, k=K, initiale=COTE_INITIALE, reprise=None):
+        """
+        Construit un classement par recalcul complet (voir recalculer_elo),
+        celui obtenu en enregistrant les parties une par une à ~1e-12 près
+        Args:
+            joueurs (list): Clé de chaque joueur, dans l'ordre des indices
+            indices_a, indices_b, scores: Tableaux de résultats
+            reprise (str): Fichier de reprise du calcul
+        Returns:
+            ClassementElo: Classement prêt à suivre de nouvelles parties
+        """
+        import numpy as np
+        cotes = recalculer_elo(indices_a, indices_b, scores, len(joueurs), k=k, initiale=initiale, reprise=reprise)
+        parties = (np.bincount(indices_a, minlength=len(joueurs))
+                   + np.bincount(indices_b, minlength=len(joueurs)))
+        classement = cls(k, initiale)
+        for i, joueur in enumerate(joueurs):
+            if parties[i]:
+                classement.cotes[joueur] = float(cotes[i])
+                classement.parties[joueur] = int(parties[i])
+        return classement
+
+
+def recalculer_elo(indices_a, indices_b, scores, nb_joueurs, k=K, initiale=COTE_INITIALE, periode=None,
+                   reprise=None, intervalle_reprise=1 << 22):
+    """
+    Calcule les cotes Elo de tous les joueurs d'une suite de parties
+    Args:
+        indices_a, indices_b: Tableaux d'indices des deux adversaires de chaque partie
+        scores: Score de l'adversaire a dans chaque partie (1, 0 ou 0.5)
+        nb_joueurs (int): Nombre de joueurs (indices de 0 à nb_joueurs - 1)
+        k (float): Variation maximale d'une cote sur une partie
+        initiale (float): Cote de départ
+        periode (int): Parties par période de classement (estimateur par
+            périodes) ; None pour les cotes du calcul partie par partie (à ~1e-12 près)
+        reprise (str): Fichier .npz de reprise ; s'il existe, le calcul repart de la
+            partie où il s'était arrêté, et il est réécrit toutes les intervalle_reprise parties
+        intervalle_reprise (int): Parties entre deux sauvegardes (arrondi au lot ou à la période)
+    Returns:
+        np.ndarray: Cote de chaque joueur (float64)
+    """
+    import numpy as np
+    a = np.asarray(indices_a, dtype=np.intp)
+    b = np.asarray(indices_b, dtype=np.intp)
+    s = np.asarray(scores, dtype=np.float64)
+    cotes = np.full(nb_joueurs, initiale, dtype=np.float64)
+    debut = 0
+    if reprise is not None and os.path.exists(reprise):
+        with np.load(reprise) as sauvegarde:
+            if sauvegarde['cotes'].size == nb_joueurs and int(sauvegarde['position']) <= a.size:
+                debut = int(sauvegarde['position'])
+                cotes[:] = sauvegarde['cotes']
+
+    if periode is None:
+        # La longueur des lots se mesure sur un échantillon de tête : quand ils
+        # sont trop courts pour NumPy (peu de joueurs), une boucle Python avec
+        # les opérations de ClassementElo est plus rapide
+        echantillon = min(a.size - debut, _ECHANTILLON)
+        if echantillon:
+            nb_lots = _lots_disjoints(a[debut:debut + echantillon], b[debut:debut + echantillon]).size - 1
+            if echantillon / nb_lots < _LOT_MINIMAL:
+                return _recalculer_partie_par_partie(a, b, s, cotes, k, debut, reprise, intervalle_reprise)
+        bornes = _lots_disjoints(a[debut:], b[debut:]) + debut
+    else:
+        bornes = np.append(np.arange(debut, a.size, periode), a.size)
+
+    prochaine = debut + intervalle_reprise
+    for position, fin in zip(bornes[:-1].tolist(), bornes[1:].tolist()):
+        pa, pb = a[position:fin], b[position:fin]
+        attendu = 1.0 / (1.0 + np.power(10.0, (cotes[pb] - cotes[pa]) / 400.0))
+        variation = k * (s[position:fin] - attendu)
+        if periode is None:
+            # Chaque joueur figure au plus une fois dans le lot (les deux
+            # affectations successives gèrent un joueur opposé à lui-même)
+            cotes[pa] += variation
+            cotes[pb] -= variation
+        else:
+            # Un joueur présent dans plusieurs parties de la période reçoit la
+            # moyenne de ses variations : il bouge au plus comme sur une partie
+            jouees = np.bincount(pa, minlength=nb_joueurs) + np.bincount(pb, minlength=nb_joueurs)
+            somme = np.bincount(pa, variation, nb_joueurs) - np.bincount(pb, variation, nb_joueurs)
+            cotes += somme / np.maximum(jouees, 1)
+        if reprise is not None and fin >= prochaine:
+            _sauvegarder(reprise, fin, cotes)
+            prochaine = fin + intervalle_reprise
+    if reprise is not None:
+        _sauvegarder(reprise, a.size, cotes)
+    return cotes
+
+
+def _lots_disjoints(a, b):
+    """
+    Découpe une suite de parties en lots consécutifs où aucun joueur ne joue deux fois
+    Returns:
+        np.ndarray: Bornes des lots (0, ..., len(a))
+    """
+    import numpy as np
+    n = a.size
+    # Pour chaque partie, dernière partie précédente d'un de ses deux joueurs (-1 sinon)
+    # Entrées (joueur, 2 * partie + côté) triées par joueur puis par partie,
+    # codées dans un seul entier : un tri simple, bien plus rapide que lexsort
+    entrees = 2 * n
+    cles = np.empty(entrees, dtype=np.int64)
+    cles[0::2] = a
+    cles[1::2] = b
+    cles *= entrees
+    cles += np.arange(entrees)
+    cles.sort()
+    j, position = np.divmod(cles, entrees)
+    p = position // 2
+    precedente = np.full(entrees, -1, dtype=np.intp)
+    meme_joueur = j[1:] == j[:-1]
+    precedente[1:][meme_joueur] = p[:-1][meme_joueur]
+    # Un joueur opposé à lui-même : la seconde entrée reprend la précédente de la première
+    doublons = np.flatnonzero(meme_joueur & (p[1:] == p[:-1])) + 1
+    precedente[doublons] = precedente[doublons - 1]
+    par_entree = np.empty(entrees, dtype=np.intp)
+    par_entree[position] = precedente
+    derniere = np.maximum(par_entree[0::2], par_entree[1::2])
+    # Un lot commencé à la partie s s'arrête à la première partie dont un
+    # joueur a déjà joué depuis s ; les parties précédant s ont toutes
+    # derniere < s, le maximum courant suffit donc et se cherche par dichotomie
+    plus_recente = np.maximum.accumulate(derniere)
+    bornes = [0]
+    while bornes[-1] < n:
+        bornes.append(int(np.searchsorted(plus_recente, bornes[-1])))
+    return np.array(bornes, dtype=np.intp)
+
+
+def _recalculer_partie_par_partie(a, b, s, cotes, k, debut, reprise, intervalle_reprise):
+    """Boucle de recalculer_elo quand les lots sont trop courts, mêmes opérations que ClassementElo"""
+    import numpy as np
+    valeurs = cotes.tolist()
+    a, b, s = a.tolist(), b.tolist(), s.tolist()
+    for position in range(debut, len(a), intervalle_reprise):
+        fin = min(position + intervalle_reprise, len(a))
+        for ja, jb, score in zip(a[position:fin], b[position:fin], s[position:fin]):
+            variation = k * (score - 1.0 / (1.0 + 10.0 ** ((valeurs[jb] - valeurs[ja]) / 400.0)))
+            valeurs[ja] += variation
+            valeurs[jb] -= variation
+        if reprise is not None:
+            _sauvegarder(reprise, fin, np.array(valeurs))
+    return np.array(valeurs)
+
+
+def _sauvegarder(chemin, position, cotes):
+    """Écrit un point de reprise de façon atomique"""
+    import numpy as np
+    temporaire = chemin + '.tmp'
+    with open(temporaire, 'wb') as f:
+        np.savez(f, position=position, cotes=cotes)
+    os.replace(temporaire, chemin)
+
+
+def resultats_archive(chemin, cle='classe', taille_lot=1 << 16):
+    """
+    Lit les résultats d'une archive SQLite (core.archive) par blocs, sans
+    passer par des objets Python ligne à ligne
+    Args:
+        chemin (str): Fichier de l'archive
+        cle (str): 'classe' pour classer les classes, 'nom' pour classer les noms
+        taille_lot (int): Lignes lues par bloc
+    Returns:
+        tuple: (joueurs, indices_a, indices_b, scores) pour recalculer_elo
+    """
+    import sqlite3
+    import numpy as np
+    from core.characters import NOMS_CLASSES
+    colonnes = 'classe1, classe2' if cle == 'classe' else 'nom1, nom2'
+    connexion = sqlite3.connect(chemin)
+    try:
+        curseur = connexion.execute(f"SELECT {colonnes}, gagnant FROM parties ORDER BY id")
+        numeros = {}
+        scores_gagnant = np.array((0.5, 1.0, 0.0), dtype=np.float32)  # Nul, joueur 1, joueur 2
+        blocs_a, blocs_b, blocs_s = [], [], []
+        while True:
+            lignes = curseur.fetchmany(taille_lot)
+            if not lignes:
+                break
+            premiers, seconds, gagnants = zip(*lignes)
+            if cle == 'classe':
+                blocs_a.append(np.array(premiers, dtype=np.int32))
+                blocs_b.append(np.array(seconds, dtype=np.int32))
+            else:
+                for bloc, noms in ((blocs_a, premiers), (blocs_b, seconds)):
+                    bloc.append(np.fromiter((numeros.setdefault(nom, len(numeros)) for nom in noms),
+                                            dtype=np.int32, count=len(noms)))
+            blocs_s.append(scores_gagnant[np.array(gagnants, dtype=np.int8)])
+    finally:
+        connexion.close()
+    if cle == 'classe':
+        joueurs = list(NOMS_CLASSES)
+    else:
+        joueurs = list(numeros)
+    vide = np.zeros(0, dtype=np.int32)
+    return (joueurs,
+            np.concatenate(blocs_a) if blocs_a else vide,
+            np.concatenate(blocs_b) if blocs_b else vide,
+            np.concatenate(blocs_s) if blocs_s else np.zeros(0, dtype=np.float32))
@@ -0,0 +1,271 @@
+"""
+Outils en ligne de commande, sans interface graphique
+
+    python main.py simuler archer mage -n 100000 --seed 1
+    python main.py rejouer parties.rep --verifier
+    python main.py tournoi guerrier:agressif mage:prudent archer:aleatoire --parties 200
+    python main.py resoudre tables.bin
+    python main.py balayer --param mage.special_cost=25,30,35 --param pv_max=80,100 --cache balance.jsonl
+    python main.py archive parties.db --paire archer:mage --dernieres 100000
+    python main.py classement parties.db --par nom
+    python main.py escarmouche archer:500,mage:500 guerrier:1000
+
+Ce module n'importe que la bibliothèque standard au chargement : chaque
+sous-commande importe ce dont elle a besoin, et tkinter n'est jamais chargé.
+"""
+import argparse
+import sys
+
+
+def _simuler(args):
+    from core.simulation import simuler_duels, politique_agressive
+    politique = politique_agressive if args.politique == 'agressif' else None
+    resultats = simuler_duels(args.classe1, args.classe2, args.nombre, politique=politique,
+                              max_tours=args.max_tours, seed=args.seed, hasard=_hasard(args))
+    n = args.nombre
+    print(f"{args.classe1} contre {args.classe2} : {n} duels")
+    print(f"  victoires {args.classe1:10} {resultats['victoires_j1']:>10} ({resultats['victoires_j1'] / n:.1%})")
+    print(f"  victoires {args.classe2:10} {resultats['victoires_j2']:>10} ({resultats['victoires_j2'] / n:.1%})")
+    print(f"  nuls                 {resultats['nuls']:>10}")
+    print(f"  tours moyens         {resultats['tours_moyens']:>10.2f}")
+    return 0
+
+
+def _rejouer(args):
+    from core.replay import LecteurReplays, verifier
+    from core.characters import NOMS_CLASSES
+    lecteur = LecteurReplays(args.fichier)
+    try:
+        if args.partie is not None:
+            game = lecteur.aller_a(args.partie, args.tour if args.tour is not None else 1 << 30)
+            for joueur in (game.joueur1, game.joueur2):
+                print(f"{joueur.nom:20} PV {joueur.pv:>3}  énergie {joueur.energie:>2}")
+            if game.gagnant is not None:
+                print(f"Vainqueur : {game.gagnant.nom}")
+            return 0
+        if args.verifier:
+            total = invalides = 0
+            for replay, valide in verifier(lecteur):
+                total += 1
+                if not valide:
+                    invalides += 1
+                    print(f"Partie invalide à la position {replay.offset}")
+            print(f"{total} parties, {invalides} invalide(s)")
+            return 1 if invalides else 0
+        for numero, replay in enumerate(lecteur):
+            etat = '' if replay.complet else ' (incomplète)'
+            print(f"{numero:>6} {replay.nom1} ({NOMS_CLASSES[replay.classe1]}) contre "
+                  f"{replay.nom2} ({NOMS_CLASSES[replay.classe2]}), {len(replay.actions)} actions{etat}")
+        return 0
+    finally:
+        lecteur.fermer()
+
+
+def _hasard(args):
+    """Mécaniques aléatoires demandées par --hasard GRAINE, aucune sinon"""
+    if args.hasard is None:
+        return None
+    from core.hasard import MecaniquesAleatoires
+    return MecaniquesAleatoires(args.hasard)
+
+
+def _tournoi(args):
+    from core.hasard import MecaniquesAleatoires
+    from core.tournoi import lancer_tournoi
+    participants = []
+    for texte in args.participants:
+        classe, _, politique = texte.partition(':')
+        participants.append((classe, politique or 'aleatoire'))
+    resultats = lancer_tournoi(participants, nb_parties=args.parties, workers=args.workers,
+                               seed=args.seed, max_tours=args.max_tours,
+                               hasard=MecaniquesAleatoires(0) if args.hasard else None)
+    noms = [f"{c}:{p}" for c, p in participants]
+    largeur = max(len(nom) for nom in noms)
+    for i, nom in enumerate(noms):
+        victoires = sum(resultats['victoires'][i])
+        nuls = sum(resultats['nuls'][i])
+        print(f"{nom:{largeur}}  victoires {victoires:>7}  nuls {nuls:>7}")
+    return 0
+
+
+def _resoudre(args):
+    from core.characters import classe_id
+    from core.solveur import ecrire_tables, TableSolution
+    if args.consulter:
+        table = TableSolution(args.fichier)
+        try:
+            classe_a, classe_b, pv_a, pv_b, e_a, e_b = args.consulter
+            valeur, action = table.consulter(classe_id(classe_a), classe_id(classe_b),
+                                             int(pv_a), int(pv_b), int(e_a), int(e_b), 0, 0)
+        finally:
+            table.fermer()
+        print(f"valeur {valeur}, meilleure action : {action}")
+        return 0
+    paires = None
+    if args.paire:
+        paires = [tuple(p.split(':')) for p in args.paire]
+    ecrire_tables(args.fichier, paires)
+    print(f"Tables écrites dans {args.fichier}")
+    return 0
+
+
+def _balayer(args):
+    import json
+    from core.balance import balayer
+    grille = {}
+    for texte in args.param:
+        nom, _, valeurs = texte.partition('=')
+        grille[nom] = [json.loads(v) for v in valeurs.split(',')]
+    points = balayer(grille, duels=args.duels, politique=args.politique, max_tours=args.max_tours,
+                     workers=args.workers, cache=args.cache)
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(points, f, indent=2, ensure_ascii=False)
+    for point in points:
+        parametres = ', '.join(f"{nom}={valeur}" for nom, valeur in point['parametres'].items())
+        ecart = max(abs(r['taux_j1'] - r['taux_j2']) for r in point['paires'].values())
+        tours = sum(r['tours_moyens'] for r in point['paires'].values()) / len(point['paires'])
+        origine = ' (cache)' if point['cache'] else ''
+        print(f"{parametres:50} écart max {ecart:6.1%}  tours moyens {tours:6.2f}{origine}")
+    return 0
+
+
+def _archive(args):
+    from core.archive import ArchiveParties
+    archive = ArchiveParties(args.fichier)
+    try:
+        if args.partie is not None:
+            print("\n".join(archive.historique(args.partie)))
+            return 0
+        print(f"{len(archive)} parties archivées")
+        for texte in args.paire or ():
+            classe_a, _, classe_b = texte.partition(':')
+            bilan = archive.taux_victoire(classe_a, classe_b, args.dernieres)
+            print(f"{classe_a} contre {classe_b} : {bilan['parties']} parties, "
+                  f"{classe_a} gagne {bilan['taux_a']:.1%}")
+        if not args.paire:
+            for (classe1, classe2), (n, tours) in archive.durees_par_paire().items():
+                print(f"{classe1:>10} - {classe2:10} {n:>10} parties  {tours:6.2f} actions en moyenne")
+        return 0
+    finally:
+        archive.fermer()
+
+
+def _classement(args):
+    from core.classement import ClassementElo, resultats_archive
+    joueurs, indices_a, indices_b, scores = resultats_archive(args.fichier, cle=args.par)
+    classement = ClassementElo.depuis_resultats(joueurs, indices_a, indices_b, scores, k=args.k,
+                                                reprise=args.reprise)
+    for rang, (joueur, cote, parties) in enumerate(classement.classement(), 1):
+        print(f"{rang:>4}. {str(joueur):20} {cote:8.1f}  ({parties} parties)")
+    return 0
+
+
+def _escarmouche(args):
+    import time
+    from core.equipes import CombatEquipes, creer_equipe
+    equipes = []
+    for texte in (args.equipe1, args.equipe2):
+        equipe = []
+        for groupe in texte.split(','):
+            classe, _, nombre = groupe.partition(':')
+            equipe.extend(creer_equipe(classe, int(nombre or 1)))
+        equipes.append(equipe)
+    combat = CombatEquipes(*equipes)
+    debut = time.perf_counter()
+    gagnant = combat.simuler(max_actions=args.max_actions)
+    duree = time.perf_counter() - debut
+    issue = "aucune équipe éliminée" if gagnant is None else f"victoire de l'équipe {gagnant + 1}"
+    print(f"{issue} après {combat.tour} actions ({duree:.2f} s), survivants : {combat.vivants[0]} / {combat.vivants[1]}")
+    return 0
+
+
+def construire_parser():
+    """
+    Construit l'analyseur des arguments
+    Returns:
+        argparse.ArgumentParser: Analyseur avec les sous-commandes
+    """
+    parser = argparse.ArgumentParser(prog='duel_heroes', description="Duel Heroes sans interface")
+    sous = parser.add_subparsers(dest='commande', required=True)
+
+    p = sous.add_parser('simuler', help="Simule des duels en masse (NumPy)")
+    p.add_argument('classe1')
+    p.add_argument('classe2')
+    p.add_argument('-n', '--nombre', type=int, default=100000)
+    p.add_argument('--politique', choices=('aleatoire', 'agressif'), default='aleatoire')
+    p.add_argument('--max-tours', type=int, default=200)
+    p.add_argument('--seed', type=int)
+    p.add_argument('--hasard', type=int, metavar='GRAINE', help="Échecs, critiques et étourdissements")
+    p.set_defaults(executer=_simuler)
+
+    p = sous.add_parser('rejouer', help="Liste, vérifie ou rejoue un fichier de replays")
+    p.add_argument('fichier')
+    p.add_argument('--verifier', action='store_true', help="Rejoue toutes les parties avec les règles actuelles")
+    p.add_argument('--partie', type=int, help="Rang de la partie à afficher")
+    p.add_argument('--tour', type=int, help="Tour auquel afficher la partie (fin par défaut)")
+    p.set_defaults(executer=_rejouer)
+
+    p = sous.add_parser('tournoi', help="Tournoi entre couples classe:politique")
+    p.add_argument('participants', nargs='+', metavar='classe:politique')
+    p.add_argument('--parties', type=int, default=100)
+    p.add_argument('--workers', type=int, default=1)
+    p.add_argument('--max-tours', type=int, default=200)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--hasard', action='store_true', help="Échecs, critiques et étourdissements")
+    p.set_defaults(executer=_tournoi)
+
+    p = sous.add_parser('resoudre', help="Calcule ou consulte les tables de jeu parfait")
+    p.add_argument('fichier')
+    p.add_argument('--paire', action='append', metavar='classe_a:classe_b',
+                   help="Paire à résoudre (toutes par défaut), répétable")
+    p.add_argument('--consulter', nargs=6, metavar=('CLASSE_A', 'CLASSE_B', 'PV_A', 'PV_B', 'E_A', 'E_B'),
+                   help="Valeur d'une position où le joueur A doit jouer")
+    p.set_defaults(executer=_resoudre)
+
+    p = sous.add_parser('balayer', help="Balayage de paramètres d'équilibrage (NumPy)")
+    p.add_argument('--param', action='append', required=True, metavar='nom=v1,v2,...',
+                   help="Valeurs d'un paramètre, ex. mage.special_cost=25,30 ; répétable")
+    p.add_argument('--duels', type=int, default=20000, help="Duels par paire de classes et par point")
+    p.add_argument('--politique', choices=('aleatoire', 'agressif'), default='aleatoire')
+    p.add_argument('--max-tours', type=int, default=200)
+    p.add_argument('--workers', type=int, default=1)
+    p.add_argument('--cache', help="Fichier de cache des points déjà calculés")
+    p.add_argument('--sortie', help="Fichier JSON des résultats")
+    p.set_defaults(executer=_balayer)
+
+    p = sous.add_parser('archive', help="Statistiques d'une archive SQLite de parties")
+    p.add_argument('fichier')
+    p.add_argument('--paire', action='append', metavar='classe_a:classe_b',
+                   help="Taux de victoire de classe_a contre classe_b, répétable")
+    p.add_argument('--dernieres', type=int, help="Ne compte que les N parties les plus récentes")
+    p.add_argument('--partie', type=int, help="Affiche l'historique d'une partie")
+    p.set_defaults(executer=_archive)
+
+    p = sous.add_parser('classement', help="Classement Elo recalculé depuis une archive (NumPy)")
+    p.add_argument('fichier')
+    p.add_argument('--par', choices=('classe', 'nom'), default='classe', help="Joueurs classés")
+    p.add_argument('-k', type=float, default=32.0)
+    p.add_argument('--reprise', help="Fichier .npz de reprise du calcul")
+    p.set_defaults(executer=_classement)
+
+    p = sous.add_parser('escarmouche', help="Combat entre deux équipes de taille quelconque")
+    p.add_argument('equipe1', metavar='classe:nombre,...')
+    p.add_argument('equipe2', metavar='classe:nombre,...')
+    p.add_argument('--max-actions', type=int)
+    p.set_defaults(executer=_escarmouche)
+    return parser
+
+
+def main(argv=None):
+    """
+    Point d'entrée des outils en ligne de commande
+    Returns:
+        int: Code de retour
+    """
+    args = construire_parser().parse_args(argv)
+    return args.executer(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Diffusion des événements d'une partie à de nombreux spectateurs
+
+Une Diffusion s'abonne aux changements d'un Game (Game.abonner) et encode
+chaque changement une seule fois en une ligne JSON (bytes, immuable) rangée
+dans un anneau de taille fixe. Tous les abonnés lisent ces mêmes bytes sans
+nouvel encodage ; chacun ne tient que la position du dernier événement lu.
+Publier un événement coûte donc le même temps quel que soit le nombre de
+spectateurs, et un spectateur lent ne retarde jamais la partie.
+
+Chaque abonnement a une capacité : quand il a plus de capacite événements
+de retard, sa politique s'applique à la lecture suivante :
+    - 'fusion' : le retard est remplacé par un seul instantané complet de
+      la partie ({"evt": "complet", ...}), puis la lecture reprend ;
+    - 'abandon' : les événements les plus anciens sont perdus, seuls les
+      capacite plus récents sont lus (perdus compte les événements sautés).
+Un nouvel abonnement commence par un instantané complet.
+
+Messages (une ligne JSON chacun, numérotés par seq) :
+    {"evt": "etat", "seq": 12, "pv2": 75, "tour": 2, "journal": 5, "messages": [...]}
+        avec les clés des changements de Game.abonner ; messages contient
+        les messages du journal à partir de l'indice journal, et noms est
+        ajouté quand le journal recommence (journal = 0)
+    {"evt": "complet", "seq": 12, "noms": [...], "pv1": ..., "journal": 0, "messages": [...]}
+"""
+import json
+
+_SEPARATEURS = (',', ':')
+POLITIQUES = ('fusion', 'abandon')
+
+
+def _encoder(message):
+    """Une ligne JSON compacte"""
+    return json.dumps(message, separators=_SEPARATEURS, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+class Diffusion:
+    """Événements encodés d'une partie, partagés par tous ses abonnés"""
+
+    def __init__(self, game, taille=1024):
+        """
+        Args:
+            game (Game): Partie diffusée
+            taille (int): Événements gardés pour les abonnés en retard
+        """
+        self.game = game
+        self.taille = taille
+        self.sequence = 0  # Numéro du dernier événement publié
+        self.abonnements = []
+        self._anneau = [None] * taille
+        self._instantane = None  # (sequence, bytes) du dernier instantané encodé
+        self._rappels = []  # Abonnés à réveiller au prochain événement
+        game.abonner(self._publier)
+
+    def abonner(self, capacite=64, politique='fusion'):
+        """
+        Ajoute un spectateur
+        Args:
+            capacite (int): Retard maximal en événements, au plus la taille de l'anneau
+            politique (str): 'fusion' ou 'abandon' quand le retard dépasse la capacité
+        Returns:
+            Abonnement: File de lecture du spectateur
+        """
+        if politique not in POLITIQUES:
+            raise ValueError(f"Politique inconnue : {politique}")
+        if not 0 < capacite <= self.taille:
+            raise ValueError(f"La capacité doit être comprise entre 1 et {self.taille}")
+        abonnement = Abonnement(self, capacite, politique)
+        self.abonnements.append(abonnement)
+        return abonnement
+
+    def desabonner(self, abonnement):
+        """Retire un spectateur"""
+        self.abonnements.remove(abonnement)
+        abonnement.ferme = True
+        self._reveiller()
+
+    def fermer(self):
+        """Cesse de suivre la partie ; les abonnés lisent ce qui reste puis sont fermés"""
+        if self._publier in self.game.observateurs:
+            self.game.desabonner(self._publier)
+        for abonnement in self.abonnements:
+            abonnement.ferme = True
+        self.abonnements.clear()
+        self._reveiller()
+
+    def _publier(self, changements):
+        """Observateur du Game : encode le changement une fois et le range dans l'anneau"""
+        self.sequence += 1
+        message = {'evt': 'etat', 'seq': self.sequence}
+        message.update(changements)
+        debut = changements.get('journal')
+        if debut is not None:
+            if debut == 0:  # Nouveau combat ou journal recommencé : les noms sont rappelés
+                message['noms'] = [joueur.nom for joueur in self.game.journal.joueurs]
+            message['messages'] = list(self.game.journal.messages(debut))
+        self._anneau[self.sequence % self.taille] = _encoder(message)
+        if self._rappels:
+            self._reveiller()
+
+    def _reveiller(self):
+        """Appelle une fois chaque rappel en attente"""
+        rappels, self._rappels = self._rappels, []
+        for rappel in rappels:
+            rappel()
+
+    def instantane(self):
+        """
+        État complet de la partie, encodé une fois par numéro d'événement
+        Returns:
+            bytes: Ligne JSON {"evt": "complet", ...}
+        """
+        if self._instantane is not None and self._instantane[0] == self.sequence:
+            return self._instantane[1]
+        game = self.game
+        j1, j2 = game.joueur1, game.joueur2
+        message = {'evt': 'complet', 'seq': self.sequence,
+                   'noms': [j1.nom if j1 else None, j2.nom if j2 else None]}
+        if game.moteur_combat:
+            message.update(
+                pv1=j1.pv, pv2=j2.pv, energie1=j1.energie, energie2=j2.energie,
+                tour=game.get_joueur_actuel(),
+                gagnant=None if game.gagnant is None else (1 if game.gagnant is j1 else 2),
+                journal=0, messages=list(game.journal.messages()))
+        donnees = _encoder(message)
+        self._instantane = (self.sequence, donnees)
+        return donnees
+
+
+class Abonnement:
+    """Position d'un spectateur dans l'anneau d'une Diffusion"""
+    __slots__ = ('diffusion', 'capacite', 'politique', 'position', 'perdus', 'ferme')
+
+    def __init__(self, diffusion, capacite, politique):
+        self.diffusion = diffusion
+        self.capacite = capacite
+        self.politique = politique
+        self.position = None  # Dernier événement lu, None avant l'instantané initial
+        self.perdus = 0  # Événements sautés ou remplacés par un instantané
+        self.ferme = False
+
+    def __len__(self):
+        """Nombre de messages à lire, instantané compris"""
+        if self.position is None:
+            return 1
+        retard = self.diffusion.sequence - self.position
+        if retard > self.capacite:
+            return 1 if self.politique == 'fusion' else self.capacite
+        return retard
+
+    def lire(self):
+        """
+        Lit tous les messages en attente
+        Returns:
+            list[bytes]: Lignes JSON, partagées avec les autres abonnés
+        """
+        diffusion = self.diffusion
+        fin = diffusion.sequence
+        position = self.position
+        if position is None:
+            self.position = fin
+            return [diffusion.instantane()]
+        retard = fin - position
+        if retard > self.capacite:
+            if self.politique == 'fusion':
+                self.perdus += retard
+                self.position = fin
+                return [diffusion.instantane()]
+            self.perdus += retard - self.capacite
+            position = fin - self.capacite
+        self.position = fin
+        anneau, taille = diffusion._anneau, diffusion.taille
+        return [anneau[numero % taille] for numero in range(position + 1, fin + 1)]
+
+    def attendre(self, rappel):
+        """
+        Demande un rappel au prochain événement (ou à la fermeture)
+        Args:
+            rappel: Fonction sans argument, appelée une seule fois
+        Returns:
+            bool: False si des messages sont déjà en attente (rien n'est enregistré)
+        """
+        if len(self) or self.ferme:
+            return False
+        self.diffusion._rappels.append(rappel)
+        return True
@@ -1,86 +1,226 @@
+"""
+Moteur de règles du duel
+
+step(etat, action) est la seule implémentation des règles d'un tour : elle
+prend un état compact (core.etat) et un identifiant d'action (core.registre)
+et renvoie (nouvel état, issue, dégâts infligés), en n'utilisant que des
+opérations sur les entiers, sans texte ni objet intermédiaire. Game,
+l'IA et les outils sans interface s'appuient dessus ; les messages du
+journal sont construits à partir de l'issue et des dégâts.
+
+Règles :
+    - une attaque coûte son énergie, refusée (REFUSEE) si elle manque ;
+    - le premier coup reçu par un défenseur est divisé par deux (au moins 1)
+      et consomme la défense, sauf attaque qui ignore la défense, qui la
+      laisse en place ;
+    - une recharge est plafonnée à l'énergie maximale ;
+    - si la cible tombe à 0 PV, l'issue est KO et le tour ne passe pas ;
+      sinon (SUIVANT) le tour passe, la défense du nouveau joueur courant
+      retombe et le compteur de tours avance.
+
+Avec des mécaniques aléatoires (core.hasard.MecaniquesAleatoires), les
+tirages d'une attaque dépendent de la graine et du numéro de tour :
+    - une attaque manquée (ECHEC) ne fait aucun dégât et laisse la défense ;
+    - un coup critique (CRITIQUE) multiplie les dégâts ;
+    - la spéciale d'une classe qui peut étourdir (ETOURDISSEMENT) fait
+      perdre son prochain tour à la cible : le même joueur rejoue, les deux
+      défenses retombent et le compteur de tours avance d'un seul tour.
+Ces effets sont des bits ajoutés à l'issue ; issue & ISSUE donne REFUSEE,
+SUIVANT ou KO.
+
+CombatEngine tient les deux Personnage d'une partie et leur applique step.
+"""
+from core.characters import CLASSES
+from core.hasard import TIRAGE_ECHEC, TIRAGE_CRITIQUE, TIRAGE_ETOURDISSEMENT, seuil
+from core.registre import ACTIONS, SPECIAL, FRAPPE, DEFENSE
+
+# Issue d'une action, et effets des mécaniques aléatoires
+REFUSEE, SUIVANT, KO = range(3)
+ISSUE = 3
+ECHEC, CRITIQUE, ETOURDISSEMENT = 4, 8, 16
+
+_MASQUE_PV = 0x7F
+_MASQUE_ENERGIE = 0x3F
+_BIT_DEFENSE_ADVERSE = 1 << 26
+_BIT_COTE = 1 << 27
+_BIT_DEFENSE_COURANT = 1 << 28
+_UN_TOUR = 1 << 35
+_SANS_DEFENSES = ~(_BIT_DEFENSE_ADVERSE | _BIT_COTE | _BIT_DEFENSE_COURANT)
+
+_NB_ACTIONS = len(ACTIONS)
+
+# Par (classe, action), à l'indice classe * _NB_ACTIONS + action :
+# (nature, montant, dégâts sur un défenseur, coût, énergie maximale, seuil
+# d'étourdissement). Le montant est la somme des coups d'une attaque ou le
+# gain d'une recharge ; les dégâts sur un défenseur valent 0 pour une
+# attaque qui ignore la défense ; seule la spéciale peut étourdir.
+# Complété à la demande, pour les classes enregistrées après l'import.
+_REGLES = []
+
+
+def _regles(indice):
+    """Règles d'une action d'une classe, voir _REGLES"""
+    while len(_REGLES) <= indice:
+        type_perso = CLASSES[len(_REGLES) // _NB_ACTIONS]
+        energie_max = type_perso('').energie_max
+        etourdissement = seuil(type_perso.chance_etourdissement)
+        for action, (nature, valeur, coups, cout, ignore_defense) in enumerate(type_perso.actions):
+            if nature == FRAPPE:
+                defendu = 0 if ignore_defense else (valeur // 2 or 1) + valeur * (coups - 1)
+                _REGLES.append((nature, valeur * coups, defendu, cout, energie_max,
+                                etourdissement if action == SPECIAL else 0))
+            else:
+                _REGLES.append((nature, valeur, 0, cout, energie_max, 0))
+    return _REGLES[indice]
+
+
+def etat_initial(classe1, classe2, pv=100, energie=50):
+    """
+    État compact d'un duel qui commence
+    Args:
+        classe1, classe2 (int): Identifiants de classe des joueurs 1 et 2
+    Returns:
+        int: État, au joueur 1 de jouer
+    """
+    return pv | pv << 7 | energie << 14 | energie << 20 | classe1 << 29 | classe2 << 32
+
+
+def step(etat, action, hasard=None):
+    """
+    Joue une action pour le joueur courant
+    Args:
+        etat (int): État compact (core.etat)
+        action (int): Identifiant d'action (ATTAQUER, SPECIAL, DEFENDRE, RECHARGER)
+        hasard (MecaniquesAleatoires): Mécaniques aléatoires, aucune par défaut
+    Returns:
+        tuple: (nouvel état, REFUSEE/SUIVANT/KO et bits d'effets, dégâts infligés)
+    """
+    if not etat & _MASQUE_PV or not etat & _MASQUE_PV << 7:
+        return etat, REFUSEE, 0  # Combat déjà terminé
+    if etat & _BIT_COTE:
+        decalage_pv, decalage_energie, indice = 0, 20, (etat >> 32 & 7) * _NB_ACTIONS + action
+    else:
+        decalage_pv, decalage_energie, indice = 7, 14, (etat >> 29 & 7) * _NB_ACTIONS + action
+    try:
+        nature, montant, defendu, cout, energie_max, etourdissement = _REGLES[indice]
+    except IndexError:  # Classe enregistrée depuis le dernier appel
+        nature, montant, defendu, cout, energie_max, etourdissement = _regles(indice)
+    energie = etat >> decalage_energie & _MASQUE_ENERGIE
+
+    degats = 0
+    effets = 0
+    defense_courant = etat & _BIT_DEFENSE_COURANT
+    if nature == FRAPPE:
+        if energie < cout:
+            return etat, REFUSEE, 0
+        pv = etat >> decalage_pv & _MASQUE_PV
+        if hasard is not None and hasard.tirer(etat >> 35, TIRAGE_ECHEC) < hasard.seuil_echec:
+            effets = ECHEC  # Attaque manquée : ni dégâts ni défense consommée
+        else:
+            if etat & _BIT_DEFENSE_ADVERSE and defendu:
+                # Premier coup divisé par deux, la défense est consommée
+                degats = defendu
+                etat &= ~_BIT_DEFENSE_ADVERSE
+            else:
+                degats = montant
+            if hasard is not None and hasard.tirer(etat >> 35, TIRAGE_CRITIQUE) < hasard.seuil_critique:
+                degats *= hasard.multiplicateur_critique
+                effets = CRITIQUE
+        pv = pv - degats if pv > degats else 0
+        etat = (etat & ~(_MASQUE_PV << decalage_pv | _MASQUE_ENERGIE << decalage_energie)
+                | pv << decalage_pv | energie - cout << decalage_energie)
+        if not pv:
+            return etat, KO | effets, degats
+        if (etourdissement and hasard is not None and hasard.etourdissement and not effets & ECHEC
+                and hasard.tirer(etat >> 35, TIRAGE_ETOURDISSEMENT) < etourdissement):
+            # La cible perd son tour : le joueur courant rejoue
+            etat = (etat & _SANS_DEFENSES) + _UN_TOUR | (etat & _BIT_COTE)
+            return etat, SUIVANT | effets | ETOURDISSEMENT, degats
+    elif nature == DEFENSE:
+        defense_courant = _BIT_DEFENSE_COURANT
+    else:
+        energie = energie + montant if energie + montant < energie_max else energie_max
+        etat = etat & ~(_MASQUE_ENERGIE << decalage_energie) | energie << decalage_energie
+
+    # Le tour passe : l'ancien joueur courant devient l'adversaire (avec sa
+    # défense), celle du nouveau joueur courant retombe
+    etat = ((etat & _SANS_DEFENSES) + _UN_TOUR
+            | (etat & _BIT_COTE ^ _BIT_COTE) | (_BIT_DEFENSE_ADVERSE if defense_courant else 0))
+    return etat, SUIVANT | effets, degats
+
+
 class CombatEngine:
-    def __init__(self, player1, player2):
-        """
-        Initialise le moteur de combat avec deux joueurs
-        Args:
-            player1: Instance de Personnage (joueur 1)
-            player2: Instance de Personnage (joueur 2)
-        """
-        self.players = [player1, player2]
-        self.current_turn = 0  # 0 pour joueur1, 1 pour joueur2
-        self.combat_log = []
+    """Tours d'un duel entre deux Personnage, joués par step"""
+
+    def __init__(self, joueur1, joueur2):
+        self.joueur1 = joueur1
+        self.joueur2 = joueur2
+        self.tour_joueur1 = True  # True = tour du joueur1, False = tour du joueur2
+        self.tour = 0  # Nombre de tours déjà joués
         self.is_combat_over = False
 
     def start_combat(self):
-        """Initialise les variables pour un nouveau combat"""
-        self.combat_log.append("Le combat commence!")
-        self._reset_players_state()
+        """Réinitialise l'état pour un nouveau combat"""
+        self.tour_joueur1 = True
+        self.tour = 0
+        self.is_combat_over = False
+        # Réinitialise l'état des joueurs
+        self.joueur1.pv = self.joueur1.pv_max
+        self.joueur1.energie = self.joueur1.energie_max
+        self.joueur2.pv = self.joueur2.pv_max
+        self.joueur2.energie = self.joueur2.energie_max
+        self.joueur1.is_defending = False
+        self.joueur2.is_defending = False
+
+    def get_current_player(self):
+        """Retourne le joueur dont c'est le tour"""
+        return self.joueur1 if self.tour_joueur1 else self.joueur2
 
-    def execute_turn(self, action, target=None):
+    def etat(self):
         """
-        Exécute une action pour le joueur courant
-        Args:
-            action: str ('attack', 'special', 'defend', 'recharge')
-            target: Personnage cible (None pour défense/recharge)
+        État compact des deux personnages et du tour
         Returns:
-            bool: True si l'action a été exécutée avec succès
+            int: État, voir core.etat
         """
-        if self.is_combat_over:
-            return False
-
-        current_player = self.players[self.current_turn]
-        opponent = self.players[1 - self.current_turn]
-
-        if action == 'attack':
-            result = current_player.attack(opponent)
-            self.combat_log.append(result)
-        elif action == 'special':
-            if current_player.energy >= current_player.special_cost:
-                result = current_player.special_attack(opponent)
-                self.combat_log.append(result)
-            else:
-                self.combat_log.append(f"{current_player.name} n'a pas assez d'énergie!")
-                return False
-        elif action == 'defend':
-            current_player.is_defending = True
-            self.combat_log.append(f"{current_player.name} se met en défense!")
-        elif action == 'recharge':
-            current_player.recharge_energy()
-            self.combat_log.append(f"{current_player.name} recharge son énergie!")
-
-        self._check_combat_end()
-        if not self.is_combat_over:
-            self._next_turn()
-        
-        return True
-
-    def _next_turn(self):
-        """Passe au tour suivant"""
-        self.current_turn = 1 - self.current_turn
-        current_player = self.players[self.current_turn]
-        current_player.is_defending = False  # Réinitialise la défense
-        self.combat_log.append(f"C'est au tour de {current_player.name}!")
-
-    def _check_combat_end(self):
-        """Vérifie si le combat est terminé"""
-        for player in self.players:
-            if player.hp <= 0:
-                self.is_combat_over = True
-                winner = self.players[1 - self.players.index(player)]
-                self.combat_log.append(f"{winner.name} remporte le combat!")
-                break
-
-    def _reset_players_state(self):
-        """Réinitialise l'état des joueurs pour un nouveau combat"""
-        for player in self.players:
-            player.hp = player.max_hp
-            player.energy = player.max_energy
-            player.is_defending = False
-
-    def get_combat_log(self):
-        """Retourne l'historique du combat"""
-        return "\n".join(self.combat_log)
+        j1, j2 = self.joueur1, self.joueur2
+        if self.tour_joueur1:
+            defenses = j2.is_defending << 26 | j1.is_defending << 28
+        else:
+            defenses = j1.is_defending << 26 | _BIT_COTE | j2.is_defending << 28
+        return (j1.pv | j2.pv << 7 | j1.energie << 14 | j2.energie << 20 | defenses
+                | j1.identifiant << 29 | j2.identifiant << 32 | self.tour << 35)
 
-    def get_current_player(self):
-        """Retourne le joueur dont c'est le tour"""
-        return self.players[self.current_turn]
+    def jouer(self, action, hasard=None):
+        """
+        Joue une action du joueur courant et reporte le résultat sur les personnages
+        Args:
+            action (int): Identifiant d'action
+            hasard (MecaniquesAleatoires): Mécaniques aléatoires, aucune par défaut
+        Returns:
+            tuple: (issue et bits d'effets, dégâts infligés), comme step
+        """
+        j1, j2 = self.joueur1, self.joueur2
+        if self.tour_joueur1:
+            defenses = j2.is_defending << 26 | j1.is_defending << 28
+        else:
+            defenses = j1.is_defending << 26 | _BIT_COTE | j2.is_defending << 28
+        etat, issue, degats = step(j1.pv | j2.pv << 7 | j1.energie << 14 | j2.energie << 20 | defenses
+                                   | j1.identifiant << 29 | j2.identifiant << 32 | self.tour << 35, action, hasard)
+        if issue == REFUSEE:
+            return issue, degats
+        j1.pv = etat & _MASQUE_PV
+        j2.pv = etat >> 7 & _MASQUE_PV
+        j1.energie = etat >> 14 & _MASQUE_ENERGIE
+        j2.energie = etat >> 20 & _MASQUE_ENERGIE
+        if (issue & ISSUE) == KO:
+            self.is_combat_over = True
+            (j2 if self.tour_joueur1 else j1).is_defending = bool(etat & _BIT_DEFENSE_ADVERSE)
+        else:
+            # Le tour a passé (ou la cible étourdie a perdu le sien) : le nouvel
+            # adversaire garde sa défense, celle du joueur courant retombe
+            self.tour_joueur1 = not etat & _BIT_COTE
+            self.tour += 1
+            courant, adverse = (j1, j2) if self.tour_joueur1 else (j2, j1)
+            adverse.is_defending = bool(etat & _BIT_DEFENSE_ADVERSE)
+            courant.is_defending = False
+        return issue, degats
@@ -0,0 +1,164 @@
+"""
+Environnement d'apprentissage par renforcement, par lots
+
+Interface proche de Gym vectorisé : reset(n) puis step(actions) sur N duels
+indépendants, avec des tableaux NumPy d'observations, de récompenses et de
+fins d'épisode. Les duels sont ceux de core.simulation, donc les règles de
+Game.executer_action.
+
+Sans adversaire, l'agent joue les deux camps : l'observation et la
+récompense sont celles du joueur courant. Avec une politique adverse
+vectorisée (par exemple politique_aleatoire), l'agent joue toujours le
+joueur 1 et l'adversaire répond dans le même appel à step.
+
+Une spéciale sans assez d'énergie est refusée comme dans le jeu : le tour ne
+passe pas. masque_actions() indique les actions possibles de chaque duel ;
+une action refusée de l'adversaire est remplacée par une recharge.
+Les épisodes terminés repartent sur place, sans réallocation ; un épisode
+arrêté par max_tours est signalé comme tronqué dans les infos de step, avec
+son observation finale.
+"""
+import numpy as np
+
+from core.characters import CLASSES
+from core.registre import RECHARGER
+from core.simulation import SimulateurLot, AUCUNE, REGLES
+
+
+class EnvironnementDuel:
+    """N duels indépendants vus par un agent"""
+
+    def __init__(self, classes1=None, classes2=None, adversaire=None, max_tours=200,
+                 penalite_invalide=0.0, regles=None, seed=None):
+        """
+        Args:
+            classes1, classes2: Identifiant de classe de chaque camp, tirée au hasard
+                à chaque épisode si None
+            adversaire: Politique vectorisée (sim, rng) -> actions du joueur 2, ou None
+            max_tours (int): Limite d'actions par épisode, au-delà l'épisode est tronqué
+            penalite_invalide (float): Récompense d'une action refusée
+            regles (dict): Tables de core.simulation.compiler_regles, REGLES par défaut
+            seed (int): Graine du générateur aléatoire
+        """
+        self.classes1 = classes1
+        self.classes2 = classes2
+        self.adversaire = adversaire
+        self.max_tours = max_tours
+        self.penalite_invalide = penalite_invalide
+        self.regles = REGLES if regles is None else regles
+        self.rng = np.random.default_rng(seed)
+        self.nb_classes = len(CLASSES)
+        self.taille_observation = 6 + 2 * self.nb_classes
+        self.nb_actions = 4
+        self.sim = None
+
+    def _tirer_classes(self, selection):
+        """Choisit les classes des épisodes sélectionnés"""
+        n = self.sim.classes[0, selection].size
+        for camp, classe in enumerate((self.classes1, self.classes2)):
+            if classe is None:
+                self.sim.classes[camp, selection] = self.rng.integers(0, self.nb_classes, n)
+            else:
+                self.sim.classes[camp, selection] = classe
+        self.sim._cle[:, selection] = self.sim.classes[:, selection] * 5
+
+    def reset(self, n):
+        """
+        Démarre n épisodes
+        Returns:
+            np.ndarray: Observations (n, taille_observation) en float32
+        """
+        self.sim = SimulateurLot(np.zeros(n, dtype=np.int16), np.zeros(n, dtype=np.int16), n, self.regles)
+        self.n = n
+        self._observations = np.zeros((n, self.taille_observation), dtype=np.float32)
+        self._recompenses = np.zeros(n, dtype=np.float32)
+        self._fins = np.zeros(n, dtype=bool)
+        self._lignes = np.arange(n)
+        self._tirer_classes(slice(None))
+        self._jouer_adversaire()
+        return self.observations()
+
+    def masque_actions(self):
+        """
+        Actions possibles du joueur courant de chaque épisode
+        Returns:
+            np.ndarray: Tableau (n, 4) de booléens
+        """
+        return self.sim.actions_valides()
+
+    def observations(self):
+        """
+        Observation du point de vue du joueur courant :
+        pv et énergie (normalisés) du joueur puis de l'adversaire, défenses,
+        puis les classes des deux camps en one-hot
+        Returns:
+            np.ndarray: Tableau (n, taille_observation), réutilisé d'un appel à l'autre
+        """
+        sim, obs = self.sim, self._observations
+        pv_max, energie_max = self.regles['pv_max'], self.regles['energie_max']
+        obs[:, 0] = sim.actif(sim.pv) / pv_max
+        obs[:, 1] = sim.passif(sim.pv) / pv_max
+        obs[:, 2] = sim.actif(sim.energie) / energie_max
+        obs[:, 3] = sim.passif(sim.energie) / energie_max
+        obs[:, 4] = sim.actif(sim.is_defending)
+        obs[:, 5] = sim.passif(sim.is_defending)
+        obs[:, 6:] = 0
+        obs[self._lignes, 6 + sim.actif(sim.classes)] = 1
+        obs[self._lignes, 6 + self.nb_classes + sim.passif(sim.classes)] = 1
+        return obs
+
+    def step(self, actions):
+        """
+        Joue une action dans chaque épisode
+        Args:
+            actions: Tableau de n identifiants d'action (voir core.registre.ACTIONS)
+        Returns:
+            tuple: (observations, récompenses, fins, infos) ; fins marque les
+                épisodes terminés par K.O. ou tronqués à max_tours, remis à zéro.
+                infos contient 'succes' (action exécutée), 'gagnant' (0, 1 ou -1
+                pour les épisodes finis, vainqueur avant la remise à zéro),
+                'tronques' (épisodes arrêtés par max_tours, sans vainqueur : leur
+                valeur n'est pas nulle) et 'tours' ; quand un épisode finit,
+                'observations_finales' contient les observations d'avant la remise
+                à zéro (lignes des épisodes finis)
+        """
+        sim = self.sim
+        recompenses, fins = self._recompenses, self._fins
+        succes = sim.step(np.asarray(actions, dtype=np.int16))
+
+        # +1 pour le joueur qui met l'adversaire K.O., -1 pour l'agent battu par l'adversaire
+        recompenses[:] = np.where(succes, 0.0, self.penalite_invalide)
+        if self.adversaire is None:
+            recompenses += sim.gagnant >= 0
+        else:
+            self._jouer_adversaire()
+            recompenses += (sim.gagnant == 0)
+            recompenses -= (sim.gagnant == 1)
+
+        np.greater_equal(sim.gagnant, 0, out=fins)
+        tronques = (sim.tours >= self.max_tours) & ~fins
+        fins |= tronques
+        infos = {'succes': succes, 'gagnant': np.where(fins, sim.gagnant, -1), 'tronques': tronques,
+                 'tours': sim.tours.copy()}
+        if fins.any():
+            infos['observations_finales'] = self.observations().copy()
+            termines = np.flatnonzero(fins)
+            sim.reset(termines)
+            self._tirer_classes(termines)
+            self._jouer_adversaire()
+        return self.observations(), recompenses, fins, infos
+
+    def _jouer_adversaire(self):
+        """Fait jouer l'adversaire dans les épisodes où c'est au joueur 2"""
+        if self.adversaire is None:
+            return
+        sim = self.sim
+        a_jouer = sim.joueur & (sim.gagnant < 0)
+        while a_jouer.any():
+            actions = np.asarray(self.adversaire(sim, self.rng), dtype=np.int16)
+            # Une action refusée ne passerait pas le tour : l'adversaire recharge à la place
+            connues = (actions >= 0) & (actions < self.nb_actions)
+            jouables = connues & sim.actions_valides()[self._lignes, np.where(connues, actions, 0)]
+            actions = np.where(jouables, actions, RECHARGER)
+            sim.step(np.where(a_jouer, actions, AUCUNE))
+            a_jouer = sim.joueur & (sim.gagnant < 0)
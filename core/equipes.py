@@ -0,0 +1,176 @@
+"""
+Combats d'équipes, N contre N
+
+Deux équipes de Personnage, de tailles quelconques, s'affrontent avec les
+mêmes actions et les mêmes règles que le duel (core.game) : une spéciale
+sans assez d'énergie est refusée sans passer le tour, la défense est
+consommée par le premier coup reçu et retombe au début du tour suivant du
+défenseur.
+
+L'ordre de jeu est tenu par une file de priorité : chaque combattant y a
+une entrée (instant de sa prochaine action, initiative, indice). Il joue à
+l'instant 0 puis toutes les DUREE_CYCLE / vitesse unités de temps ; à
+instant égal, la plus forte initiative joue d'abord. Les combattants mis
+K.O. sont retirés paresseusement quand ils arrivent en tête de file.
+Chaque équipe tient aussi un tas de ses combattants par PV croissants pour
+la cible automatique, et le nombre de ses survivants : choisir le prochain
+acteur, la cible la plus faible et détecter une équipe éliminée coûte au
+plus O(log n).
+"""
+import heapq
+
+from core.characters import REGISTRE
+from core.registre import ACTIONS, FRAPPE, DEFENSE
+
+DUREE_CYCLE = 120.0  # Temps entre deux actions d'un combattant de vitesse 1
+
+_CODES = {nom: code for code, nom in enumerate(ACTIONS)}
+_CODES.update((code, code) for code in range(len(ACTIONS)))
+
+
+def creer_equipe(classe, nombre, prefixe=None):
+    """
+    Crée une équipe de personnages d'une même classe
+    Args:
+        classe (str): Nom d'une classe du registre
+        nombre (int): Nombre de personnages
+        prefixe (str): Début des noms, le libellé de la classe par défaut
+    Returns:
+        list[Personnage]: Personnages nommés prefixe 1, prefixe 2...
+    """
+    type_perso = REGISTRE[classe.lower()]
+    prefixe = prefixe or type_perso.definition['libelle']
+    return [type_perso(f"{prefixe} {i}") for i in range(1, nombre + 1)]
+
+
+class CombatEquipes:
+    """Combat entre deux équipes, joué action par action"""
+
+    def __init__(self, equipe1, equipe2, initiatives=None):
+        """
+        Args:
+            equipe1, equipe2 (list[Personnage]): Combattants de chaque équipe
+            initiatives (list[int]): Initiative de chaque combattant (équipe 1 puis
+                équipe 2), sa vitesse par défaut
+        """
+        self.combattants = list(equipe1) + list(equipe2)
+        taille1 = len(equipe1)
+        self.camps = bytes(0 if i < taille1 else 1 for i in range(len(self.combattants)))
+        if initiatives is None:
+            initiatives = [c.vitesse for c in self.combattants]
+        self.initiatives = list(initiatives)
+        self.tour = 0  # Actions réussies
+        self.gagnant = None  # 0 ou 1 : équipe victorieuse
+
+        self.vivants = [0, 0]
+        self._file = []
+        self._cibles = ([], [])  # Par équipe : (pv, indice), entrées périmées ignorées
+        for i, combattant in enumerate(self.combattants):
+            if not combattant.est_ko():
+                self.vivants[self.camps[i]] += 1
+                self._file.append((0.0, -self.initiatives[i], i))
+                self._cibles[self.camps[i]].append((combattant.pv, i))
+        heapq.heapify(self._file)
+        for tas in self._cibles:
+            heapq.heapify(tas)
+        if 0 in self.vivants:
+            self.gagnant = 1 if self.vivants[0] == 0 else 0
+
+    @property
+    def est_termine(self):
+        return self.gagnant is not None
+
+    def acteur(self):
+        """
+        Indice du combattant dont c'est le tour
+        Returns:
+            int: Indice dans self.combattants, None si le combat est terminé
+        """
+        if self.gagnant is not None:
+            return None
+        file = self._file
+        while self.combattants[file[0][2]].est_ko():
+            heapq.heappop(file)
+        return file[0][2]
+
+    def cible_auto(self, camp):
+        """
+        Combattant vivant d'une équipe ayant le moins de PV
+        Args:
+            camp (int): 0 ou 1
+        Returns:
+            int: Indice dans self.combattants, None si l'équipe est éliminée
+        """
+        tas = self._cibles[camp]
+        combattants = self.combattants
+        while tas and (combattants[tas[0][1]].pv != tas[0][0] or combattants[tas[0][1]].est_ko()):
+            heapq.heappop(tas)
+        return tas[0][1] if tas else None
+
+    def executer_action(self, action, cible=None):
+        """
+        Exécute une action pour le combattant dont c'est le tour
+        Args:
+            action (str|int): 'attaquer', 'special', 'defendre', 'recharger' ou son identifiant
+            cible (int): Indice d'un adversaire vivant, le plus faible par défaut
+        Returns:
+            tuple: (succès(bool), est_fini(bool)), comme Game.executer_action
+        """
+        code = _CODES.get(action)
+        if code is None or self.gagnant is not None:
+            return False, False
+        i = self.acteur()
+        joueur = self.combattants[i]
+        camp = self.camps[i]
+        nature, valeur, coups, cout, ignore_defense = joueur.actions[code]
+        if nature == FRAPPE:
+            if cible is None:
+                cible = self.cible_auto(1 - camp)
+            elif (not isinstance(cible, int) or not 0 <= cible < len(self.combattants)
+                  or self.camps[cible] == camp or self.combattants[cible].est_ko()):
+                return False, False  # Pas un adversaire vivant
+            if joueur.energie < cout:
+                return False, False
+            joueur.energie -= cout
+            adversaire = self.combattants[cible]
+            joueur.porter_coups(adversaire, valeur, coups, ignore_defense)
+            if adversaire.est_ko():
+                self.vivants[1 - camp] -= 1
+                if self.vivants[1 - camp] == 0:
+                    self.gagnant = camp
+                    self.tour += 1
+                    return True, True
+            else:
+                heapq.heappush(self._cibles[1 - camp], (adversaire.pv, cible))
+        elif nature == DEFENSE:
+            joueur.is_defending = True
+        else:
+            joueur.recharger_energie(valeur)
+
+        # Prochaine action de l'acteur, puis début du tour du suivant
+        temps, priorite, _ = self._file[0]
+        heapq.heapreplace(self._file, (temps + DUREE_CYCLE / joueur.vitesse, priorite, i))
+        self.combattants[self.acteur()].is_defending = False
+        self.tour += 1
+        return True, False
+
+    def simuler(self, choisir=None, max_actions=None):
+        """
+        Joue le combat jusqu'à sa fin
+        Args:
+            choisir: Fonction (combat, indice de l'acteur) -> (action, cible ou None) ;
+                spéciale dès que possible sur la cible la plus faible par défaut
+            max_actions (int): Limite d'actions, aucune par défaut
+        Returns:
+            int: Équipe victorieuse (0 ou 1), None si la limite est atteinte
+        """
+        while self.gagnant is None and (max_actions is None or self.tour < max_actions):
+            i = self.acteur()
+            if choisir is None:
+                joueur = self.combattants[i]
+                action, cible = ('special' if joueur.energie >= joueur.special_cost else 'attaquer'), None
+            else:
+                action, cible = choisir(self, i)
+            if not self.executer_action(action, cible)[0]:
+                self.executer_action('recharger')
+        return self.gagnant
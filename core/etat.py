@@ -0,0 +1,146 @@
+"""
+État compact d'un duel
+
+L'état complet d'un duel tient dans un entier Python : instantané et
+restauration coûtent quelques décalages de bits, sans copie d'objets.
+
+Disposition des bits (poids faible en premier) :
+    0-6   pv du joueur 1          7-13  pv du joueur 2
+    14-19 énergie du joueur 1     20-25 énergie du joueur 2
+    26    défense de l'adversaire du joueur courant
+    27    joueur courant (0 = joueur 1)
+    28    défense du joueur courant (toujours 0 en début de tour)
+    29-31 classe du joueur 1      32-34 classe du joueur 2
+    35+   numéro du tour
+Les 28 bits de poids faible forment la clé de position utilisée par l'IA.
+"""
+from core.characters import CLASSES
+
+_MASQUE_PV = 0x7F
+_MASQUE_ENERGIE = 0x3F
+_MASQUE_CLASSE = 0x7
+MASQUE_POSITION = (1 << 28) - 1
+
+
+def cle_position(pv1, pv2, energie1, energie2, defense, cote):
+    """
+    Clé d'une position en début de tour (pv sur 7 bits, énergie sur 6 bits)
+    Args:
+        defense (int): 1 si l'adversaire du joueur courant est en défense
+        cote (int): 0 si c'est au joueur 1 de jouer, 1 sinon
+    Returns:
+        int: Clé de la position
+    """
+    return pv1 | pv2 << 7 | energie1 << 14 | energie2 << 20 | defense << 26 | cote << 27
+
+
+class EtatDuel:
+    """Valeurs d'un duel à un instant donné, sans dictionnaire d'instance"""
+    __slots__ = ('pv1', 'pv2', 'energie1', 'energie2', 'defense1', 'defense2',
+                 'cote', 'classe1', 'classe2', 'tour')
+
+    def __init__(self, pv1=0, pv2=0, energie1=0, energie2=0, defense1=0, defense2=0,
+                 cote=0, classe1=0, classe2=0, tour=0):
+        self.pv1 = pv1
+        self.pv2 = pv2
+        self.energie1 = energie1
+        self.energie2 = energie2
+        self.defense1 = defense1
+        self.defense2 = defense2
+        self.cote = cote
+        self.classe1 = classe1
+        self.classe2 = classe2
+        self.tour = tour
+
+    def compacter(self):
+        """Retourne l'état sous forme d'un entier"""
+        defense_adverse, defense_courant = (
+            (self.defense2, self.defense1) if self.cote == 0 else (self.defense1, self.defense2)
+        )
+        return (cle_position(self.pv1, self.pv2, self.energie1, self.energie2, defense_adverse, self.cote)
+                | defense_courant << 28 | self.classe1 << 29 | self.classe2 << 32 | self.tour << 35)
+
+    def charger(self, cle):
+        """
+        Remplace les valeurs par celles d'un entier compact, sans allocation
+        Returns:
+            EtatDuel: self
+        """
+        self.pv1 = cle & _MASQUE_PV
+        self.pv2 = cle >> 7 & _MASQUE_PV
+        self.energie1 = cle >> 14 & _MASQUE_ENERGIE
+        self.energie2 = cle >> 20 & _MASQUE_ENERGIE
+        self.cote = cle >> 27 & 1
+        defense_adverse, defense_courant = cle >> 26 & 1, cle >> 28 & 1
+        if self.cote == 0:
+            self.defense1, self.defense2 = defense_courant, defense_adverse
+        else:
+            self.defense1, self.defense2 = defense_adverse, defense_courant
+        self.classe1 = cle >> 29 & _MASQUE_CLASSE
+        self.classe2 = cle >> 32 & _MASQUE_CLASSE
+        self.tour = cle >> 35
+        return self
+
+    @classmethod
+    def decompacter(cls, cle):
+        """Construit un EtatDuel à partir d'un entier compact"""
+        return cls().charger(cle)
+
+    def __eq__(self, autre):
+        return isinstance(autre, EtatDuel) and self.compacter() == autre.compacter()
+
+    def __repr__(self):
+        champs = ", ".join(f"{nom}={getattr(self, nom)}" for nom in self.__slots__)
+        return f"EtatDuel({champs})"
+
+
+def compacter_partie(game):
+    """
+    Instantané d'une partie démarrée sous forme d'entier
+    Args:
+        game (Game): Partie dont les deux joueurs existent
+    Returns:
+        int: État compact
+    """
+    j1, j2 = game.joueur1, game.joueur2
+    moteur = game.moteur_combat
+    cote = 0 if moteur is None or moteur.tour_joueur1 else 1
+    courant, adverse = (j1, j2) if cote == 0 else (j2, j1)
+    return (cle_position(j1.pv, j2.pv, j1.energie, j2.energie, int(adverse.is_defending), cote)
+            | int(courant.is_defending) << 28
+            | j1.identifiant << 29 | j2.identifiant << 32
+            | (moteur.tour if moteur is not None else 0) << 35)
+
+
+def restaurer_partie(game, cle):
+    """
+    Replace une partie dans l'état compact donné, sans rejouer de tour
+    Les personnages sont recréés seulement si leur classe diffère.
+    Args:
+        game (Game): Partie à modifier (combat démarré)
+        cle (int): État produit par compacter_partie
+    """
+    classe1, classe2 = cle >> 29 & _MASQUE_CLASSE, cle >> 32 & _MASQUE_CLASSE
+    if type(game.joueur1) is not CLASSES[classe1] or type(game.joueur2) is not CLASSES[classe2]:
+        nom1, nom2 = game.joueur1.nom, game.joueur2.nom
+        game.joueur1, game.joueur2 = CLASSES[classe1](nom1), CLASSES[classe2](nom2)
+        game.moteur_combat.joueur1, game.moteur_combat.joueur2 = game.joueur1, game.joueur2
+        game.journal.joueurs = (game.joueur1, game.joueur2)
+    j1, j2 = game.joueur1, game.joueur2
+    moteur = game.moteur_combat
+    j1.pv = cle & _MASQUE_PV
+    j2.pv = cle >> 7 & _MASQUE_PV
+    j1.energie = cle >> 14 & _MASQUE_ENERGIE
+    j2.energie = cle >> 20 & _MASQUE_ENERGIE
+    cote = cle >> 27 & 1
+    courant, adverse = (j1, j2) if cote == 0 else (j2, j1)
+    adverse.is_defending = bool(cle >> 26 & 1)
+    courant.is_defending = bool(cle >> 28 & 1)
+    moteur.tour_joueur1 = cote == 0
+    moteur.tour = cle >> 35
+    if j1.pv <= 0 or j2.pv <= 0:
+        moteur.is_combat_over = True
+        game.gagnant = j2 if j1.pv <= 0 else j1
+    else:
+        moteur.is_combat_over = False
+        game.gagnant = None
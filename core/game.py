@@ -1,32 +1,58 @@
-from core.characters import Guerrier, Mage, Archer
+from contextlib import contextmanager
+
+from core.characters import REGISTRE
+from core import instrumentation
+from core import journal as evt
+from core.journal import JournalCombat, HistoriqueTexte
+from core.etat import compacter_partie, restaurer_partie
+from core.engine import CombatEngine, REFUSEE, KO, ISSUE, ECHEC, CRITIQUE, ETOURDISSEMENT  # CombatEngine reste importable d'ici
+from core.registre import ACTIONS, ATTAQUER, SPECIAL, DEFENDRE, RECHARGER, FRAPPE, DEFENSE
+
+# Identifiant d'action par nom, les identifiants sont aussi acceptés tels quels
+_CODES = {nom: code for code, nom in enumerate(ACTIONS)}
+_CODES.update((code, code) for code in range(len(ACTIONS)))
+# Type d'événement du journal par identifiant d'action
+_EVENEMENTS = (evt.ATTAQUE, evt.SPECIALE, evt.DEFENSE, evt.RECHARGE)
+# Clés des changements notifiés aux observateurs, dans l'ordre de Game._apercu
+_CHANGEMENTS = ('pv1', 'pv2', 'energie1', 'energie2', 'tour', 'gagnant')
 
 class Game:
-    def __init__(self):
-        """Initialise l'état du jeu"""
+    def __init__(self, journalisation=True, niveau_ia='normal'):
+        """
+        Initialise l'état du jeu
+        Args:
+            journalisation (bool): False pour ne pas tenir de journal (parties sans interface)
+            niveau_ia (str): Difficulté de l'IA ('facile', 'normal', 'difficile')
+        """
+        self.niveau_ia = niveau_ia
+        self.ia = None
         self.joueur1 = None
         self.joueur2 = None
         self.moteur_combat = None
-        self.historique = []
+        self.journal = JournalCombat(journalisation)
+        self.historique = HistoriqueTexte(self.journal)
         self.gagnant = None
+        self.enregistreur = None  # EnregistreurReplay optionnel (core.replay)
+        self.chronologie = None  # Chronologie optionnelle pour annuler/rétablir (core.chronologie)
+        self.hasard = None  # MecaniquesAleatoires optionnelles : échecs, critiques, étourdissements (core.hasard)
+        self.observateurs = []
+        self._dernier_apercu = None  # Dernier état notifié aux observateurs
+        self._groupe = False  # Notifications retenues jusqu'à la fin d'un groupe
 
     def creer_personnage(self, classe, nom, joueur_num):
         """
         Crée un personnage pour un joueur
         Args:
-            classe (str): 'guerrier', 'mage' ou 'archer'
+            classe (str): Nom d'une classe du registre ('guerrier', 'mage', 'archer'...)
             nom (str): Nom du personnage
             joueur_num (int): 1 ou 2
         Returns:
             bool: True si création réussie
         """
-        if classe.lower() == 'guerrier':
-            perso = Guerrier(nom)
-        elif classe.lower() == 'mage':
-            perso = Mage(nom)
-        elif classe.lower() == 'archer':
-            perso = Archer(nom)
-        else:
+        type_perso = REGISTRE.get(classe.lower())
+        if type_perso is None:
             return False
+        perso = type_perso(nom)
 
         if joueur_num == 1:
             self.joueur1 = perso
@@ -43,11 +69,17 @@ class Game:
         if self.joueur1 and self.joueur2:
             self.moteur_combat = CombatEngine(self.joueur1, self.joueur2)
             self.moteur_combat.start_combat()
-            self.historique = [
-                f"Le combat commence ! {self.joueur1.nom} vs {self.joueur2.nom}",
-                f"C'est au tour de {self.joueur1.nom} !"
-            ]
+            self.journal.demarrer(self.joueur1, self.joueur2)
+            self.journal.ajouter(evt.DEBUT, 1)
+            self.journal.ajouter(evt.PREMIER_TOUR, 1)
             self.gagnant = None
+            if self.enregistreur is not None:
+                self.enregistreur.debut(self)
+            if self.chronologie is not None:
+                self.chronologie.debut(self)
+            if self.observateurs:
+                self._dernier_apercu = None  # Nouveau combat : tout est notifié
+                self._notifier()
             return True
         return False
 
@@ -55,53 +87,228 @@ class Game:
         """
         Exécute une action pour le joueur courant
         Args:
-            action (str): 'attaquer', 'special', 'defendre', 'recharger'
+            action (str|int): 'attaquer', 'special', 'defendre', 'recharger' ou son identifiant
         Returns:
             tuple: (succès(bool), est_fini(bool))
         """
         # Vérifie si le combat est prêt
         if not self.moteur_combat or self.moteur_combat.is_combat_over:
             return False, False
+        mesures = instrumentation.mesures
+        if mesures is not None:
+            return self._executer_action_mesuree(action, mesures)
+        code = _CODES.get(action)
+        if code is None:
+            return False, False
+        issue, _ = self._executer(code)
+        if issue == REFUSEE:  # Énergie insuffisante
+            return False, False
+        if self.observateurs:
+            self._notifier()
+        return True, issue == KO
 
-        # Récupère le joueur actuel et son adversaire
+    def _executer_action_mesuree(self, action, mesures):
+        """executer_action quand l'instrumentation est active (core.instrumentation)"""
+        code = _CODES.get(action)
+        if code is None:
+            mesures.refus(self, action)
+            return False, False
         joueur_actuel = self.moteur_combat.get_current_player()
         adversaire = self.joueur2 if joueur_actuel == self.joueur1 else self.joueur1
+        debut = mesures.horloge()
+        issue, degats = self._executer(code)
+        if issue == REFUSEE:
+            mesures.refus(self, ACTIONS[code])
+            return False, False
+        # La mesure des règles s'arrête avant les observateurs, mesurés par l'interface
+        mesures.action(self, ACTIONS[code], debut)
+        if joueur_actuel.actions[code][0] == FRAPPE:
+            mesures.degats(adversaire, degats)
+        if self.observateurs:
+            self._notifier()
+        return True, issue == KO
+
+    def _executer(self, code):
+        """
+        Joue une action du joueur courant d'un combat en cours et l'enregistre,
+        sans notifier les observateurs, voir executer_action
+        Returns:
+            tuple: (issue (REFUSEE, SUIVANT ou KO), dégâts infligés)
+        """
+        joueur_actuel = self.moteur_combat.get_current_player()
+        acteur = 1 if joueur_actuel == self.joueur1 else 2
+        tour = self.moteur_combat.tour
 
-        # Exécute l'action demandée
-        if action == 'attaquer':
-            resultat = joueur_actuel.attaque_normale(adversaire)
-        elif action == 'special':
-            resultat = joueur_actuel.attaque_speciale(adversaire)
-            if not resultat:  # Énergie insuffisante
-                return False, False
-        elif action == 'defendre':
-            joueur_actuel.defendre()
-            resultat = f"{joueur_actuel.nom} se met en position défensive"
-        elif action == 'recharger':
-            joueur_actuel.recharger_energie()
-            resultat = f"{joueur_actuel.nom} recharge son énergie"
+        # Joue l'action demandée avec le moteur de règles, puis l'enregistre
+        energie_avant = joueur_actuel.energie
+        issue, degats = self.moteur_combat.jouer(code, self.hasard)
+        if issue == REFUSEE:
+            return REFUSEE, 0
+        issue, effets = issue & ISSUE, issue & ~ISSUE
+        nature, valeur, coups, cout, _ = joueur_actuel.actions[code]
+        if nature == FRAPPE:
+            if effets & ECHEC:
+                self.journal.ajouter(evt.ECHEC, acteur, valeur * coups, 0, -cout, tour)
+            else:
+                if effets & CRITIQUE:
+                    brut = valeur * coups * self.hasard.multiplicateur_critique
+                    self.journal.ajouter(_EVENEMENTS[code], acteur, brut, degats, -cout, tour)
+                    self.journal.ajouter(evt.CRITIQUE, acteur, tour=tour)
+                else:
+                    self.journal.ajouter(_EVENEMENTS[code], acteur, valeur * coups, degats, -cout, tour)
+        elif nature == DEFENSE:
+            self.journal.ajouter(evt.DEFENSE, acteur, tour=tour)
         else:
-            return False, False
+            self.journal.ajouter(evt.RECHARGE, acteur, delta_energie=joueur_actuel.energie - energie_avant,
+                                 tour=tour)
 
-        # Ajoute le résultat à l'historique
-        self.historique.append(resultat)
-        
-        # Vérifie si le combat est terminé
-        if adversaire.est_ko():
+        # Le moteur a déjà passé le tour, sauf si le combat est terminé
+        if issue == KO:
             self.gagnant = joueur_actuel
-            message_victoire = f"{joueur_actuel.nom} remporte le combat !"
-            self.historique.append(message_victoire)
-            self.moteur_combat.is_combat_over = True
-            return True, True
+            self.journal.ajouter(evt.VICTOIRE, acteur, tour=tour)
+        elif effets & ETOURDISSEMENT:
+            # Le même joueur rejoue : la cible est étourdie
+            self.journal.ajouter(evt.ETOURDISSEMENT, 3 - acteur, tour=tour)
+            self.journal.ajouter(evt.TOUR, acteur, tour=self.moteur_combat.tour)
+        else:
+            self.journal.ajouter(evt.TOUR, 3 - acteur, tour=self.moteur_combat.tour)
+        if self.enregistreur is not None:
+            self.enregistreur.enregistrer(self, code)
+        if self.chronologie is not None:
+            self.chronologie.enregistrer(self, code)
+        return issue, degats
 
-        # CORRECTION CRITIQUE : Passer au tour suivant
-        self.moteur_combat.next_turn()
-        
-        # Ajoute un message pour le nouveau tour
-        nouveau_joueur = self.moteur_combat.get_current_player()
-        self.historique.append(f"Au tour de {nouveau_joueur.nom} !")
-        
-        return True, False
+    def executer_actions(self, actions):
+        """
+        Exécute une suite d'actions, avec une seule notification des observateurs à la fin
+        Args:
+            actions: Itérable d'actions (noms ou identifiants)
+        Returns:
+            tuple: (nombre d'actions exécutées(int), est_fini(bool)) ; la suite
+                s'arrête à la première action refusée ou à la fin du combat
+        """
+        executees, fini = 0, False
+        with self.notifications_groupees():
+            for action in actions:
+                succes, fini = self.executer_action(action)
+                if not succes:
+                    break
+                executees += 1
+                if fini:
+                    break
+        return executees, fini
+
+    def executer_action_ia(self):
+        """
+        Fait jouer l'IA pour le joueur courant
+        Returns:
+            tuple: (succès(bool), est_fini(bool)), comme executer_action
+        """
+        if not self.moteur_combat or self.moteur_combat.is_combat_over:
+            return False, False
+        if self.ia is None:
+            from core.ia import IA
+            self.ia = IA(self.niveau_ia)
+        return self.executer_action(self.ia.choisir_action(self))
+
+    def instantane(self):
+        """
+        Capture l'état du combat (pv, énergie, défense, classes, tour) en O(1)
+        Returns:
+            int: État compact, voir core.etat
+        """
+        return compacter_partie(self)
+
+    def restaurer(self, etat):
+        """
+        Replace le combat dans un état capturé par instantane
+        L'historique n'est pas modifié.
+        Args:
+            etat (int): État compact
+        """
+        restaurer_partie(self, etat)
+        if self.observateurs:
+            self._notifier()
+
+    def abonner(self, observateur):
+        """
+        Ajoute un observateur, appelé avec un dictionnaire des changements
+        après chaque modification de la partie. Clés possibles : 'pv1', 'pv2',
+        'energie1', 'energie2', 'tour' (1 ou 2), 'gagnant' (1, 2 ou None) et
+        'journal' (indice du premier événement nouveau, 0 si le journal a été
+        recommencé ou tronqué). Seules les valeurs modifiées sont présentes.
+        Args:
+            observateur: Fonction (changements) -> None
+        """
+        self.observateurs.append(observateur)
+        self._dernier_apercu = self._apercu()
+
+    def desabonner(self, observateur):
+        """Retire un observateur ajouté par abonner"""
+        self.observateurs.remove(observateur)
+
+    @contextmanager
+    def notifications_groupees(self):
+        """Retient les notifications pendant le bloc, puis notifie une seule fois les changements cumulés"""
+        englobant, self._groupe = self._groupe, True
+        try:
+            yield self
+        finally:
+            self._groupe = englobant
+            if not englobant and self.observateurs:
+                self._notifier()
+
+    def _apercu(self):
+        """Valeurs suivies pour les notifications, None avant le combat"""
+        if not self.moteur_combat:
+            return None
+        j1, j2 = self.joueur1, self.joueur2
+        gagnant = None if self.gagnant is None else (1 if self.gagnant is j1 else 2)
+        return (j1.pv, j2.pv, j1.energie, j2.energie, 1 if self.moteur_combat.tour_joueur1 else 2, gagnant,
+                self.journal.version, len(self.journal))
+
+    def _notifier(self):
+        """Envoie aux observateurs ce qui a changé depuis la notification précédente"""
+        if self._groupe:
+            return
+        apercu = self._apercu()
+        if apercu is None:
+            return
+        precedent, self._dernier_apercu = self._dernier_apercu, apercu
+        if precedent is None:  # Premier état notifié : tout est envoyé
+            changements = dict(zip(_CHANGEMENTS, apercu))
+            changements['journal'] = 0
+        else:
+            changements = {cle: valeur for cle, valeur, ancienne in zip(_CHANGEMENTS, apercu, precedent)
+                           if valeur != ancienne}
+            if apercu[6] != precedent[6]:
+                changements['journal'] = 0
+            elif apercu[7] > precedent[7]:
+                changements['journal'] = precedent[7]
+        if changements:
+            for observateur in tuple(self.observateurs):
+                observateur(changements)
+
+    def annuler(self):
+        """
+        Annule le dernier coup (nécessite une chronologie) ; abandonne
+        l'enregistrement de la partie par l'enregistreur
+        Returns:
+            bool: True si un coup a été annulé
+        """
+        if self.chronologie is None or not self.moteur_combat:
+            return False
+        return self.chronologie.annuler(self)
+
+    def retablir(self):
+        """
+        Rejoue le dernier coup annulé (nécessite une chronologie)
+        Returns:
+            bool: True si un coup a été rejoué
+        """
+        if self.chronologie is None or not self.moteur_combat:
+            return False
+        return self.chronologie.retablir(self)
 
     def get_joueur_actuel(self):
         """Retourne le numéro du joueur dont c'est le tour (1 ou 2)"""
@@ -116,7 +323,7 @@ class Game:
             dict: {
                 'joueur1': { 'nom': str, 'pv': int, 'energie': int },
                 'joueur2': { 'nom': str, 'pv': int, 'energie': int },
-                'historique': list[str],
+                'historique': Sequence[str] (messages rendus à la lecture),
                 'tour': int (1 ou 2)
             }
         """
@@ -139,36 +346,3 @@ class Game:
             'historique': self.historique,
             'tour': self.get_joueur_actuel()
         }
-
-class CombatEngine:
-    """Gestion des tours de combat"""
-    def __init__(self, joueur1, joueur2):
-        self.joueur1 = joueur1
-        self.joueur2 = joueur2
-        self.tour_joueur1 = True  # True = tour du joueur1, False = tour du joueur2
-        self.is_combat_over = False
-
-    def start_combat(self):
-        """Réinitialise l'état pour un nouveau combat"""
-        self.tour_joueur1 = True
-        self.is_combat_over = False
-        # Réinitialise l'état des joueurs
-        self.joueur1.pv = self.joueur1.pv_max
-        self.joueur1.energie = self.joueur1.energie_max
-        self.joueur2.pv = self.joueur2.pv_max
-        self.joueur2.energie = self.joueur2.energie_max
-        self.joueur1.is_defending = False
-        self.joueur2.is_defending = False
-
-    def get_current_player(self):
-        """Retourne le joueur dont c'est le tour"""
-        return self.joueur1 if self.tour_joueur1 else self.joueur2
-
-    def next_turn(self):
-        """Passe au tour suivant et réinitialise la défense"""
-        # Change de tour
-        self.tour_joueur1 = not self.tour_joueur1
-        
-        # Réinitialise l'état de défense pour le nouveau joueur
-        current_player = self.get_current_player()
-        current_player.is_defending = False
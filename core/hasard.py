@@ -0,0 +1,165 @@
+"""
+Mécaniques aléatoires reproductibles
+
+Les tirages ne viennent pas d'un générateur qui avance : chaque tirage est
+une fonction pure de (graine du duel, tour, événement), calculée par le
+mélangeur de SplitMix64 à la position tour * 256 + événement de la suite de
+la graine. Un duel se rejoue donc à l'identique à partir de sa seule
+graine, qu'il soit joué dans ce processus, dans un autre processus ou
+comme une ligne d'un lot vectorisé (core.simulation), et quel que soit
+l'ordre dans lequel les duels sont joués.
+
+tirage calcule un tirage sur les entiers Python, tirages le même tirage
+pour des tableaux NumPy de duels ; les deux donnent exactement les mêmes
+valeurs. Un événement de probabilité p a lieu quand le tirage (32 bits)
+est inférieur à seuil(p).
+
+Événements tirés pour une attaque (core.engine.step) :
+    TIRAGE_ECHEC            l'attaque manque sa cible
+    TIRAGE_CRITIQUE         les dégâts sont multipliés
+    TIRAGE_ETOURDISSEMENT   la cible perd son prochain tour (spéciale d'une
+                            classe qui peut étourdir, champ etourdissement
+                            du registre)
+
+Les réglages d'un duel (graine, seuils, multiplicateur) s'écrivent en
+quelques octets (encoder_hasard) dans les replays, l'archive et les
+sessions, qui rejouent ainsi les mêmes tirages.
+"""
+import struct
+
+_MASQUE = (1 << 64) - 1
+_GAMMA = 0x9E3779B97F4A7C15
+_MULT1 = 0xBF58476D1CE4E5B9
+_MULT2 = 0x94D049BB133111EB
+
+TIRAGE_ECHEC, TIRAGE_CRITIQUE, TIRAGE_ETOURDISSEMENT = range(3)
+
+# Graine, seuil d'échec, seuil de coup critique, multiplicateur, étourdissement
+FORMAT_HASARD = struct.Struct('<QQQHB')
+
+
+def _melanger(x):
+    """Mélangeur final de SplitMix64"""
+    x = (x ^ x >> 30) * _MULT1 & _MASQUE
+    x = (x ^ x >> 27) * _MULT2 & _MASQUE
+    return x ^ x >> 31
+
+
+def cle_graine(graine):
+    """Clé de tirage d'une graine (graines voisines, suites indépendantes)"""
+    return _melanger(graine & _MASQUE)
+
+
+def tirage(cle, tour, evenement):
+    """
+    Tirage uniforme sur 32 bits
+    Args:
+        cle (int): Clé de la graine du duel (cle_graine)
+        tour (int): Numéro du tour
+        evenement (int): TIRAGE_ECHEC, TIRAGE_CRITIQUE... (moins de 256)
+    Returns:
+        int: Entier de 0 à 2**32 - 1
+    """
+    return _melanger(cle + ((tour << 8 | evenement) + 1) * _GAMMA & _MASQUE) >> 32
+
+
+def seuil(probabilite):
+    """Seuil de tirage d'un événement de probabilité donnée"""
+    if not 0.0 <= probabilite <= 1.0:
+        raise ValueError("Une probabilité est comprise entre 0 et 1")
+    return round(probabilite * (1 << 32))
+
+
+def cles_graines(graines):
+    """cle_graine pour un tableau de graines (np.uint64)"""
+    import numpy as np
+    return _melanger_np(np.asarray(graines).astype(np.uint64))
+
+
+def tirages(cles, tours, evenement):
+    """
+    tirage pour des tableaux de duels
+    Args:
+        cles: Clés des graines (cles_graines)
+        tours: Numéro du tour de chaque duel
+        evenement (int): Événement tiré
+    Returns:
+        np.ndarray: Tirages (np.uint64, de 0 à 2**32 - 1)
+    """
+    import numpy as np
+    compteur = (np.asarray(tours).astype(np.uint64) << np.uint64(8)) + np.uint64(evenement + 1)
+    return _melanger_np(cles + compteur * np.uint64(_GAMMA)) >> np.uint64(32)
+
+
+def _melanger_np(x):
+    """_melanger sur un tableau np.uint64 (les produits débordent modulo 2**64)"""
+    import numpy as np
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(_MULT1)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(_MULT2)
+    return x ^ (x >> np.uint64(31))
+
+
+class MecaniquesAleatoires:
+    """Réglages des mécaniques aléatoires d'un duel et sa graine"""
+    __slots__ = ('graine', 'cle', 'seuil_echec', 'seuil_critique', 'multiplicateur_critique', 'etourdissement')
+
+    def __init__(self, graine, echec=0.05, critique=0.1, multiplicateur_critique=2, etourdissement=True):
+        """
+        Args:
+            graine (int): Graine du duel
+            echec (float): Probabilité qu'une attaque manque sa cible
+            critique (float): Probabilité d'un coup critique
+            multiplicateur_critique (int): Multiplicateur des dégâts d'un coup critique
+            etourdissement (bool): Les spéciales peuvent étourdir (probabilité de la classe)
+        """
+        self.graine = graine
+        self.cle = cle_graine(graine)
+        self.seuil_echec = seuil(echec)
+        self.seuil_critique = seuil(critique)
+        self.multiplicateur_critique = multiplicateur_critique
+        self.etourdissement = etourdissement
+
+    def tirer(self, tour, evenement):
+        """Tirage d'un événement à un tour de ce duel"""
+        return _melanger(self.cle + ((tour << 8 | evenement) + 1) * _GAMMA & _MASQUE) >> 32
+
+    def pour_graine(self, graine):
+        """Mêmes réglages avec une autre graine"""
+        copie = MecaniquesAleatoires.__new__(MecaniquesAleatoires)
+        for nom in self.__slots__:
+            setattr(copie, nom, getattr(self, nom))
+        copie.graine = graine
+        copie.cle = cle_graine(graine)
+        return copie
+
+
+def encoder_hasard(hasard):
+    """
+    Réglages d'un duel en FORMAT_HASARD.size octets (graine sur 64 bits)
+    Args:
+        hasard (MecaniquesAleatoires): Réglages à encoder
+    Returns:
+        bytes: Réglages encodés
+    """
+    return FORMAT_HASARD.pack(hasard.graine & _MASQUE, hasard.seuil_echec, hasard.seuil_critique,
+                              hasard.multiplicateur_critique, hasard.etourdissement)
+
+
+def decoder_hasard(donnees, position=0):
+    """
+    Relit des réglages écrits par encoder_hasard
+    Args:
+        donnees (bytes): Données contenant les réglages
+        position (int): Position des réglages dans donnees
+    Returns:
+        MecaniquesAleatoires: Réglages, tirages identiques à ceux encodés
+    """
+    graine, seuil_echec, seuil_critique, multiplicateur, etourdissement = FORMAT_HASARD.unpack_from(donnees, position)
+    hasard = MecaniquesAleatoires.__new__(MecaniquesAleatoires)
+    hasard.graine = graine
+    hasard.cle = cle_graine(graine)
+    hasard.seuil_echec = seuil_echec
+    hasard.seuil_critique = seuil_critique
+    hasard.multiplicateur_critique = multiplicateur
+    hasard.etourdissement = bool(etourdissement)
+    return hasard
@@ -0,0 +1,220 @@
+"""
+IA de combat par recherche minimax
+
+Le duel est déterministe et à information complète : l'IA explore l'arbre
+des actions par negamax avec élagage alpha-bêta, approfondissement itératif
+et table de transposition indexée par la clé de position de core.etat.
+Les positions explorées sont des états compacts joués par core.engine.step,
+les mêmes règles que celles d'une partie.
+Chaque décision respecte un budget de temps, et la difficulté se règle par
+la profondeur maximale et ce budget.
+"""
+import time
+
+from core.characters import regles_classe
+from core.engine import step, REFUSEE, KO
+from core.etat import cle_position, MASQUE_POSITION
+from core.game import ACTIONS, ATTAQUER, SPECIAL, DEFENDRE, RECHARGER
+
+# Profondeur maximale (en actions) et budget de temps (en secondes) par niveau
+NIVEAUX = {
+    'facile': (2, 0.001),
+    'normal': (6, 0.003),
+    'difficile': (40, 0.005),
+}
+
+VICTOIRE = 100000
+_ORDRE = (SPECIAL, ATTAQUER, RECHARGER, DEFENDRE)
+_EXACT, _MINORANT, _MAJORANT = 0, 1, 2
+_TAILLE_TABLE = 1 << 18
+
+
+class _TempsEcoule(Exception):
+    """Interrompt la recherche quand le budget de temps est dépassé"""
+
+
+class IA:
+    """Joueur artificiel à recherche bornée en temps"""
+
+    def __init__(self, niveau='normal', profondeur=None, budget=None):
+        """
+        Args:
+            niveau (str): 'facile', 'normal' ou 'difficile'
+            profondeur (int): Profondeur maximale, remplace celle du niveau
+            budget (float): Temps maximal par décision en secondes (math.inf : sans limite)
+        """
+        profondeur_niveau, budget_niveau = NIVEAUX[niveau]
+        self.profondeur = profondeur or profondeur_niveau
+        self.budget = budget or budget_niveau
+        self.table = {}
+        self.chemin = set()  # États de la variante en cours d'exploration
+        self.noeuds = 0
+        self._frappes = None  # Dégâts d'une attaque normale de chaque joueur
+        self._classes = None
+        self._limite = 0.0
+
+    def choisir_action(self, game):
+        """
+        Choisit l'action du joueur courant d'une partie en cours
+        Args:
+            game (Game): Partie démarrée et non terminée
+        Returns:
+            str: Action parmi 'attaquer', 'special', 'defendre', 'recharger'
+        """
+        return ACTIONS[self.rechercher(*self.etat_partie(game))]
+
+    @staticmethod
+    def etat_partie(game):
+        """
+        Instantané d'une partie en cours, indépendant des objets Personnage
+        Args:
+            game (Game): Partie démarrée et non terminée
+        Returns:
+            tuple: (classes, etat) tels qu'attendus par rechercher
+        """
+        j1, j2 = game.joueur1, game.joueur2
+        cote = game.get_joueur_actuel() - 1
+        adversaire = j2 if cote == 0 else j1
+        classes = (j1.identifiant, j2.identifiant)
+        etat = (j1.pv, j2.pv, j1.energie, j2.energie, int(adversaire.is_defending), cote)
+        return classes, etat
+
+    def _preparer(self, classes):
+        """Charge les règles des classes en jeu, la table est vidée si elles changent"""
+        if classes != self._classes:
+            self._classes = classes
+            regles = [regles_classe(c) for c in classes]
+            self._frappes = tuple(r['degats_normale'] * r['coups_normale'] for r in regles)
+            self.table.clear()
+
+    @staticmethod
+    def _compacter(classes, etat):
+        """État compact (core.etat) d'un instantané (pv1, pv2, energie1, energie2, defense, cote)"""
+        return cle_position(*etat) | classes[0] << 29 | classes[1] << 32
+
+    def anticiper(self, classes, etat):
+        """
+        Prépare la réponse à chaque action possible du joueur courant
+        Args:
+            classes (tuple): Identifiants des classes des joueurs 1 et 2
+            etat (tuple): État où l'adversaire de l'IA doit jouer
+        Yields:
+            tuple: (clé compacte de l'état suivant, action de l'IA en réponse)
+        """
+        self._preparer(classes)
+        etat = self._compacter(classes, etat)
+        for action in _ORDRE:
+            suivant, issue, _ = step(etat, action)
+            if issue != REFUSEE and issue != KO:
+                yield suivant & MASQUE_POSITION, self._rechercher(suivant)
+
+    def rechercher(self, classes, etat):
+        """
+        Approfondissement itératif jusqu'à la profondeur ou au budget
+        Args:
+            classes (tuple): Identifiants des classes des joueurs 1 et 2
+            etat (tuple): (pv1, pv2, energie1, energie2, defense, cote)
+        Returns:
+            int: Identifiant de la meilleure action trouvée
+        """
+        self._preparer(classes)
+        return self._rechercher(self._compacter(classes, etat))
+
+    def _rechercher(self, etat):
+        """rechercher sur un état compact, les classes étant déjà préparées"""
+        if len(self.table) > _TAILLE_TABLE:
+            self.table.clear()
+        self._limite = time.perf_counter() + self.budget
+        self.noeuds = 0
+        self.chemin.clear()
+
+        meilleure = ATTAQUER
+        for profondeur in range(1, self.profondeur + 1):
+            try:
+                valeur, action = self._negamax(etat, profondeur, -VICTOIRE - 1, VICTOIRE + 1, 0)
+            except _TempsEcoule:
+                break
+            if action is not None:
+                meilleure = action
+            if abs(valeur) >= VICTOIRE - profondeur:
+                break  # Issue forcée trouvée, inutile d'aller plus loin
+        return meilleure
+
+    def _evaluer(self, etat):
+        """
+        Évaluation heuristique du point de vue du joueur courant
+        Compare surtout le nombre d'attaques normales dont chaque joueur a
+        besoin pour mettre l'autre K.O., puis les pv et l'énergie restants.
+        """
+        pv1, pv2 = etat & 0x7F, etat >> 7 & 0x7F
+        frappe1, frappe2 = self._frappes
+        coups_pour_battre_1 = -(-pv1 // frappe2)
+        coups_pour_battre_2 = -(-pv2 // frappe1)
+        score = (100 * (coups_pour_battre_1 - coups_pour_battre_2) + 4 * (pv1 - pv2)
+                 + (etat >> 14 & 0x3F) - (etat >> 20 & 0x3F))
+        return -score if etat >> 27 & 1 else score
+
+    def _negamax(self, etat, profondeur, alpha, beta, ply):
+        """Recherche alpha-bêta ; retourne (valeur, meilleure action)"""
+        self.noeuds += 1
+        if not self.noeuds & 255 and time.perf_counter() > self._limite:
+            raise _TempsEcoule
+        if profondeur == 0:
+            return self._evaluer(etat), None
+
+        # Un état répété (défense ou recharge en boucle) ne fait pas
+        # progresser le combat : il vaut un nul, que le joueur en tête évite
+        cle = etat & MASQUE_POSITION
+        if cle in self.chemin:
+            return 0, None
+        entree = self.table.get(cle)
+        meilleure_tt = None
+        if entree is not None:
+            prof_tt, valeur_tt, borne, meilleure_tt = entree
+            if prof_tt >= profondeur:
+                if valeur_tt > VICTOIRE // 2:
+                    valeur_tt -= ply
+                elif valeur_tt < -VICTOIRE // 2:
+                    valeur_tt += ply
+                if borne == _EXACT:
+                    return valeur_tt, meilleure_tt
+                if borne == _MINORANT and valeur_tt >= beta:
+                    return valeur_tt, meilleure_tt
+                if borne == _MAJORANT and valeur_tt <= alpha:
+                    return valeur_tt, meilleure_tt
+
+        alpha_initial = alpha
+        meilleure_valeur, meilleure = -VICTOIRE - 1, None
+        ordre = _ORDRE if meilleure_tt is None else (meilleure_tt,) + tuple(a for a in _ORDRE if a != meilleure_tt)
+        self.chemin.add(cle)
+        try:
+            for action in ordre:
+                suivant, issue, _ = step(etat, action)
+                if issue == REFUSEE:
+                    continue
+                if issue == KO:
+                    valeur = VICTOIRE - ply - 1
+                else:
+                    valeur = -self._negamax(suivant, profondeur - 1, -beta, -alpha, ply + 1)[0]
+                if valeur > meilleure_valeur:
+                    meilleure_valeur, meilleure = valeur, action
+                alpha = max(alpha, valeur)
+                if alpha >= beta:
+                    break
+        finally:
+            self.chemin.discard(cle)
+
+        # Les scores de victoire sont stockés relativement au nœud courant
+        stocke = meilleure_valeur
+        if stocke > VICTOIRE // 2:
+            stocke += ply
+        elif stocke < -VICTOIRE // 2:
+            stocke -= ply
+        if meilleure_valeur <= alpha_initial:
+            borne = _MAJORANT
+        elif meilleure_valeur >= beta:
+            borne = _MINORANT
+        else:
+            borne = _EXACT
+        self.table[cle] = (profondeur, stocke, borne, meilleure)
+        return meilleure_valeur, meilleure
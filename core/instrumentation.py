@@ -0,0 +1,243 @@
+"""
+Mesures optionnelles d'une session de jeu
+
+Désactivées par défaut : les points de mesure du jeu testent seulement
+`instrumentation.mesures is not None`. Une fois activées, elles tiennent :
+    - des compteurs (actions par type, actions refusées, attaques subies et dégâts)
+    - des histogrammes de durées par étape : 'regles' (Game.executer_action,
+      sans ses observateurs), 'historique' (mise en forme des messages) et
+      'tk' (mise à jour des widgets)
+    - des crochets appelés à chaque événement mesuré
+
+    from core import instrumentation
+    mesures = instrumentation.activer()
+    ...
+    print(mesures.instantane())
+    instrumentation.desactiver()
+
+Le gestionnaire de contexte profiler() ajoute cProfile et tracemalloc, importés
+à la demande pour ne pas ralentir le démarrage.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Mesures actives, None quand l'instrumentation est désactivée
+mesures = None
+
+NB_CLASSES_HISTOGRAMME = 32
+
+
+class Histogramme:
+    """Durées regroupées par puissance de deux de microsecondes"""
+    __slots__ = ('classes', 'nombre', 'total')
+
+    def __init__(self):
+        self.classes = [0] * NB_CLASSES_HISTOGRAMME
+        self.nombre = 0
+        self.total = 0.0
+
+    def ajouter(self, duree):
+        """
+        Args:
+            duree (float): Durée en secondes
+        """
+        rang = int(duree * 1e6).bit_length()
+        self.classes[min(rang, NB_CLASSES_HISTOGRAMME - 1)] += 1
+        self.nombre += 1
+        self.total += duree
+
+    def quantile(self, q):
+        """
+        Borne supérieure approchée du quantile q
+        Returns:
+            float: Durée en secondes (précise à un facteur 2 près)
+        """
+        if not self.nombre:
+            return 0.0
+        seuil = q * self.nombre
+        cumul = 0
+        for rang, effectif in enumerate(self.classes):
+            cumul += effectif
+            if cumul >= seuil:
+                return (1 << rang) / 1e6
+        return (1 << (NB_CLASSES_HISTOGRAMME - 1)) / 1e6
+
+    def resume(self):
+        """Résumé sérialisable en JSON"""
+        return {
+            'nombre': self.nombre,
+            'total_s': self.total,
+            'moyenne_us': self.total / self.nombre * 1e6 if self.nombre else 0.0,
+            'p50_us': self.quantile(0.5) * 1e6,
+            'p99_us': self.quantile(0.99) * 1e6,
+            'classes': list(self.classes),
+        }
+
+
+class Mesures:
+    """Compteurs, histogrammes et crochets d'une session"""
+
+    horloge = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.compteurs = Counter()
+        self.histogrammes = {}
+        self.crochets = {}  # événement -> fonctions appelées
+
+    def ajouter_crochet(self, evenement, fonction):
+        """
+        Appelle une fonction à chaque événement mesuré
+        Args:
+            evenement (str): 'action', 'refus', 'degats' ou 'duree'
+            fonction (callable): Reçoit les mêmes arguments que la méthode du même nom
+        """
+        self.crochets.setdefault(evenement, []).append(fonction)
+
+    def retirer_crochet(self, evenement, fonction):
+        """Retire une fonction ajoutée par ajouter_crochet"""
+        self.crochets.get(evenement, []).remove(fonction)
+
+    def _appeler(self, evenement, *args):
+        for fonction in self.crochets.get(evenement, ()):
+            fonction(*args)
+
+    def duree(self, etape, debut):
+        """
+        Enregistre la durée d'une étape commencée à `debut` (valeur de horloge())
+        Returns:
+            float: Durée en secondes
+        """
+        duree = time.perf_counter() - debut
+        histogramme = self.histogrammes.get(etape)
+        if histogramme is None:
+            histogramme = self.histogrammes[etape] = Histogramme()
+        histogramme.ajouter(duree)
+        if 'duree' in self.crochets:
+            self._appeler('duree', etape, duree)
+        return duree
+
+    def action(self, game, action, debut):
+        """Action réussie jouée par Game.executer_action"""
+        self.compteurs['action/' + action] += 1
+        self.duree('regles', debut)
+        if 'action' in self.crochets:
+            self._appeler('action', game, action)
+
+    def refus(self, game, action):
+        """Action refusée (énergie insuffisante ou action inconnue)"""
+        self.compteurs['refus/' + str(action)] += 1
+        if 'refus' in self.crochets:
+            self._appeler('refus', game, action)
+
+    def degats(self, personnage, degats):
+        """Dégâts subis par un personnage : une attaque du moteur de règles ou un coup de recevoir_degats"""
+        self.compteurs['coups'] += 1
+        self.compteurs['degats'] += degats
+        if 'degats' in self.crochets:
+            self._appeler('degats', personnage, degats)
+
+    def instantane(self):
+        """
+        Copie sérialisable en JSON des compteurs et histogrammes
+        Returns:
+            dict: {'compteurs': {...}, 'durees': {étape: résumé}}
+        """
+        return {
+            'compteurs': dict(self.compteurs),
+            'durees': {etape: h.resume() for etape, h in self.histogrammes.items()},
+        }
+
+    def reinitialiser(self):
+        """Remet compteurs et histogrammes à zéro, les crochets sont conservés"""
+        self.compteurs.clear()
+        self.histogrammes.clear()
+
+
+def activer(nouvelles=None):
+    """
+    Active l'instrumentation
+    Args:
+        nouvelles (Mesures): Mesures à utiliser, de nouvelles sinon
+    Returns:
+        Mesures: Mesures actives
+    """
+    global mesures
+    mesures = nouvelles if nouvelles is not None else Mesures()
+    return mesures
+
+
+def desactiver():
+    """
+    Désactive l'instrumentation
+    Returns:
+        Mesures|None: Les mesures qui étaient actives
+    """
+    global mesures
+    anciennes, mesures = mesures, None
+    return anciennes
+
+
+class SessionProfilee:
+    """Résultats de profiler(), complétés à la sortie du bloc"""
+
+    def __init__(self, mesures):
+        self.mesures = mesures
+        self.profil = None  # pstats.Stats
+        self.memoire = None  # tracemalloc.Snapshot
+        self.memoire_pic = 0
+
+    def rapport(self, limite=15):
+        """
+        Résumé texte : fonctions les plus coûteuses et plus grosses allocations
+        Returns:
+            str: Rapport
+        """
+        import io
+        flux = io.StringIO()
+        if self.profil is not None:
+            self.profil.stream = flux
+            self.profil.sort_stats('cumulative').print_stats(limite)
+        if self.memoire is not None:
+            flux.write(f"Pic mémoire : {self.memoire_pic / 1024:.0f} Kio\n")
+            for stat in self.memoire.statistics('lineno')[:limite]:
+                flux.write(f"{stat}\n")
+        return flux.getvalue()
+
+
+@contextmanager
+def profiler(cprofile=True, memoire=True):
+    """
+    Mesure une session : instrumentation, cProfile et tracemalloc
+    Args:
+        cprofile (bool): Active cProfile
+        memoire (bool): Active tracemalloc
+    Yields:
+        SessionProfilee: Résultats, remplis à la sortie du bloc
+    """
+    import cProfile
+    import pstats
+    import tracemalloc
+    precedentes = mesures
+    session = SessionProfilee(activer())
+    profil = cProfile.Profile() if cprofile else None
+    memoire_deja_suivie = tracemalloc.is_tracing()
+    if memoire and not memoire_deja_suivie:
+        tracemalloc.start()
+    if profil is not None:
+        profil.enable()
+    try:
+        yield session
+    finally:
+        if profil is not None:
+            profil.disable()
+            session.profil = pstats.Stats(profil)
+        if memoire:
+            session.memoire = tracemalloc.take_snapshot()
+            session.memoire_pic = tracemalloc.get_traced_memory()[1]
+            if not memoire_deja_suivie:
+                tracemalloc.stop()
+        if precedentes is not None:
+            activer(precedentes)
+        else:
+            desactiver()
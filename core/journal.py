@@ -0,0 +1,162 @@
+"""
+Journal de combat structuré
+
+Chaque entrée du journal est un enregistrement d'entiers (type, acteur,
+dégâts bruts, dégâts subis, variation d'énergie, tour) stocké dans un
+tableau compact. Les messages en français ne sont construits que lorsqu'on
+les lit, pour l'interface ou pour un export.
+"""
+import sys
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+
+# Types d'événements
+DEBUT, PREMIER_TOUR, ATTAQUE, SPECIALE, DEFENSE, RECHARGE, TOUR, VICTOIRE = range(8)
+# Mécaniques aléatoires (core.hasard)
+ECHEC, CRITIQUE, ETOURDISSEMENT = range(8, 11)
+
+EvenementCombat = namedtuple(
+    'EvenementCombat',
+    ['type', 'acteur', 'degats_bruts', 'degats_subis', 'delta_energie', 'tour']
+)
+
+_CHAMPS = len(EvenementCombat._fields)
+
+
+class JournalCombat:
+    """Journal d'événements d'un combat, rendu en texte à la demande"""
+
+    def __init__(self, actif=True):
+        """
+        Args:
+            actif (bool): False pour ne rien enregistrer (simulations sans interface)
+        """
+        self.actif = actif
+        self.joueurs = (None, None)
+        self.version = 0  # Change quand des événements sont effacés
+        self._donnees = array('i')
+
+    def demarrer(self, joueur1, joueur2):
+        """Vide le journal pour un nouveau combat entre ces deux personnages"""
+        self.joueurs = (joueur1, joueur2)
+        self.version += 1
+        del self._donnees[:]
+
+    def ajouter(self, type_evt, acteur, degats_bruts=0, degats_subis=0, delta_energie=0, tour=0):
+        """
+        Enregistre un événement
+        Args:
+            type_evt (int): DEBUT, ATTAQUE, SPECIALE...
+            acteur (int): 1 ou 2 (numéro du joueur concerné)
+        """
+        if self.actif:
+            self._donnees.extend((type_evt, acteur, degats_bruts, degats_subis, delta_energie, tour))
+
+    def tronquer(self, longueur):
+        """Oublie les événements à partir de l'indice longueur (retour en arrière)"""
+        if longueur < len(self):
+            self.version += 1
+            del self._donnees[longueur * _CHAMPS:]
+
+    def exporter(self):
+        """
+        Returns:
+            bytes: Tous les événements, entiers 32 bits petit-boutistes
+        """
+        if sys.byteorder == 'little':
+            return self._donnees.tobytes()
+        copie = array('i', self._donnees)
+        copie.byteswap()
+        return copie.tobytes()
+
+    def importer(self, donnees):
+        """Remplace les événements par ceux produits par exporter (ignorés si le journal est inactif)"""
+        self.version += 1
+        del self._donnees[:]
+        if self.actif:
+            self._donnees.frombytes(donnees)
+            if sys.byteorder != 'little':
+                self._donnees.byteswap()
+
+    def __len__(self):
+        return len(self._donnees) // _CHAMPS
+
+    def evenement(self, index):
+        """Retourne l'événement d'indice donné sous forme d'EvenementCombat"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("indice d'événement hors limites")
+        debut = index * _CHAMPS
+        return EvenementCombat(*self._donnees[debut:debut + _CHAMPS])
+
+    def __iter__(self):
+        return self.evenements()
+
+    def rendre(self, evt):
+        """
+        Construit le message affiché pour un événement
+        Args:
+            evt (EvenementCombat): Événement à décrire
+        Returns:
+            str: Message en français, identique à l'ancien historique
+        """
+        joueur1, joueur2 = self.joueurs
+        acteur = joueur1 if evt.acteur == 1 else joueur2
+        # Les dégâts bruts d'un coup critique sont multipliés comme chaque coup
+        if evt.type == ATTAQUE:
+            brut = acteur.degats_normale * acteur.coups_normale
+            return acteur.decrire_normale(evt.degats_subis, evt.degats_bruts // brut if brut else 1)
+        if evt.type == SPECIALE:
+            brut = acteur.degats_speciale
+            return acteur.decrire_speciale(evt.degats_subis, evt.degats_bruts // brut if brut else 1)
+        if evt.type == DEFENSE:
+            return f"{acteur.nom} se met en position défensive"
+        if evt.type == RECHARGE:
+            return f"{acteur.nom} recharge son énergie"
+        if evt.type == TOUR:
+            return f"Au tour de {acteur.nom} !"
+        if evt.type == VICTOIRE:
+            return f"{acteur.nom} remporte le combat !"
+        if evt.type == DEBUT:
+            return f"Le combat commence ! {joueur1.nom} vs {joueur2.nom}"
+        if evt.type == ECHEC:
+            return f"{acteur.nom} manque sa cible !"
+        if evt.type == CRITIQUE:
+            return f"Coup critique de {acteur.nom} !"
+        if evt.type == ETOURDISSEMENT:
+            return f"{acteur.nom} est étourdi et passe son tour !"
+        return f"C'est au tour de {acteur.nom} !"
+
+    def evenements(self, debut=0):
+        """Génère les événements à partir de l'indice debut"""
+        for index in range(debut, len(self)):
+            yield self.evenement(index)
+
+    def messages(self, debut=0):
+        """Génère les messages à partir de l'événement d'indice debut"""
+        for evt in self.evenements(debut):
+            yield self.rendre(evt)
+
+    def exporter_texte(self):
+        """Retourne tout le journal sous forme de texte, une ligne par événement"""
+        return "\n".join(self.messages())
+
+
+class HistoriqueTexte(Sequence):
+    """Vue en lecture seule du journal sous forme de liste de messages"""
+
+    def __init__(self, journal):
+        self.journal = journal
+
+    def __len__(self):
+        return len(self.journal)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.journal.rendre(self.journal.evenement(index))
+
+    def __iter__(self):
+        return self.journal.messages()
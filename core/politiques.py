@@ -0,0 +1,93 @@
+"""
+Politiques de jeu automatiques
+
+Une politique reçoit la partie en cours et un générateur aléatoire, et
+renvoie l'action à jouer pour le joueur courant ('attaquer', 'special',
+'defendre' ou 'recharger'). Les politiques sont référencées par leur nom
+pour pouvoir être transmises à d'autres processus.
+"""
+import math
+
+
+def _joueurs(game):
+    """Retourne (joueur courant, adversaire) de la partie"""
+    joueur = game.moteur_combat.get_current_player()
+    adversaire = game.joueur2 if joueur == game.joueur1 else game.joueur1
+    return joueur, adversaire
+
+
+def aleatoire(game, rng):
+    """Action valide choisie uniformément"""
+    joueur, _ = _joueurs(game)
+    actions = ['attaquer', 'defendre', 'recharger']
+    if joueur.energie >= joueur.special_cost:
+        actions.append('special')
+    return rng.choice(actions)
+
+
+def agressif(game, rng):
+    """Attaque spéciale dès que possible, attaque normale sinon"""
+    joueur, _ = _joueurs(game)
+    return 'special' if joueur.energie >= joueur.special_cost else 'attaquer'
+
+
+def prudent(game, rng):
+    """Se défend quand il est en danger et recharge avant de frapper fort"""
+    joueur, adversaire = _joueurs(game)
+    if joueur.energie >= joueur.special_cost:
+        return 'special'
+    if joueur.pv <= 30 and adversaire.energie >= adversaire.special_cost:
+        return 'defendre'
+    if joueur.energie + joueur.montant_recharge >= joueur.special_cost and adversaire.pv > 40:
+        return 'recharger'
+    return 'attaquer'
+
+
+# Profondeur de l'IA en tournoi. Sans budget de temps et avec une table de
+# transposition vidée à chaque décision, le coup choisi ne dépend que de la
+# position : les résultats ne dépendent ni de la machine ni du processus qui
+# joue la partie.
+PROFONDEURS_IA = {
+    'facile': 2,
+    'normal': 6,
+    'difficile': 8,
+}
+
+_ia = {}
+
+
+def _politique_ia(niveau):
+    """Politique jouée par l'IA de recherche au niveau donné, à profondeur fixe"""
+    def politique(game, rng):
+        ia = _ia.get(niveau)
+        if ia is None:
+            from core.ia import IA
+            ia = _ia[niveau] = IA(niveau, profondeur=PROFONDEURS_IA[niveau], budget=math.inf)
+        ia.table.clear()
+        return ia.choisir_action(game)
+    politique.__doc__ = f"IA de recherche, niveau {niveau} (profondeur {PROFONDEURS_IA[niveau]})"
+    return politique
+
+
+POLITIQUES = {
+    'aleatoire': aleatoire,
+    'agressif': agressif,
+    'prudent': prudent,
+    'ia_facile': _politique_ia('facile'),
+    'ia_normal': _politique_ia('normal'),
+    'ia_difficile': _politique_ia('difficile'),
+}
+
+
+def get_politique(nom):
+    """
+    Retourne la politique enregistrée sous ce nom
+    Args:
+        nom (str): Nom de la politique
+    Returns:
+        callable: Fonction (game, rng) -> action
+    """
+    try:
+        return POLITIQUES[nom]
+    except KeyError:
+        raise ValueError(f"Politique inconnue : {nom}") from None
@@ -0,0 +1,110 @@
+"""
+Définitions déclaratives des classes de personnages
+
+Les classes jouables sont décrites dans un fichier JSON (core/classes.json
+par défaut) : une liste d'objets dont l'ordre donne l'identifiant numérique
+de la classe. Champs :
+    nom              identifiant texte ('guerrier')
+    libelle          nom affiché et nom de la classe Python ('Guerrier')
+    degats_normale   dégâts par coup de l'attaque de base
+    coups_normale    nombre de coups de l'attaque de base (1 par défaut)
+    degats_speciale  dégâts de l'attaque spéciale (un seul coup)
+    special_cost     énergie consommée par l'attaque spéciale
+    ignore_defense   l'attaque spéciale ignore la défense (false par défaut)
+    recharge         énergie récupérée par une recharge (10 par défaut)
+    vitesse          fréquence d'action en combat d'équipes (10 par défaut)
+    etourdissement   probabilité que l'attaque spéciale étourdisse la cible,
+                     avec les mécaniques aléatoires (core.hasard ; 0 par défaut)
+    message_normale, message_speciale
+                     formats des messages ; champs {nom}, {degats}, {premier}
+                     (dégâts du premier coup) et {suivant} (des coups suivants)
+
+Chaque définition est compilée en une table d'actions plate, indexée par
+l'identifiant d'action, que le moteur lit sans comparaison de chaînes.
+"""
+import json
+import os
+
+# Actions jouables et leurs identifiants numériques (indices dans ACTIONS)
+ACTIONS = ('attaquer', 'special', 'defendre', 'recharger')
+ATTAQUER, SPECIAL, DEFENDRE, RECHARGER = range(len(ACTIONS))
+
+# Nature d'une entrée de table d'actions
+FRAPPE, DEFENSE, RECHARGE = range(3)
+
+# L'état compact d'un duel (core.etat) code la classe sur 3 bits
+MAX_CLASSES = 8
+
+FICHIER_CLASSES = os.path.join(os.path.dirname(__file__), 'classes.json')
+
+_OBLIGATOIRES = ('nom', 'degats_normale', 'degats_speciale', 'special_cost')
+_DEFAUTS = {
+    'coups_normale': 1,
+    'ignore_defense': False,
+    'recharge': 10,
+    'vitesse': 10,
+    'etourdissement': 0.0,
+    'message_normale': "{nom} attaque (-{degats} PV)",
+    'message_speciale': "{nom} utilise son attaque spéciale ! (-{degats} PV)",
+}
+
+
+def lire_definitions(chemin=FICHIER_CLASSES):
+    """
+    Lit et valide un fichier de définitions de classes
+    Args:
+        chemin (str): Fichier JSON
+    Returns:
+        list[dict]: Définitions complétées par les valeurs par défaut
+    Raises:
+        ValueError: Définition incomplète ou invalide
+    """
+    with open(chemin, encoding='utf-8') as f:
+        brutes = json.load(f)
+    return [completer_definition(d) for d in brutes]
+
+
+def completer_definition(definition):
+    """
+    Valide une définition et lui ajoute les valeurs par défaut
+    Args:
+        definition (dict): Définition lue dans le fichier
+    Returns:
+        dict: Nouvelle définition complète
+    """
+    manquants = [champ for champ in _OBLIGATOIRES if champ not in definition]
+    if manquants:
+        raise ValueError(f"Définition de classe incomplète, champs manquants : {', '.join(manquants)}")
+    complete = dict(_DEFAUTS)
+    complete.update(definition)
+    complete['nom'] = complete['nom'].lower()
+    complete.setdefault('libelle', complete['nom'].capitalize())
+    for champ in ('degats_normale', 'coups_normale', 'degats_speciale', 'special_cost', 'recharge', 'vitesse'):
+        if not isinstance(complete[champ], int) or complete[champ] < 0:
+            raise ValueError(f"{complete['nom']} : {champ} doit être un entier positif")
+    if complete['coups_normale'] < 1:
+        raise ValueError(f"{complete['nom']} : l'attaque de base porte au moins un coup")
+    if complete['vitesse'] < 1:
+        raise ValueError(f"{complete['nom']} : la vitesse doit être au moins 1")
+    if not isinstance(complete['etourdissement'], (int, float)) or not 0 <= complete['etourdissement'] <= 1:
+        raise ValueError(f"{complete['nom']} : etourdissement est une probabilité entre 0 et 1")
+    return complete
+
+
+def compiler_actions(definition):
+    """
+    Table d'actions d'une classe, indexée par identifiant d'action
+    Chaque entrée est (nature, dégâts par coup, coups, coût en énergie,
+    ignore la défense) ; pour une recharge, les dégâts sont l'énergie rendue.
+    Args:
+        definition (dict): Définition complète
+    Returns:
+        tuple: Une entrée par action de ACTIONS
+    """
+    table = [None] * len(ACTIONS)
+    table[ATTAQUER] = (FRAPPE, definition['degats_normale'], definition['coups_normale'], 0, False)
+    table[SPECIAL] = (FRAPPE, definition['degats_speciale'], 1, definition['special_cost'],
+                      bool(definition['ignore_defense']))
+    table[DEFENDRE] = (DEFENSE, 0, 0, 0, False)
+    table[RECHARGER] = (RECHARGE, definition['recharge'], 0, 0, False)
+    return tuple(table)
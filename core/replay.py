@@ -0,0 +1,297 @@
+"""
+Enregistrement et relecture binaire des combats
+
+Un fichier de replays est une suite de parties ajoutées les unes après les
+autres, sans en-tête global :
+    en-tête   marque, version du format, classes, version des règles,
+              longueur des noms, drapeaux, puis les deux noms en UTF-8
+    hasard    réglages des mécaniques aléatoires (core.hasard.encoder_hasard),
+              seulement si le drapeau ALEATOIRE est levé
+    actions   un octet par action réussie (indice dans ACTIONS)
+    FIN       octet 0xFF qui clôt une partie terminée
+Une partie abandonnée en cours de combat (nouvelle partie, fermeture de
+l'enregistreur) est close par l'octet ABANDON (0xFE) au lieu de FIN ; une
+partie interrompue (programme arrêté) n'a pas de marque de fin. Les deux
+sont signalées comme incomplètes à la lecture.
+
+Le fichier d'index voisin (même chemin + '.idx') contient, pour chaque partie
+terminée, sa position dans le fichier de replays et un état compact
+(core.etat) toutes les `intervalle` actions, ce qui permet d'aller à un tour
+donné sans rejouer la partie depuis le début.
+"""
+import mmap
+import os
+import struct
+from array import array
+from collections import namedtuple
+
+from core.characters import NOMS_CLASSES
+from core.game import Game, ACTIONS
+from core.hasard import FORMAT_HASARD, encoder_hasard, decoder_hasard
+
+MARQUE = b'RP'
+VERSION = 2
+FIN = 0xFF
+ABANDON = 0xFE
+ALEATOIRE = 1  # Drapeau : la partie a des mécaniques aléatoires
+_ENTETE = struct.Struct('<2sBBBIBBB')     # marque, version, classes, version des règles, len(noms), drapeaux
+_ENTREE_INDEX = struct.Struct('<QIIH')    # offset, nb_actions, nb_etats, intervalle
+_ETAT = struct.Struct('<Q')
+_OCTETS = [bytes((code,)) for code in range(len(ACTIONS))]
+
+Replay = namedtuple('Replay', 'offset classe1 classe2 nom1 nom2 version_regles actions complet hasard',
+                    defaults=(None,))
+Replay.__doc__ = ("Partie lue dans un fichier de replays ; actions est un bytes d'identifiants d'action, "
+                  "hasard ses MecaniquesAleatoires (None sans mécaniques aléatoires)")
+
+
+def _version_regles():
+    from core.solveur import version_regles
+    return version_regles()
+
+
+class EnregistreurReplay:
+    """Écrit les parties d'un Game dans un fichier de replays et son index"""
+
+    def __init__(self, chemin, intervalle=16):
+        """
+        Args:
+            chemin (str): Fichier de replays, complété s'il existe déjà
+            intervalle (int): Nombre d'actions entre deux états de l'index
+        """
+        self.chemin = chemin
+        self.intervalle = intervalle
+        self.version_regles = _version_regles()
+        self._flux = open(chemin, 'ab')
+        self._index = open(chemin + '.idx', 'ab')
+        self._offset = None  # Position de la partie en cours, None hors partie
+        self._nb_actions = 0
+        self._etats = array('Q')
+
+    def debut(self, game):
+        """Commence une nouvelle partie ; une partie en cours est close comme abandonnée"""
+        self.terminer()
+        nom1 = game.joueur1.nom.encode('utf-8')[:255]
+        nom2 = game.joueur2.nom.encode('utf-8')[:255]
+        self._offset = self._flux.tell()
+        self._flux.write(_ENTETE.pack(MARQUE, VERSION, game.joueur1.identifiant,
+                                      game.joueur2.identifiant, self.version_regles,
+                                      len(nom1), len(nom2), 0 if game.hasard is None else ALEATOIRE))
+        self._flux.write(nom1 + nom2)
+        if game.hasard is not None:
+            self._flux.write(encoder_hasard(game.hasard))
+        self._nb_actions = 0
+        self._etats = array('Q', (game.instantane(),))
+
+    def enregistrer(self, game, code):
+        """
+        Ajoute une action réussie, appelé par Game.executer_action après le tour
+        Args:
+            game (Game): Partie où l'action vient d'être jouée
+            code (int): Identifiant de l'action jouée
+        """
+        if self._offset is None:
+            return
+        self._flux.write(_OCTETS[code])
+        self._nb_actions += 1
+        if game.moteur_combat.is_combat_over:
+            self._clore()
+        elif not self._nb_actions % self.intervalle:
+            self._etats.append(game.instantane())
+
+    def terminer(self):
+        """Abandonne la partie en cours : close par ABANDON, elle n'entre pas dans l'index"""
+        if self._offset is not None:
+            self._flux.write(bytes((ABANDON,)))
+            self._offset = None
+
+    def _clore(self):
+        """Clôt la partie terminée et l'ajoute à l'index"""
+        self._flux.write(bytes((FIN,)))
+        self._index.write(_ENTREE_INDEX.pack(self._offset, self._nb_actions, len(self._etats), self.intervalle))
+        self._index.write(self._etats.tobytes())
+        self._offset = None
+
+    def fermer(self):
+        """Écrit les données en attente et ferme les fichiers ; une partie en cours est close comme abandonnée"""
+        self.terminer()
+        self._flux.close()
+        self._index.close()
+
+
+def _projeter(chemin):
+    """Projette un fichier en lecture seule, None s'il est vide ou absent"""
+    if not os.path.exists(chemin) or os.path.getsize(chemin) == 0:
+        return None
+    with open(chemin, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class LecteurReplays:
+    """Lecture en flux d'un fichier de replays projeté en mémoire"""
+
+    def __init__(self, chemin):
+        """
+        Args:
+            chemin (str): Fichier écrit par EnregistreurReplay
+        """
+        self.chemin = chemin
+        self._mm = _projeter(chemin)
+        self._index = None
+        self._entrees = None  # Position de chaque entrée dans l'index, construite à la demande
+
+    def __iter__(self):
+        """Parcourt les parties dans l'ordre du fichier, une à la fois"""
+        mm = self._mm
+        if mm is None:
+            return
+        fin_fichier = len(mm)
+        position = 0
+        while position < fin_fichier:
+            replay, position = self._lire(position)
+            yield replay
+
+    def lire(self, offset):
+        """
+        Lit la partie qui commence à une position du fichier
+        Returns:
+            Replay: Partie lue
+        """
+        return self._lire(offset)[0]
+
+    def _lire(self, offset):
+        """Décode une partie ; retourne (Replay, position de la suivante)"""
+        mm = self._mm
+        marque, version = mm[offset:offset + 2], mm[offset + 2]
+        if marque != MARQUE or version != VERSION:
+            raise ValueError(f"Replay invalide à la position {offset}")
+        _, _, classe1, classe2, version_regles, long1, long2, drapeaux = _ENTETE.unpack_from(mm, offset)
+        debut_noms = offset + _ENTETE.size
+        debut = debut_noms + long1 + long2
+        hasard = None
+        if drapeaux & ALEATOIRE:
+            hasard = decoder_hasard(mm, debut)
+            debut += FORMAT_HASARD.size
+        # Les identifiants d'action sont petits : le premier octet FIN ou ABANDON clôt la partie
+        fin = mm.find(b'\xff', debut)
+        if fin < 0:
+            fin = len(mm)
+        abandon = mm.find(b'\xfe', debut, fin)  # Cherché avant FIN seulement
+        if abandon >= 0:
+            fin = abandon
+        complet = fin < len(mm) and mm[fin] == FIN
+        replay = Replay(offset, classe1, classe2,
+                        mm[debut_noms:debut_noms + long1].decode('utf-8', 'replace'),
+                        mm[debut_noms + long1:debut_noms + long1 + long2].decode('utf-8', 'replace'),
+                        version_regles, mm[debut:fin], complet, hasard)
+        return replay, fin + 1
+
+    def _charger_index(self):
+        """Relève la position de chaque entrée du fichier d'index"""
+        self._index = _projeter(self.chemin + '.idx')
+        self._entrees = array('Q')
+        if self._index is None:
+            return
+        position, taille = 0, len(self._index)
+        while position < taille:
+            self._entrees.append(position)
+            nb_etats = _ENTREE_INDEX.unpack_from(self._index, position)[2]
+            position += _ENTREE_INDEX.size + nb_etats * _ETAT.size
+
+    def __len__(self):
+        """Nombre de parties terminées, d'après l'index"""
+        if self._entrees is None:
+            self._charger_index()
+        return len(self._entrees)
+
+    def aller_a(self, numero, tour, game=None):
+        """
+        Place une partie indexée à un tour donné
+        Repart de l'état de l'index le plus proche et rejoue au plus
+        `intervalle - 1` actions.
+        Args:
+            numero (int): Rang de la partie dans l'index
+            tour (int): Nombre d'actions déjà jouées (borné à la fin de partie)
+            game (Game): Partie à réutiliser, une nouvelle sinon
+        Returns:
+            Game: Partie dans l'état voulu (sans historique)
+        """
+        if self._entrees is None:
+            self._charger_index()
+        position = self._entrees[numero]
+        offset, nb_actions, nb_etats, intervalle = _ENTREE_INDEX.unpack_from(self._index, position)
+        replay = self.lire(offset)
+        tour = max(0, min(tour, nb_actions))
+        rang = min(tour // intervalle, nb_etats - 1)
+        etat = _ETAT.unpack_from(self._index, position + _ENTREE_INDEX.size + rang * _ETAT.size)[0]
+
+        game = _preparer(game, replay)
+        game.restaurer(etat)
+        for code in replay.actions[rang * intervalle:tour]:
+            game.executer_action(code)
+        return game
+
+    def fermer(self):
+        """Libère les projections mémoire"""
+        for mm in (self._mm, self._index):
+            if mm is not None:
+                mm.close()
+        self._mm = self._index = None
+
+
+def _preparer(game, replay):
+    """Remet une partie dans l'état initial d'un replay, avec ses mécaniques aléatoires"""
+    if game is None:
+        game = Game(journalisation=False)
+    game.hasard = replay.hasard
+    game.creer_personnage(NOMS_CLASSES[replay.classe1], replay.nom1, 1)
+    game.creer_personnage(NOMS_CLASSES[replay.classe2], replay.nom2, 2)
+    game.demarrer_combat()
+    return game
+
+
+def rejouer(replay, game=None):
+    """
+    Rejoue une partie action par action
+    Args:
+        replay (Replay): Partie lue
+        game (Game): Partie à réutiliser, une nouvelle sinon
+    Yields:
+        Game: La partie après chaque action
+    """
+    game = _preparer(game, replay)
+    for code in replay.actions:
+        game.executer_action(code)
+        yield game
+
+
+def verifier(replays):
+    """
+    Vérifie des parties en flux en les rejouant
+    Une partie est valide si elle a été jouée avec les règles actuelles,
+    si chaque action est possible, si aucune action ne suit la fin du
+    combat et si la dernière action d'une partie complète le termine.
+    Args:
+        replays (iterable[Replay]): Parties, par exemple un LecteurReplays
+    Yields:
+        tuple: (Replay, bool valide)
+    """
+    version = _version_regles()
+    game = Game(journalisation=False)
+    for replay in replays:
+        valide = replay.version_regles == version
+        if valide:
+            game = _preparer(game, replay)
+            executer = game.executer_action
+            fini = False
+            for code in replay.actions:
+                if fini or code >= len(ACTIONS):
+                    valide = False
+                    break
+                succes, fini = executer(code)
+                if not succes:
+                    valide = False
+                    break
+            else:
+                valide = fini or not replay.complet
+        yield replay, valide
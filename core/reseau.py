@@ -0,0 +1,378 @@
+"""
+Serveur de duels en réseau
+
+Un seul processus asyncio héberge de nombreuses parties. Le protocole est
+une ligne JSON par message, dans les deux sens :
+    {"op": "creer", "classe": "mage", "nom": "Merlin"}
+        -> {"ok": true, "partie": 1, "joueur": 1}
+    {"op": "rejoindre", "partie": 1, "classe": "archer", "nom": "Robin"}
+        -> {"ok": true, "partie": 1, "joueur": 2, ...état complet}
+    {"op": "agir", "partie": 1, "action": "attaquer"}
+        -> {"ok": true, ...changements depuis la dernière réponse}
+    {"op": "etat", "partie": 1, "complet": false}
+        -> {"ok": true, ...changements, ou état complet si demandé}
+    {"op": "regarder", "partie": 1}
+        -> {"ok": true, "partie": 1}, puis les événements de la partie
+Les erreurs sont renvoyées sous la forme {"ok": false, "erreur": "..."}.
+
+Les réponses d'état ne contiennent que ce qui a changé pour ce joueur depuis
+sa réponse précédente : pv, energie, tour, gagnant et les nouveaux messages
+du journal. Quand un joueur agit, son adversaire reçoit les mêmes
+changements sans les avoir demandés, dans un message {"evt": "action", ...}.
+
+Les spectateurs (op regarder) reçoivent les messages d'une core.diffusion.Diffusion
+de la partie, encodés une fois pour tous ; un spectateur dont la connexion
+n'avance pas reçoit un instantané complet quand il rattrape son retard, sans
+ralentir les joueurs.
+"""
+import asyncio
+import json
+
+from core.diffusion import Diffusion
+from core.game import Game
+
+_SEPARATEURS = (',', ':')
+_FERMEE = object()  # Fin des réponses d'un client : la connexion est fermée
+
+
+class Partie:
+    """Une partie hébergée et ce que chaque joueur en a déjà reçu"""
+    __slots__ = ('numero', 'game', 'connexions', 'vus', 'envoyes', 'diffusion')
+
+    def __init__(self, numero):
+        self.numero = numero
+        self.game = Game()
+        self.connexions = [None, None]
+        self.vus = [0, 0]  # Nombre d'événements du journal déjà envoyés
+        self.envoyes = [None, None]  # Dernier état envoyé : (pv, energie, tour, gagnant)
+        self.diffusion = None  # Créée pour le premier spectateur
+
+    def delta(self, siege, complet=False):
+        """
+        Changements à envoyer à un joueur depuis sa dernière réponse
+        Args:
+            siege (int): 0 pour le joueur 1, 1 pour le joueur 2
+            complet (bool): Envoie tout l'état et l'historique depuis le début
+        Returns:
+            dict: Champs modifiés
+        """
+        game = self.game
+        j1, j2 = game.joueur1, game.joueur2
+        actuel = (
+            [j1.pv, j2.pv] if j2 else [j1.pv, 0],
+            [j1.energie, j2.energie] if j2 else [j1.energie, 0],
+            game.get_joueur_actuel(),
+            0 if game.gagnant is None else (1 if game.gagnant is j1 else 2),
+        )
+        precedent = None if complet else self.envoyes[siege]
+        reponse = {}
+        for cle, valeur, ancienne in zip(('pv', 'energie', 'tour', 'gagnant'), actuel,
+                                         precedent or (None,) * 4):
+            if valeur != ancienne:
+                reponse[cle] = valeur
+        if complet:
+            reponse['noms'] = [j1.nom, j2.nom if j2 else None]
+            self.vus[siege] = 0
+        debut = self.vus[siege]
+        if len(game.journal) > debut:
+            reponse['messages'] = list(game.journal.messages(debut))
+            self.vus[siege] = len(game.journal)
+        self.envoyes[siege] = actuel
+        return reponse
+
+
+class ServeurDuels:
+    """Héberge les parties et traite les requêtes des clients"""
+
+    def __init__(self, capacite_spectateur=64):
+        """
+        Args:
+            capacite_spectateur (int): Retard maximal d'un spectateur, en événements
+        """
+        self.parties = {}
+        self.capacite_spectateur = capacite_spectateur
+        self._prochain = 1
+        self._serveur = None
+
+    async def demarrer(self, hote='127.0.0.1', port=0):
+        """
+        Ouvre le port d'écoute
+        Args:
+            hote (str): Adresse d'écoute
+            port (int): Port, 0 pour en choisir un libre
+        Returns:
+            int: Port effectivement utilisé
+        """
+        self._serveur = await asyncio.start_server(self._connexion, hote, port, limit=1 << 16)
+        return self._serveur.sockets[0].getsockname()[1]
+
+    async def arreter(self):
+        """Ferme le port d'écoute"""
+        if self._serveur is not None:
+            self._serveur.close()
+            await self._serveur.wait_closed()
+            self._serveur = None
+
+    async def _connexion(self, reader, writer):
+        """Boucle de lecture d'un client, une requête par ligne"""
+        sieges = {}  # numero de partie -> siège occupé par ce client
+        spectateurs = {}  # numero de partie -> (abonnement, tâche d'envoi)
+        try:
+            while True:
+                ligne = await reader.readline()
+                if not ligne:
+                    break
+                try:
+                    requete = json.loads(ligne)
+                    reponse = self.traiter(requete, writer, sieges, spectateurs)
+                except KeyError as erreur:
+                    reponse = {'ok': False, 'erreur': f"Champ manquant : {erreur.args[0]}"}
+                except (ValueError, TypeError) as erreur:
+                    reponse = {'ok': False, 'erreur': str(erreur)}
+                except Exception as erreur:  # Une requête fautive ne coûte pas son siège au client
+                    reponse = {'ok': False, 'erreur': f"Requête non traitée : {erreur!r}"}
+                writer.write(_encoder(reponse))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._deconnecter(writer, sieges, spectateurs)
+            writer.close()
+
+    def _deconnecter(self, writer, sieges, spectateurs=()):
+        """Libère les sièges et abonnements d'un client ; une partie sans joueur est supprimée"""
+        for numero in spectateurs:
+            abonnement, tache = spectateurs[numero]
+            tache.cancel()
+            if not abonnement.ferme:
+                abonnement.diffusion.desabonner(abonnement)
+        for numero, siege in sieges.items():
+            partie = self.parties.get(numero)
+            if partie is None:
+                continue
+            partie.connexions[siege] = None
+            if partie.connexions == [None, None]:
+                del self.parties[numero]
+                if partie.diffusion is not None:
+                    partie.diffusion.fermer()
+
+    def traiter(self, requete, writer, sieges, spectateurs=None):
+        """
+        Traite une requête décodée
+        Args:
+            requete (dict): Requête du client
+            writer: Flux du client, pour lui envoyer les actions adverses
+            sieges (dict): Parties où ce client a un siège
+            spectateurs (dict): Parties que ce client regarde
+        Returns:
+            dict: Réponse à renvoyer
+        """
+        if not isinstance(requete, dict):
+            raise ValueError("La requête doit être un objet JSON")
+        op = _champ(requete, 'op', str)
+        if op == 'creer':
+            partie = Partie(self._prochain)
+            if not partie.game.creer_personnage(_champ(requete, 'classe', str), _champ(requete, 'nom', str), 1):
+                return {'ok': False, 'erreur': "Classe inconnue"}
+            self._prochain += 1
+            self.parties[partie.numero] = partie
+            partie.connexions[0] = writer
+            sieges[partie.numero] = 0
+            return {'ok': True, 'partie': partie.numero, 'joueur': 1}
+
+        partie = self.parties.get(_champ(requete, 'partie', int))
+        if partie is None:
+            return {'ok': False, 'erreur': "Partie inconnue"}
+
+        if op == 'rejoindre':
+            if partie.game.joueur2 is not None:
+                return {'ok': False, 'erreur': "Partie complète"}
+            if not partie.game.creer_personnage(_champ(requete, 'classe', str), _champ(requete, 'nom', str), 2):
+                return {'ok': False, 'erreur': "Classe inconnue"}
+            partie.connexions[1] = writer
+            sieges[partie.numero] = 1
+            partie.game.demarrer_combat()
+            self._notifier(partie, 0, 'debut')
+            reponse = partie.delta(1, complet=True)
+            reponse.update(ok=True, partie=partie.numero, joueur=2)
+            return reponse
+
+        if op == 'regarder':
+            if spectateurs is None:
+                return {'ok': False, 'erreur': "Spectateurs non pris en charge"}
+            if partie.numero not in spectateurs:
+                if partie.diffusion is None:
+                    partie.diffusion = Diffusion(partie.game)
+                abonnement = partie.diffusion.abonner(self.capacite_spectateur)
+                tache = asyncio.ensure_future(_transmettre(abonnement, writer))
+                spectateurs[partie.numero] = (abonnement, tache)
+            return {'ok': True, 'partie': partie.numero}
+
+        siege = sieges.get(partie.numero)
+        if siege is None:
+            return {'ok': False, 'erreur': "Pas de siège dans cette partie"}
+
+        if op == 'agir':
+            if partie.game.get_joueur_actuel() != siege + 1:
+                return {'ok': False, 'erreur': "Ce n'est pas votre tour"}
+            succes, _ = partie.game.executer_action(_champ(requete, 'action', str))
+            if not succes:
+                return {'ok': False, 'erreur': "Action impossible"}
+            self._notifier(partie, 1 - siege, 'action')
+            reponse = partie.delta(siege)
+        elif op == 'etat':
+            reponse = partie.delta(siege, complet=_champ(requete, 'complet', bool, False))
+        else:
+            return {'ok': False, 'erreur': f"Opération inconnue : {op}"}
+        reponse['ok'] = True
+        return reponse
+
+    def _notifier(self, partie, siege, evenement):
+        """Envoie les changements à un joueur connecté, sans attendre sa requête"""
+        writer = partie.connexions[siege]
+        if writer is None or writer.is_closing():
+            return
+        message = partie.delta(siege, complet=evenement == 'debut')
+        message['evt'] = evenement
+        message['partie'] = partie.numero
+        writer.write(_encoder(message))
+
+
+async def _transmettre(abonnement, writer):
+    """Envoie à un spectateur les messages de son abonnement, au rythme de sa connexion"""
+    reveil = asyncio.Event()
+    try:
+        while True:
+            messages = abonnement.lire()
+            if messages:
+                writer.writelines(messages)
+                await writer.drain()  # Un client lent accumule du retard dans l'abonnement
+                continue
+            if abonnement.ferme or writer.is_closing():
+                break
+            reveil.clear()
+            abonnement.attendre(reveil.set)
+            await reveil.wait()
+    except ConnectionError:
+        pass
+
+
+def _champ(requete, cle, type_, defaut=KeyError):
+    """
+    Champ d'une requête, vérifié avant d'atteindre la partie
+    Args:
+        requete (dict): Requête décodée
+        cle (str): Nom du champ
+        type_ (type): Type attendu (un booléen n'est pas accepté comme entier)
+        defaut: Valeur d'un champ absent ; sans défaut, le champ est obligatoire
+    Returns:
+        Valeur du champ
+    """
+    if cle not in requete:
+        if defaut is KeyError:
+            raise KeyError(cle)
+        return defaut
+    valeur = requete[cle]
+    if not isinstance(valeur, type_) or (type_ is int and isinstance(valeur, bool)):
+        raise ValueError(f"Champ invalide : {cle}")
+    return valeur
+
+
+def _encoder(message):
+    """Une ligne JSON compacte"""
+    return json.dumps(message, separators=_SEPARATEURS, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+class ClientDuel:
+    """Client asyncio du serveur de duels"""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._reponses = asyncio.Queue()
+        self.evenements = asyncio.Queue()  # Messages envoyés par le serveur sans requête
+        self._lecture = asyncio.ensure_future(self._lire())
+
+    @classmethod
+    async def connecter(cls, hote='127.0.0.1', port=0):
+        """
+        Ouvre une connexion vers un serveur
+        Returns:
+            ClientDuel: Client connecté
+        """
+        reader, writer = await asyncio.open_connection(hote, port, limit=1 << 16)
+        return cls(reader, writer)
+
+    async def _lire(self):
+        """Répartit les messages reçus entre réponses et événements"""
+        try:
+            while True:
+                ligne = await self._reader.readline()
+                if not ligne:
+                    break
+                message = json.loads(ligne)
+                if 'evt' in message:
+                    self.evenements.put_nowait(message)
+                else:
+                    self._reponses.put_nowait(message)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            # Les requêtes en attente, et les suivantes, échouent au lieu d'attendre
+            self._reponses.put_nowait(_FERMEE)
+
+    async def requete(self, **champs):
+        """
+        Envoie une requête et attend sa réponse (les réponses arrivent dans l'ordre)
+        Returns:
+            dict: Réponse du serveur
+        Raises:
+            ConnectionError: La connexion est fermée
+        """
+        self._writer.write(_encoder(champs))
+        await self._writer.drain()
+        reponse = await self._reponses.get()
+        if reponse is _FERMEE:
+            self._reponses.put_nowait(_FERMEE)  # Pour la requête suivante
+            raise ConnectionError("Connexion au serveur fermée")
+        return reponse
+
+    async def creer(self, classe, nom):
+        """Crée une partie et y prend la place du joueur 1"""
+        return await self.requete(op='creer', classe=classe, nom=nom)
+
+    async def rejoindre(self, partie, classe, nom):
+        """Rejoint une partie en attente comme joueur 2, le combat commence"""
+        return await self.requete(op='rejoindre', partie=partie, classe=classe, nom=nom)
+
+    async def agir(self, partie, action):
+        """Joue une action ('attaquer', 'special', 'defendre', 'recharger')"""
+        return await self.requete(op='agir', partie=partie, action=action)
+
+    async def etat(self, partie, complet=False):
+        """Demande les changements depuis la dernière réponse, ou l'état complet"""
+        return await self.requete(op='etat', partie=partie, complet=complet)
+
+    async def regarder(self, partie):
+        """Suit une partie en spectateur ; ses messages arrivent dans self.evenements"""
+        return await self.requete(op='regarder', partie=partie)
+
+    async def fermer(self):
+        """Ferme la connexion"""
+        self._lecture.cancel()
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def servir(hote='127.0.0.1', port=8765):
+    """Lance un serveur et le fait tourner jusqu'à interruption"""
+    serveur = ServeurDuels()
+    await serveur.demarrer(hote, port)
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(servir())
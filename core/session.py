@@ -0,0 +1,208 @@
+"""
+Sauvegarde binaire des parties en cours
+
+Une session est tout ce qu'il faut pour reprendre une partie là où elle
+s'était arrêtée : personnages (classe, nom, pv, énergie, défense), joueur
+dont c'est le tour, numéro du tour, vainqueur, historique et mécaniques
+aléatoires (game.hasard), dont les tirages continuent à l'identique. La reprise
+replace directement cet état (Game.restaurer), sans rejouer aucun tour.
+
+Format d'une session (entiers petit-boutistes) :
+    en-tête   marque, version du format, drapeaux, version des règles,
+              état compact (core.etat), nombre d'événements du journal,
+              longueur des noms
+    noms      les deux noms en UTF-8
+    hasard    réglages des mécaniques aléatoires (core.hasard.encoder_hasard),
+              seulement avec le drapeau _ALEATOIRE
+    journal   les événements, six entiers 32 bits chacun (core.journal)
+Le vainqueur se déduit de l'état compact (un joueur à 0 PV). Une session
+sauvegardée avec d'autres règles (version des règles différente) est
+refusée : son état compact n'aurait pas de sens avec les règles actuelles.
+
+Un FichierSessions range autant de sessions qu'on veut, ajoutées à la suite
+les unes des autres ; chacune se relit par sa position dans le fichier,
+renvoyée à la sauvegarde. Une session sauvegardée de nouveau est ajoutée à
+la fin : seule la position la plus récente compte.
+"""
+import struct
+
+from core.characters import NOMS_CLASSES
+from core.engine import CombatEngine
+from core.game import Game
+from core.hasard import FORMAT_HASARD, encoder_hasard, decoder_hasard
+
+MARQUE = b'SE'
+VERSION = 2
+_ENTETE = struct.Struct('<2sBBIQIBB')  # marque, version, drapeaux, version des règles, état, événements, noms
+_TAILLE_EVENEMENT = 24  # Six entiers 32 bits
+
+# Drapeaux
+_DEMARREE = 1  # Combat démarré
+_JOURNALISEE = 2  # Game(journalisation=True)
+_ALEATOIRE = 4  # Mécaniques aléatoires (game.hasard)
+
+
+def _version_regles():
+    from core.solveur import version_regles
+    return version_regles()
+
+
+def encoder_session(game, version_regles=None):
+    """
+    Encode une partie
+    Args:
+        game (Game): Partie dont les deux personnages existent
+        version_regles (int): Empreinte des règles actuelles (core.solveur.version_regles),
+            calculée si omise
+    Returns:
+        bytes: Session
+    """
+    if version_regles is None:
+        version_regles = _version_regles()
+    j1, j2 = game.joueur1, game.joueur2
+    if j1 is None or j2 is None:
+        raise ValueError("Une session se sauvegarde avec ses deux personnages")
+    drapeaux = _JOURNALISEE if game.journal.actif else 0
+    if game.moteur_combat:
+        drapeaux |= _DEMARREE
+        etat = game.instantane()
+        journal = game.journal.exporter()
+    else:
+        etat = j1.identifiant << 29 | j2.identifiant << 32
+        journal = b''
+    nom1 = j1.nom.encode('utf-8')[:255]
+    nom2 = j2.nom.encode('utf-8')[:255]
+    hasard = b''
+    if game.hasard is not None:
+        drapeaux |= _ALEATOIRE
+        hasard = encoder_hasard(game.hasard)
+    return b''.join((_ENTETE.pack(MARQUE, VERSION, drapeaux, version_regles, etat,
+                                  len(journal) // _TAILLE_EVENEMENT, len(nom1), len(nom2)),
+                     nom1, nom2, hasard, journal))
+
+
+def _lire_entete(donnees, position=0):
+    """Champs de l'en-tête au début de donnees et taille totale de la session (position : pour les erreurs)"""
+    marque, version, drapeaux, version_regles, etat, nb_evenements, long1, long2 = _ENTETE.unpack_from(donnees)
+    if marque != MARQUE or version != VERSION:
+        raise ValueError(f"Session invalide à la position {position}")
+    taille = _ENTETE.size + long1 + long2 + nb_evenements * _TAILLE_EVENEMENT
+    if drapeaux & _ALEATOIRE:
+        taille += FORMAT_HASARD.size
+    return drapeaux, version_regles, etat, long1, long2, taille
+
+
+def decoder_session(donnees, game=None, version_regles=None):
+    """
+    Reprend une partie encodée par encoder_session
+    Args:
+        donnees (bytes): Session
+        game (Game): Partie à réutiliser (observateurs, chronologie...), une nouvelle sinon
+        version_regles (int): Empreinte des règles actuelles, calculée si omise
+    Returns:
+        Game: Partie dans l'état sauvegardé
+    """
+    drapeaux, version_session, etat, long1, long2, taille = _lire_entete(donnees)
+    if len(donnees) < taille:
+        raise ValueError("Session tronquée")
+    if version_regles is None:
+        version_regles = _version_regles()
+    if version_session != version_regles:
+        raise ValueError("Session sauvegardée avec d'autres règles")
+    if game is None:
+        game = Game(journalisation=bool(drapeaux & _JOURNALISEE))
+    debut_noms = _ENTETE.size
+    fin_noms = debut_journal = debut_noms + long1 + long2
+    game.hasard = None
+    if drapeaux & _ALEATOIRE:
+        game.hasard = decoder_hasard(donnees, fin_noms)
+        debut_journal += FORMAT_HASARD.size
+    game.creer_personnage(NOMS_CLASSES[etat >> 29 & 7],
+                          bytes(donnees[debut_noms:debut_noms + long1]).decode('utf-8', 'replace'), 1)
+    game.creer_personnage(NOMS_CLASSES[etat >> 32 & 7],
+                          bytes(donnees[debut_noms + long1:fin_noms]).decode('utf-8', 'replace'), 2)
+    game.gagnant = None
+    if game.enregistreur is not None:
+        game.enregistreur.terminer()  # La partie reprise n'est pas celle en cours d'enregistrement
+    if not drapeaux & _DEMARREE:
+        game.moteur_combat = None
+        game.journal.demarrer(game.joueur1, game.joueur2)  # Rien du combat précédent
+        return game
+
+    game.moteur_combat = CombatEngine(game.joueur1, game.joueur2)
+    game.journal.demarrer(game.joueur1, game.joueur2)
+    game.journal.importer(donnees[debut_journal:taille])
+    game.restaurer(etat)
+    if game.chronologie is not None:
+        game.chronologie.debut(game)
+    return game
+
+
+class FichierSessions:
+    """Fichier de sessions, écrit à la suite et relu par position"""
+
+    def __init__(self, chemin):
+        """
+        Args:
+            chemin (str): Fichier, complété s'il existe déjà
+        """
+        self.chemin = chemin
+        self.version_regles = _version_regles()
+        self._flux = open(chemin, 'a+b')
+        self._fin = self._flux.seek(0, 2)
+
+    def sauvegarder(self, game):
+        """
+        Ajoute une session à la fin du fichier
+        Args:
+            game (Game): Partie à sauvegarder
+        Returns:
+            int: Position de la session, à passer à charger
+        """
+        donnees = encoder_session(game, self.version_regles)
+        offset = self._fin
+        self._flux.write(donnees)  # Mode ajout : toujours écrit en fin de fichier
+        self._fin += len(donnees)
+        return offset
+
+    def lire(self, offset):
+        """
+        Returns:
+            bytes: Session brute à une position
+        """
+        flux = self._flux
+        flux.seek(offset)
+        entete = flux.read(_ENTETE.size)
+        if len(entete) < _ENTETE.size:
+            raise ValueError(f"Pas de session à la position {offset}")
+        taille = _lire_entete(entete, offset)[-1]
+        return entete + flux.read(taille - _ENTETE.size)
+
+    def charger(self, offset, game=None):
+        """
+        Reprend la session sauvegardée à une position
+        Args:
+            offset (int): Position renvoyée par sauvegarder
+            game (Game): Partie à réutiliser, une nouvelle sinon
+        Returns:
+            Game: Partie reprise
+        """
+        return decoder_session(self.lire(offset), game, self.version_regles)
+
+    def __iter__(self):
+        """Positions de toutes les sessions du fichier, dans l'ordre"""
+        flux = self._flux
+        offset = 0
+        while offset < self._fin:
+            flux.seek(offset)
+            taille = _lire_entete(flux.read(_ENTETE.size), offset)[-1]
+            yield offset
+            offset += taille
+
+    def vider(self):
+        """Écrit sur le disque les sessions en attente"""
+        self._flux.flush()
+
+    def fermer(self):
+        """Écrit les sessions en attente et ferme le fichier"""
+        self._flux.close()
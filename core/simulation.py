@@ -0,0 +1,335 @@
+"""
+Simulation headless et vectorisée de duels
+
+Représente N duels simultanés sous forme de tableaux NumPy et fait avancer
+tous les duels d'un tour avec un seul appel vectorisé. Les règles sont
+lues sur les classes de core.characters pour rester identiques à celles
+de Game.executer_action.
+
+Avec des mécaniques aléatoires (core.hasard), chaque duel du lot a sa
+graine : ses tirages sont ceux qu'aurait un Game de même graine
+(game.hasard = hasard.pour_graine(graine)), calculés pour tout le lot à la fois.
+"""
+import numpy as np
+
+from core.characters import CLASSES, classe_id, regles_classe
+from core.hasard import TIRAGE_ECHEC, TIRAGE_CRITIQUE, TIRAGE_ETOURDISSEMENT, cles_graines, seuil, tirages
+from core.game import ATTAQUER, SPECIAL, DEFENDRE, RECHARGER
+
+GUERRIER, MAGE, ARCHER = 0, 1, 2
+AUCUNE = 4  # Action neutre pour les duels qu'on ne fait pas avancer
+
+
+def compiler_regles(regles):
+    """
+    Précalcule les règles en tables plates indexées par cle = classe * 5 + action
+    Les tables d'énergie sont indexées par cle * (energie_max + 1) + energie et
+    celles de dégâts par cle * 2 + défense de la cible, de sorte qu'un tour de
+    jeu se résume à quelques lectures de table.
+    Args:
+        regles (list[dict]): Paramètres de chaque classe, au format de
+            regles_classe ; pv_max et energie_max sont lus sur la première
+    Returns:
+        dict: Tableaux NumPy et constantes communes
+    """
+    pv_max, energie_max = regles[0]['pv_max'], regles[0]['energie_max']
+    nb_energies = energie_max + 1
+    taille = len(regles) * 5
+    energie = np.zeros(taille * nb_energies, dtype=np.int16)
+    valide = np.zeros(taille * nb_energies, dtype=bool)
+    degats = np.zeros(taille * 2, dtype=np.int16)
+    garde_defense = np.zeros(taille * 2, dtype=bool)
+    defend = np.zeros(taille, dtype=bool)
+    for cid, r in enumerate(regles):
+        for action in range(AUCUNE + 1):
+            cle = cid * 5 + action
+            for e in range(nb_energies):
+                i = cle * nb_energies + e
+                energie[i] = e
+                valide[i] = action < AUCUNE
+                if action == SPECIAL:
+                    valide[i] = e >= r['special_cost']
+                    energie[i] = e - r['special_cost'] if valide[i] else e
+                elif action == RECHARGER:
+                    energie[i] = min(e + r['recharge'], energie_max)
+            # Seul le premier coup est réduit par la défense, qu'il consomme
+            if action in (ATTAQUER, SPECIAL):
+                brut = r['degats_normale'] if action == ATTAQUER else r['degats_speciale']
+                coups = r['coups_normale'] if action == ATTAQUER else 1
+                ignore = action == SPECIAL and r['ignore_defense']
+                degats[cle * 2] = brut * coups
+                degats[cle * 2 + 1] = brut * coups if ignore else max(1, brut // 2) + brut * (coups - 1)
+                garde_defense[cle * 2 + 1] = ignore
+            else:
+                garde_defense[cle * 2 + 1] = True
+            defend[cle] = action == DEFENDRE
+    return {
+        'energie': energie,
+        'valide': valide,
+        'degats': degats,
+        'garde_defense': garde_defense,
+        'defend': defend,
+        'special_cost': np.array([r['special_cost'] for r in regles], dtype=np.int16),
+        'pv_max': pv_max,
+        'energie_max': energie_max,
+    }
+
+
+REGLES = compiler_regles([regles_classe(cid) for cid in range(len(CLASSES))])
+
+
+class SimulateurLot:
+    """
+    N duels indépendants avancés en parallèle, un tour par appel à step
+    Les tableaux par combattant ont la forme (2, N) : la ligne 0 correspond
+    au joueur 1 et la ligne 1 au joueur 2.
+    """
+
+    def __init__(self, classes1, classes2, n=None, regles=None, hasard=None, graines=None):
+        """
+        Args:
+            classes1: Classe(s) du joueur 1 (nom, identifiant ou tableau de N identifiants)
+            classes2: Classe(s) du joueur 2
+            n (int): Nombre de duels (déduit des tableaux si omis)
+            regles (dict): Tables produites par compiler_regles, REGLES par défaut
+            hasard (MecaniquesAleatoires): Réglages des mécaniques aléatoires, aucune par défaut
+            graines: Graine de chaque duel (tableau de N entiers), 0, 1, 2... par défaut
+        """
+        self.regles = REGLES if regles is None else regles
+        self.hasard = hasard
+        c1 = np.asarray(classe_id(classes1) if isinstance(classes1, str) else classes1, dtype=np.int16)
+        c2 = np.asarray(classe_id(classes2) if isinstance(classes2, str) else classes2, dtype=np.int16)
+        if n is None:
+            n = max(c1.size, c2.size)
+        self.n = n
+        self.classes = np.empty((2, n), dtype=np.int16)
+        self.classes[0] = c1
+        self.classes[1] = c2
+        self._cle = self.classes * 5  # Début de la ligne des tables de chaque combattant
+
+        self.pv = np.empty((2, n), dtype=np.int16)
+        self.energie = np.empty((2, n), dtype=np.int16)
+        self.is_defending = np.empty((2, n), dtype=bool)
+        self.joueur = np.empty(n, dtype=bool)        # False = tour du joueur 1, True = joueur 2
+        self.tours = np.empty(n, dtype=np.int32)     # Actions réussies jouées
+        self.gagnant = np.empty(n, dtype=np.int8)    # -1 tant que le duel continue
+        self.graines = np.arange(n, dtype=np.uint64) if graines is None else np.asarray(graines, dtype=np.uint64)
+        self._cles = cles_graines(self.graines)
+        if hasard is not None and hasard.etourdissement:
+            self._seuils_etourdissement = np.array([seuil(c.chance_etourdissement) for c in CLASSES],
+                                                   dtype=np.uint64)
+        self.reset()
+
+    def reset(self, selection=None, graines=None):
+        """
+        Remet des duels à leur état initial (tous si selection est None)
+        Args:
+            selection: Masque booléen ou indices des duels à réinitialiser
+            graines: Nouvelles graines de ces duels, inchangées si omises
+        """
+        sel = slice(None) if selection is None else selection
+        if graines is not None:
+            self.graines[sel] = graines
+            self._cles[sel] = cles_graines(self.graines[sel])
+        self.pv[:, sel] = self.regles['pv_max']
+        self.energie[:, sel] = self.regles['energie_max']
+        self.is_defending[:, sel] = False
+        self.joueur[sel] = False
+        self.tours[sel] = 0
+        self.gagnant[sel] = -1
+
+    @property
+    def termines(self):
+        """Masque des duels terminés"""
+        return self.gagnant >= 0
+
+    # Sélection par arithmétique plutôt que np.where : le masque joueur est
+    # imprévisible et les mélanges sans branchement sont bien plus rapides
+    def actif(self, tableau):
+        """Valeur d'un tableau (2, N) pour le joueur courant de chaque duel"""
+        if tableau.dtype == bool:
+            return (tableau[0] & ~self.joueur) | (tableau[1] & self.joueur)
+        return tableau[0] + (tableau[1] - tableau[0]) * self.joueur.view(np.int8)
+
+    def passif(self, tableau):
+        """Valeur d'un tableau (2, N) pour l'adversaire du joueur courant"""
+        if tableau.dtype == bool:
+            return (tableau[0] & self.joueur) | (tableau[1] & ~self.joueur)
+        return tableau[1] + (tableau[0] - tableau[1]) * self.joueur.view(np.int8)
+
+    def actions_valides(self):
+        """
+        Calcule les actions jouables par le joueur courant de chaque duel
+        Returns:
+            np.ndarray: Tableau (N, 4) de booléens, une colonne par action
+        """
+        valides = np.ones((self.n, 4), dtype=bool)
+        cout = self.regles['special_cost'][self.actif(self.classes)]
+        valides[:, SPECIAL] = self.actif(self.energie) >= cout
+        valides &= ~self.termines[:, None]
+        return valides
+
+    def step(self, actions):
+        """
+        Joue une action pour le joueur courant de chaque duel
+        Mêmes règles que Game.executer_action : une spéciale sans assez
+        d'énergie échoue sans passer le tour, et la défense de la cible
+        est consommée par le premier coup reçu (sauf tempête du Mage).
+        Args:
+            actions: Tableau de N identifiants d'action (AUCUNE pour ne rien jouer)
+        Returns:
+            np.ndarray: Masque des duels où l'action a été exécutée
+        """
+        regles = self.regles
+        j = self.joueur
+        adv = ~j
+        cle = self.actif(self._cle) + actions
+        cle_energie = cle * (regles['energie_max'] + 1) + self.actif(self.energie)
+        succes = regles['valide'].take(cle_energie) & (self.gagnant < 0)
+
+        defense_cible = self.passif(self.is_defending)
+        cle_degats = cle * 2 + defense_cible
+        degats = regles['degats'].take(cle_degats)
+        if self.hasard is not None:
+            degats, etourdi = self._tirer_effets(actions, degats)
+        pv = self.pv
+        pv_cible = np.maximum(0, self.passif(pv) - degats * succes)
+        pv[0] += (pv_cible - pv[0]) * j.view(np.int8)
+        pv[1] += (pv_cible - pv[1]) * adv.view(np.int8)
+
+        energie = self.energie
+        delta = (regles['energie'].take(cle_energie) - self.actif(energie)) * succes
+        energie[0] += delta * adv.view(np.int8)
+        energie[1] += delta * j.view(np.int8)
+
+        ko = succes & (pv_cible == 0)
+        self.gagnant -= (self.gagnant - j) * ko
+
+        # La défense de la cible est consommée par le coup, puis celle du
+        # nouveau joueur courant est réinitialisée au changement de tour
+        suivant = succes & ~ko
+        defense_cible = (defense_cible & ~succes) | (ko & regles['garde_defense'].take(cle_degats))
+        defense_actif = self.actif(self.is_defending) | (succes & regles['defend'].take(cle))
+        self.is_defending[0] = (defense_cible & j) | (defense_actif & adv)
+        self.is_defending[1] = (defense_actif & j) | (defense_cible & adv)
+        if self.hasard is not None:
+            suivant &= ~etourdi  # La cible étourdie perd son tour : le même joueur rejoue
+        self.joueur ^= suivant
+        self.tours += succes
+        return succes
+
+    def _tirer_effets(self, actions, degats):
+        """
+        Échecs, coups critiques et étourdissements des attaques de ce tour
+        (mêmes tirages que core.engine.step)
+        Returns:
+            tuple: (dégâts corrigés, masque des cibles étourdies)
+        """
+        hasard = self.hasard
+        attaque = (actions == ATTAQUER) | (actions == SPECIAL)
+        rate = attaque & (tirages(self._cles, self.tours, TIRAGE_ECHEC) < hasard.seuil_echec)
+        critique = attaque & ~rate & (tirages(self._cles, self.tours, TIRAGE_CRITIQUE) < hasard.seuil_critique)
+        degats = degats * (1 + (hasard.multiplicateur_critique - 1) * critique.view(np.int8)) * ~rate
+        if hasard.etourdissement:
+            seuils = self._seuils_etourdissement[self.actif(self.classes)]
+            etourdi = (actions == SPECIAL) & ~rate & (
+                tirages(self._cles, self.tours, TIRAGE_ETOURDISSEMENT) < seuils)
+        else:
+            etourdi = np.zeros(self.n, dtype=bool)
+        return degats.astype(np.int16), etourdi
+
+    def simuler(self, politique=None, max_tours=200, rng=None):
+        """
+        Fait avancer tous les duels jusqu'à leur fin (ou max_tours actions)
+        Args:
+            politique: Fonction (simulateur, rng) -> tableau d'actions, aléatoire si None
+            max_tours (int): Limite d'actions par duel, au-delà le duel est nul
+            rng: np.random.Generator utilisé par la politique
+        Returns:
+            np.ndarray: gagnant de chaque duel (0, 1, ou -1 pour un nul)
+        """
+        if politique is None:
+            politique = politique_aleatoire
+        if rng is None:
+            rng = np.random.default_rng()
+        for _ in range(max_tours):
+            en_cours = (self.gagnant < 0) & (self.tours < max_tours)
+            if not en_cours.any():
+                break
+            actions = politique(self, rng)
+            self.step(np.where(en_cours, actions, AUCUNE))
+        return self.gagnant
+
+
+def politique_aleatoire(sim, rng):
+    """Choisit uniformément une action valide pour chaque duel"""
+    actions = rng.integers(0, 4, sim.n, dtype=np.int16)
+    cout = sim.regles['special_cost'][sim.actif(sim.classes)]
+    # Une spéciale impossible est remplacée par une des trois autres actions
+    remplace = (actions == SPECIAL) & (sim.actif(sim.energie) < cout)
+    actions[remplace] = np.array([ATTAQUER, DEFENDRE, RECHARGER], dtype=np.int16)[
+        rng.integers(0, 3, int(remplace.sum()))
+    ]
+    return actions
+
+
+def politique_agressive(sim, rng):
+    """Spéciale dès que possible, attaque normale sinon"""
+    cout = sim.regles['special_cost'][sim.actif(sim.classes)]
+    return np.where(sim.actif(sim.energie) >= cout, SPECIAL, ATTAQUER).astype(np.int16)
+
+
+def simuler_duels(classe1, classe2, n, politique=None, max_tours=200, seed=None, taille_lot=1 << 16,
+                  regles=None, hasard=None):
+    """
+    Simule n duels entre deux classes et résume les résultats
+    Un lot de taille fixe est réutilisé : chaque duel terminé est compté puis
+    réinitialisé sur place, ce qui garde les tableaux petits et pleins.
+    Args:
+        classe1, classe2: Nom ou identifiant de classe
+        n (int): Nombre de duels
+        politique: Politique vectorisée (aléatoire par défaut)
+        max_tours (int): Limite d'actions par duel, au-delà le duel est nul
+        seed (int): Graine du générateur aléatoire
+        taille_lot (int): Nombre de duels simulés simultanément
+        regles (dict): Tables produites par compiler_regles, REGLES par défaut
+        hasard (MecaniquesAleatoires): Mécaniques aléatoires ; le duel numéro i
+            a la graine hasard.graine + i
+    Returns:
+        dict: victoires de chaque joueur, nuls et durée moyenne en tours
+    """
+    if politique is None:
+        politique = politique_aleatoire
+    rng = np.random.default_rng(seed)
+    taille = min(taille_lot, n)
+    graine = 0 if hasard is None else hasard.graine
+    sim = SimulateurLot(classe_id(classe1), classe_id(classe2), taille, regles, hasard,
+                        np.arange(taille, dtype=np.uint64) + np.uint64(graine))
+    prochain = graine + taille  # Graine du prochain duel lancé
+    restants = n - sim.n
+    occupe = np.ones(sim.n, dtype=bool)
+    victoires_j1 = victoires_j2 = nuls = tours = 0
+    while occupe.any():
+        sim.step(np.where(occupe, politique(sim, rng), AUCUNE))
+        fini = occupe & ((sim.gagnant >= 0) | (sim.tours >= max_tours))
+        if not fini.any():
+            continue
+        gagnant = sim.gagnant[fini]
+        victoires_j1 += int((gagnant == 0).sum())
+        victoires_j2 += int((gagnant == 1).sum())
+        nuls += int((gagnant < 0).sum())
+        tours += int(sim.tours[fini].sum())
+        # Les emplacements libérés relancent un duel tant qu'il en reste à jouer
+        libres = np.flatnonzero(fini)
+        relance, arret = libres[:restants], libres[restants:]
+        restants -= relance.size
+        occupe[arret] = False
+        if relance.size:
+            sim.reset(relance, np.arange(prochain, prochain + relance.size, dtype=np.uint64))
+            prochain += relance.size
+    return {
+        'victoires_j1': victoires_j1,
+        'victoires_j2': victoires_j2,
+        'nuls': nuls,
+        'tours_moyens': tours / n if n else 0.0,
+    }
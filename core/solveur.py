@@ -0,0 +1,330 @@
+"""
+Solveur exact des duels par analyse rétrograde
+
+Pour chaque paire de classes, énumère tous les états (pv, énergie de chaque
+combattant, défense de l'adversaire du joueur courant, joueur courant) et
+calcule la valeur du duel en jeu parfait ainsi que la meilleure action.
+Les tables sont écrites dans un fichier binaire compact, projeté en mémoire
+au chargement pour des consultations en O(1).
+
+Valeur d'un état, du point de vue du joueur courant :
+    +d : victoire forcée en d actions (les deux joueurs compris)
+    -d : défaite en d actions face à un adversaire parfait
+     0 : nul, aucun des deux ne peut forcer la victoire
+"""
+import heapq
+import mmap
+import struct
+import zlib
+from array import array
+from itertools import combinations_with_replacement
+
+from core.characters import CLASSES, classe_id, regles_classe
+from core.game import ACTIONS, ATTAQUER, SPECIAL, DEFENDRE, RECHARGER
+
+MAGIC = b'DUELSOLV'
+VERSION = 1
+_ENTETE = struct.Struct('<8sHHI')         # magic, version, nb_tables, version des règles
+_ENTREE = struct.Struct('<BBBBQ')         # classe_a, classe_b, nb_energies_a, nb_energies_b, offset
+
+
+def version_regles():
+    """
+    Empreinte des règles de toutes les classes
+    Une table calculée avec d'autres règles est refusée au chargement.
+    Returns:
+        int: CRC32 des paramètres de règles
+    """
+    return zlib.crc32(repr([sorted(regles_classe(cid).items()) for cid in range(len(CLASSES))]).encode())
+
+
+def energies_atteignables(regles):
+    """
+    Énergies accessibles depuis l'énergie maximale
+    Args:
+        regles (dict): Paramètres de la classe
+    Returns:
+        list[int]: Énergies triées
+    """
+    vues = {regles['energie_max']}
+    a_traiter = [regles['energie_max']]
+    while a_traiter:
+        e = a_traiter.pop()
+        suivantes = [min(e + regles['recharge'], regles['energie_max'])]
+        if e >= regles['special_cost']:
+            suivantes.append(e - regles['special_cost'])
+        for s in suivantes:
+            if s not in vues:
+                vues.add(s)
+                a_traiter.append(s)
+    return sorted(vues)
+
+
+def _degats(regles, action, defense):
+    """Dégâts subis par la cible pour une attaque (même calcul que recevoir_degats)"""
+    if action == ATTAQUER:
+        brut, coups, ignore = regles['degats_normale'], regles['coups_normale'], False
+    else:
+        brut, coups, ignore = regles['degats_speciale'], 1, regles['ignore_defense']
+    premier = max(1, brut // 2) if defense and not ignore else brut
+    return premier + brut * (coups - 1)
+
+
+def _negation(v):
+    """Valeur d'un état vue depuis son prédécesseur (une action plus loin)"""
+    if v > 0:
+        return -(v + 1)
+    if v < 0:
+        return -v + 1
+    return 0
+
+
+def _score(v):
+    """Ordre de préférence : victoire rapide > nul > défaite lente"""
+    if v > 0:
+        return 100000 - v
+    if v < 0:
+        return -100000 - v
+    return 0
+
+
+def resoudre_paire(classe_a, classe_b):
+    """
+    Résout toutes les positions d'un duel entre deux classes
+    Les tranches (pv_a, pv_b) sont traitées par total de pv croissant : une
+    attaque enlève toujours au moins 1 pv et mène à une tranche déjà résolue,
+    tandis que défense et recharge restent dans la tranche et sont résolues
+    par analyse rétrograde.
+    Args:
+        classe_a, classe_b (int): Identifiants des classes des joueurs 1 et 2
+    Returns:
+        tuple: (energies_a, energies_b, valeurs array('h'), actions array('b'))
+    """
+    regles = (regles_classe(classe_a), regles_classe(classe_b))
+    energies = (energies_atteignables(regles[0]), energies_atteignables(regles[1]))
+    ea, eb = len(energies[0]), len(energies[1])
+    nb_pv = regles[0]['pv_max'] + 1
+    taille_tranche = 2 * ea * eb * 2
+    valeurs = array('h', bytes(2 * nb_pv * nb_pv * taille_tranche))
+    actions = array('b', [-1]) * (nb_pv * nb_pv * taille_tranche)
+
+    # États locaux d'une tranche : ((cote * ea + ia) * eb + ib) * 2 + defense
+    locaux = []
+    for cote in (0, 1):
+        for ia in range(ea):
+            for ib in range(eb):
+                for defense in (0, 1):
+                    locaux.append((cote, ia, ib, defense))
+    index_energie = [
+        {e: i for i, e in enumerate(energies[0])},
+        {e: i for i, e in enumerate(energies[1])},
+    ]
+
+    def local(cote, ia, ib, defense):
+        return ((cote * ea + ia) * eb + ib) * 2 + defense
+
+    # Coups internes (défense, recharge) : identiques dans toutes les tranches
+    internes = []
+    for cote, ia, ib, defense in locaux:
+        r = regles[cote]
+        if cote == 0:
+            e_rech = index_energie[0][min(energies[0][ia] + r['recharge'], r['energie_max'])]
+            internes.append(((DEFENDRE, local(1, ia, ib, 1)), (RECHARGER, local(1, e_rech, ib, 0))))
+        else:
+            e_rech = index_energie[1][min(energies[1][ib] + r['recharge'], r['energie_max'])]
+            internes.append(((DEFENDRE, local(0, ia, ib, 1)), (RECHARGER, local(0, ia, e_rech, 0))))
+    predecesseurs = [[] for _ in locaux]
+    for l, coups in enumerate(internes):
+        for _, succ in coups:
+            predecesseurs[succ].append(l)
+
+    # Coups sortants (attaques) : (action, dégâts, nouvel état local sans les pv)
+    sortants = []
+    for cote, ia, ib, defense in locaux:
+        r = regles[cote]
+        e_joueur = energies[cote][ia if cote == 0 else ib]
+        coups = [(ATTAQUER, _degats(r, ATTAQUER, defense), local(1 - cote, ia, ib, 0))]
+        if e_joueur >= r['special_cost']:
+            ie = index_energie[cote][e_joueur - r['special_cost']]
+            succ = local(1, ie, ib, 0) if cote == 0 else local(0, ia, ie, 0)
+            coups.append((SPECIAL, _degats(r, SPECIAL, defense), succ))
+        sortants.append(coups)
+
+    for total in range(2, 2 * nb_pv - 1):
+        for pv_a in range(max(1, total - nb_pv + 1), min(nb_pv - 1, total - 1) + 1):
+            pv_b = total - pv_a
+            base = (pv_a * nb_pv + pv_b) * taille_tranche
+            _resoudre_tranche(
+                pv_a, pv_b, base, nb_pv, taille_tranche, locaux,
+                internes, predecesseurs, sortants, valeurs, actions
+            )
+    return energies[0], energies[1], valeurs, actions
+
+
+def _resoudre_tranche(pv_a, pv_b, base, nb_pv, taille_tranche, locaux,
+                      internes, predecesseurs, sortants, valeurs, actions):
+    """Analyse rétrograde des états d'une tranche (pv_a, pv_b) fixée"""
+    n = len(locaux)
+    restants = [0] * n
+    pire_defaite = [0] * n
+    nul_possible = [False] * n
+    tas = []
+
+    # Valeurs des attaques, qui mènent toutes hors de la tranche
+    valeurs_sortantes = []
+    for l in range(n):
+        cote = locaux[l][0]
+        pv_cible = pv_b if cote == 0 else pv_a
+        resultats = []
+        for action, degats, succ in sortants[l]:
+            reste = pv_cible - degats
+            if reste <= 0:
+                v = 1
+            else:
+                cible = (pv_a * nb_pv + reste) if cote == 0 else (reste * nb_pv + pv_b)
+                v = _negation(valeurs[cible * taille_tranche + succ])
+            resultats.append((action, v))
+            if v > 0:
+                heapq.heappush(tas, (v, l, 1))
+            elif v < 0:
+                pire_defaite[l] = max(pire_defaite[l], -v)
+            else:
+                nul_possible[l] = True
+        valeurs_sortantes.append(resultats)
+        restants[l] = len(internes[l])
+
+    # Résolution par profondeur croissante ; les états jamais résolus sont nuls
+    resolus = {}
+    while tas:
+        profondeur, l, gagne = heapq.heappop(tas)
+        if l in resolus:
+            continue
+        resolus[l] = profondeur if gagne else -profondeur
+        for p in predecesseurs[l]:
+            if p in resolus:
+                continue
+            if gagne:
+                restants[p] -= 1
+                pire_defaite[p] = max(pire_defaite[p], profondeur + 1)
+                if restants[p] == 0 and not nul_possible[p] and not any(
+                        v > 0 for _, v in valeurs_sortantes[p]):
+                    heapq.heappush(tas, (pire_defaite[p], p, 0))
+            else:
+                heapq.heappush(tas, (profondeur + 1, p, 1))
+
+    for l in range(n):
+        meilleur_action, meilleur_v = -1, None
+        for action, v in valeurs_sortantes[l]:
+            if meilleur_v is None or _score(v) > _score(meilleur_v):
+                meilleur_action, meilleur_v = action, v
+        for action, succ in internes[l]:
+            v = _negation(resolus.get(succ, 0))
+            if meilleur_v is None or _score(v) > _score(meilleur_v):
+                meilleur_action, meilleur_v = action, v
+        valeurs[base + l] = meilleur_v
+        actions[base + l] = meilleur_action
+
+
+def ecrire_tables(chemin, paires=None):
+    """
+    Résout les paires de classes et écrit les tables dans un fichier
+    Args:
+        chemin (str): Fichier de sortie
+        paires (list): Couples (classe_a, classe_b) ; toutes les paires par défaut
+    """
+    if paires is None:
+        paires = list(combinations_with_replacement(range(len(CLASSES)), 2))
+    paires = [(classe_id(a), classe_id(b)) for a, b in paires]
+    offset = _ENTETE.size + _ENTREE.size * len(paires)
+    entrees, blocs = [], []
+    for classe_a, classe_b in paires:
+        energies_a, energies_b, valeurs, actions = resoudre_paire(classe_a, classe_b)
+        bloc = bytes(energies_a) + bytes(energies_b)
+        bloc += b'\0' * (-(offset + len(bloc)) % 2)  # Alignement des valeurs sur 2 octets
+        bloc += valeurs.tobytes() + actions.tobytes()
+        entrees.append(_ENTREE.pack(classe_a, classe_b, len(energies_a), len(energies_b), offset))
+        blocs.append(bloc)
+        offset += len(bloc)
+    with open(chemin, 'wb') as f:
+        f.write(_ENTETE.pack(MAGIC, VERSION, len(paires), version_regles()))
+        f.writelines(entrees)
+        f.writelines(blocs)
+
+
+class TableSolution:
+    """Tables de jeu parfait projetées en mémoire"""
+
+    def __init__(self, chemin):
+        """
+        Args:
+            chemin (str): Fichier écrit par ecrire_tables
+        """
+        with open(chemin, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, nb_tables, regles = _ENTETE.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{chemin} n'est pas une table de solution valide")
+        if regles != version_regles():
+            raise ValueError(f"{chemin} a été calculée avec d'autres règles")
+        vue = memoryview(self._mmap)
+        self.nb_pv = regles_classe(0)['pv_max'] + 1
+        self._tables = {}
+        for i in range(nb_tables):
+            classe_a, classe_b, ea, eb, offset = _ENTREE.unpack_from(self._mmap, _ENTETE.size + i * _ENTREE.size)
+            energies_a = list(vue[offset:offset + ea])
+            energies_b = list(vue[offset + ea:offset + ea + eb])
+            debut = offset + ea + eb
+            debut += debut % 2
+            n = self.nb_pv * self.nb_pv * 2 * ea * eb * 2
+            self._tables[classe_a, classe_b] = (
+                {e: i for i, e in enumerate(energies_a)},
+                {e: i for i, e in enumerate(energies_b)},
+                eb,
+                vue[debut:debut + 2 * n].cast('h'),
+                vue[debut + 2 * n:debut + 3 * n].cast('b'),
+            )
+
+    def _index(self, classe_a, classe_b, pv_a, pv_b, energie_a, energie_b, cote, defense):
+        """Table et position d'un état ; les classes inversées sont lues en miroir"""
+        if (classe_a, classe_b) not in self._tables:
+            classe_a, classe_b = classe_b, classe_a
+            pv_a, pv_b, energie_a, energie_b, cote = pv_b, pv_a, energie_b, energie_a, 1 - cote
+        index_a, index_b, eb, valeurs, actions = self._tables[classe_a, classe_b]
+        ea = len(index_a)
+        tranche = (pv_a * self.nb_pv + pv_b) * 2 * ea * eb * 2
+        l = ((cote * ea + index_a[energie_a]) * eb + index_b[energie_b]) * 2 + int(defense)
+        return valeurs, actions, tranche + l
+
+    def consulter(self, classe_a, classe_b, pv_a, pv_b, energie_a, energie_b, cote, defense):
+        """
+        Valeur et meilleure action d'un état
+        Args:
+            classe_a, classe_b (int): Classes des joueurs 1 et 2
+            cote (int): 0 si c'est au joueur 1 de jouer, 1 sinon
+            defense (bool): L'adversaire du joueur courant est en défense
+        Returns:
+            tuple: (valeur, action) avec action parmi ACTIONS
+        """
+        valeurs, actions, i = self._index(classe_a, classe_b, pv_a, pv_b, energie_a, energie_b, cote, defense)
+        return valeurs[i], ACTIONS[actions[i]]
+
+    def consulter_partie(self, game):
+        """
+        Valeur et meilleure action pour le joueur courant d'une partie en cours
+        Args:
+            game (Game): Partie démarrée et non terminée
+        Returns:
+            tuple: (valeur, action)
+        """
+        j1, j2 = game.joueur1, game.joueur2
+        cote = game.get_joueur_actuel() - 1
+        adversaire = j2 if cote == 0 else j1
+        return self.consulter(
+            j1.identifiant, j2.identifiant,
+            j1.pv, j2.pv, j1.energie, j2.energie, cote, adversaire.is_defending
+        )
+
+    def fermer(self):
+        """Libère la projection mémoire"""
+        self._tables.clear()
+        self._mmap.close()
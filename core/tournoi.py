@@ -0,0 +1,129 @@
+"""
+Tournoi toutes rondes réparti sur plusieurs processus
+
+Chaque rencontre (i, j) du tableau est décrite par un tuple compact envoyé
+aux processus de travail, qui ne renvoient que des compteurs agrégés. La
+graine de chaque rencontre est dérivée de son identifiant : le résultat est
+identique au bit près quel que soit le nombre de processus. Avec des
+mécaniques aléatoires, la partie k d'une rencontre de graine g a la graine
+de tirage g + k (core.hasard).
+"""
+import hashlib
+import random
+from itertools import combinations
+
+from core.game import Game
+from core.politiques import get_politique
+
+# Partie réutilisée par le processus de travail d'une rencontre à l'autre
+_game = None
+
+
+def graine_rencontre(seed, match_id):
+    """
+    Dérive la graine d'une rencontre à partir de la graine du tournoi
+    Args:
+        seed (int): Graine du tournoi
+        match_id (int): Identifiant de la rencontre
+    Returns:
+        int: Graine sur 64 bits
+    """
+    cle = f"{seed}:{match_id}".encode()
+    return int.from_bytes(hashlib.blake2b(cle, digest_size=8).digest(), 'little')
+
+
+def jouer_rencontre(spec):
+    """
+    Joue toutes les parties d'une rencontre entre deux participants
+    Les participants alternent la place de joueur 1 d'une partie à l'autre.
+    Args:
+        spec (tuple): (match_id, graine, nb_parties, max_tours,
+                       classe_a, politique_a, classe_b, politique_b, hasard)
+    Returns:
+        tuple: (match_id, victoires_a, victoires_b, nuls, tours_total)
+    """
+    global _game
+    match_id, graine, nb_parties, max_tours, classe_a, politique_a, classe_b, politique_b, hasard = spec
+    if _game is None:
+        _game = Game(journalisation=False)
+    game = _game
+    rng = random.Random(graine)
+    politiques = (get_politique(politique_a), get_politique(politique_b))
+    victoires = [0, 0]
+    nuls = tours_total = 0
+
+    for partie in range(nb_parties):
+        premier = partie % 2  # Indice (0 = a, 1 = b) du participant joueur 1
+        classes = (classe_a, classe_b) if premier == 0 else (classe_b, classe_a)
+        game.creer_personnage(classes[0], "Joueur 1", 1)
+        game.creer_personnage(classes[1], "Joueur 2", 2)
+        game.hasard = None if hasard is None else hasard.pour_graine(graine + partie)
+        game.demarrer_combat()
+
+        tours = 0
+        for _ in range(max_tours):
+            cote = game.get_joueur_actuel() - 1
+            politique = politiques[cote ^ premier]
+            succes, est_fini = game.executer_action(politique(game, rng))
+            tours += succes
+            if est_fini:
+                break
+
+        tours_total += tours
+        if game.gagnant is None:
+            nuls += 1
+        else:
+            cote = 0 if game.gagnant is game.joueur1 else 1
+            victoires[cote ^ premier] += 1
+
+    return match_id, victoires[0], victoires[1], nuls, tours_total
+
+
+def lancer_tournoi(participants, nb_parties=100, workers=1, seed=0, max_tours=200, hasard=None):
+    """
+    Fait s'affronter tous les participants deux à deux
+    Args:
+        participants (list): Tuples (classe, politique), ex. ('mage', 'agressif')
+        nb_parties (int): Parties jouées par rencontre
+        workers (int): Nombre de processus (1 = dans le processus courant)
+        seed (int): Graine du tournoi
+        max_tours (int): Limite d'actions par partie, au-delà la partie est nulle
+        hasard (MecaniquesAleatoires): Réglages des mécaniques aléatoires (leur graine est ignorée)
+    Returns:
+        dict: {
+            'victoires': list[list[int]] (victoires de i contre j),
+            'nuls': list[list[int]],
+            'tours': list[list[int]] (total des actions jouées entre i et j)
+        }
+    """
+    n = len(participants)
+    paires = list(combinations(range(n), 2))
+    specs = [
+        (match_id, graine_rencontre(seed, match_id), nb_parties, max_tours,
+         participants[i][0], participants[i][1], participants[j][0], participants[j][1], hasard)
+        for match_id, (i, j) in enumerate(paires)
+    ]
+
+    if workers <= 1:
+        resultats = map(jouer_rencontre, specs)
+        return _fusionner(n, paires, resultats)
+
+    # Un lot de rencontres par envoi limite le coût de sérialisation
+    taille_lot = max(1, len(specs) // (workers * 4))
+    from concurrent.futures import ProcessPoolExecutor  # Coûteux à importer, inutile à 1 worker
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        resultats = executor.map(jouer_rencontre, specs, chunksize=taille_lot)
+        return _fusionner(n, paires, resultats)
+
+
+def _fusionner(n, paires, resultats):
+    """Range les compteurs de chaque rencontre dans les matrices du tournoi"""
+    victoires = [[0] * n for _ in range(n)]
+    nuls = [[0] * n for _ in range(n)]
+    tours = [[0] * n for _ in range(n)]
+    for match_id, victoires_a, victoires_b, nb_nuls, tours_total in resultats:
+        i, j = paires[match_id]
+        victoires[i][j], victoires[j][i] = victoires_a, victoires_b
+        nuls[i][j] = nuls[j][i] = nb_nuls
+        tours[i][j] = tours[j][i] = tours_total
+    return {'victoires': victoires, 'nuls': nuls, 'tours': tours}
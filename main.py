@@ -2,10 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import sys
-from ui.app import DuelApp
 
 def main():
-    """Point d'entrée principal de l'application"""
+    """Point d'entrée principal : interface graphique, ou outils sans interface si une commande est donnée"""
+    if len(sys.argv) > 1:
+        from core.cli import main as cli
+        sys.exit(cli(sys.argv[1:]))
+
+    from ui.app import DuelApp
     try:
         app = DuelApp()
         app.run()
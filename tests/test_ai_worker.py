@@ -0,0 +1,56 @@
+import time
+
+from core.game import Game
+from core.ia import IA
+from ui.ai_worker import AIWorker
+
+
+def _attendre(worker, delai=2.0):
+    fin = time.monotonic() + delai
+    while time.monotonic() < fin:
+        reponse = worker.poll()
+        if reponse is not None:
+            return reponse
+        time.sleep(0.001)
+    raise AssertionError("pas de réponse de l'IA")
+
+
+def _partie():
+    game = Game()
+    game.creer_personnage('guerrier', 'A', 1)
+    game.creer_personnage('mage', 'B', 2)
+    game.demarrer_combat()
+    return game
+
+
+def test_coup_calcule_en_arriere_plan():
+    worker = AIWorker('facile')
+    try:
+        assert worker.poll() is None
+        classes, etat = IA.etat_partie(_partie())
+        worker.request_move(7, classes, etat)
+        numero, action = _attendre(worker)
+        assert numero == 7
+        assert action == IA('facile').rechercher(classes, etat)
+    finally:
+        worker.stop()
+
+
+def test_reponse_anticipee_pendant_le_tour_adverse():
+    worker = AIWorker('facile')
+    try:
+        game = _partie()
+        worker.ponder(*IA.etat_partie(game))
+        game.executer_action('attaquer')
+        classes, etat = IA.etat_partie(game)
+        worker.request_move(1, classes, etat)
+        assert _attendre(worker) == (1, IA('facile').rechercher(classes, etat))
+    finally:
+        worker.stop()
+
+
+def test_arret_du_thread():
+    worker = AIWorker('facile')
+    worker.stop()
+    worker._thread.join(1.0)
+    assert not worker._thread.is_alive()
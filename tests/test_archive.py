@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from core.archive import ArchiveParties
+from core.chronologie import Chronologie
+from core.game import Game, ACTIONS
+from core.replay import rejouer
+
+CHOIX = ['attaquer', 'special', 'defendre', 'recharger']
+
+
+def _jouer(game, rng, jusqu_a_la_fin=True):
+    codes = []
+    while game.gagnant is None and (jusqu_a_la_fin or len(codes) < 5):
+        action = rng.choice(CHOIX)
+        if game.executer_action(action)[0]:
+            codes.append(ACTIONS.index(action))
+    return codes
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = ArchiveParties(str(tmp_path / 'parties.db'), taille_lot=2)
+    yield archive
+    archive.fermer()
+
+
+def test_aller_retour_depuis_une_partie(archive):
+    """Les parties terminées sont archivées et rejouées à l'identique, pas les parties abandonnées"""
+    rng = random.Random(5)
+    game = Game()
+    game.enregistreur = archive
+    terminees = []
+    for nom, complete in (('Élodie', True), ('Abel', False), ('Zoé', True), ('Yann', True), ('Dernier', False)):
+        game.creer_personnage(rng.choice(['guerrier', 'mage', 'archer']), nom, 1)
+        game.creer_personnage(rng.choice(['guerrier', 'mage', 'archer']), 'B', 2)
+        game.demarrer_combat()
+        codes = _jouer(game, rng, complete)
+        if complete:
+            terminees.append((nom, codes, game.instantane(), list(game.historique)))
+    assert len(archive) == len(terminees)
+    for numero, (nom, codes, etat, historique) in enumerate(terminees, 1):
+        replay = archive.partie(numero)
+        assert replay.nom1 == nom and replay.complet
+        assert list(replay.actions) == codes
+        for fin in rejouer(replay):
+            pass
+        assert fin.instantane() == etat
+        assert archive.historique(numero) == historique
+    with pytest.raises(KeyError):
+        archive.partie(len(terminees) + 1)
+
+
+def test_annuler_abandonne_la_partie(archive):
+    game = Game(journalisation=False)
+    game.enregistreur = archive
+    game.chronologie = Chronologie()
+    game.creer_personnage('guerrier', 'A', 1)
+    game.creer_personnage('mage', 'B', 2)
+    game.demarrer_combat()
+    game.executer_action('attaquer')
+    game.annuler()
+    _jouer(game, random.Random(0))
+    assert len(archive) == 0
+
+
+def test_statistiques(archive):
+    archive.ajouter('A', 'B', 'archer', 'mage', 1, [0, 0, 0])
+    archive.ajouter('A', 'B', 'mage', 'archer', 1, [0, 2, 0, 3, 0])
+    archive.ajouter('A', 'B', 'archer', 'mage', 2, [1, 0, 0, 0])
+    archive.ajouter('A', 'B', 'archer', 'mage', 0, [3, 3])
+    archive.ajouter('A', 'B', 'mage', 'mage', 2, [0, 0])
+
+    bilan = archive.taux_victoire('archer', 'mage')
+    assert bilan == {'parties': 4, 'victoires_a': 1, 'victoires_b': 2, 'nuls': 1, 'taux_a': 0.25}
+    assert archive.taux_victoire('mage', 'archer')['victoires_a'] == 2
+    # Les deux plus récentes : la nulle et la victoire du mage (côté joueur 2)
+    assert archive.taux_victoire('archer', 'mage', dernieres=2)['parties'] == 2
+    assert archive.taux_victoire('archer', 'mage', dernieres=2)['victoires_b'] == 1
+    assert archive.taux_victoire('mage', 'mage') == {'parties': 1, 'victoires_a': 0.5, 'victoires_b': 0.5,
+                                                     'nuls': 0, 'taux_a': 0.5}
+    assert archive.taux_victoire('guerrier', 'mage')['taux_a'] == 0.0
+
+    durees = archive.durees_par_paire()
+    assert durees[('archer', 'mage')] == (3, 3.0)
+    assert durees[('mage', 'archer')] == (1, 5.0)
+
+    histogramme = archive.histogramme_actions('archer')
+    # Archer : joueur 1 de trois parties (actions paires), joueur 2 d'une (actions impaires)
+    assert histogramme == {'attaquer': 2 + 1, 'special': 1, 'defendre': 1, 'recharger': 1 + 1}
+
+
+def test_persistance(tmp_path):
+    chemin = str(tmp_path / 'parties.db')
+    archive = ArchiveParties(chemin)
+    archive.ajouter('A', 'B', 'guerrier', 'archer', 1, [0, 0])
+    archive.fermer()
+    archive = ArchiveParties(chemin)
+    try:
+        assert len(archive) == 1
+        assert archive.partie(1).nom1 == 'A'
+    finally:
+        archive.fermer()
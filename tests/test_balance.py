@@ -0,0 +1,64 @@
+import pytest
+
+import core.balance as balance
+from core.balance import balayer, points_grille, regles_point, cle_point, CacheBalayage
+from core.characters import NOMS_CLASSES, regles_classe
+
+
+def test_points_grille():
+    points = points_grille({'pv_max': [80, 100], 'mage.special_cost': [25, 30, 35]})
+    assert len(points) == 6
+    assert {'mage.special_cost': 25, 'pv_max': 80} in points
+
+
+def test_regles_point():
+    regles = regles_point({'mage.special_cost': 25, 'pv_max': 80})
+    mage = NOMS_CLASSES.index('mage')
+    assert regles[mage]['special_cost'] == 25
+    for cid, r in enumerate(regles):
+        assert r['pv_max'] == 80
+        if cid != mage:
+            assert r['special_cost'] == regles_classe(cid)['special_cost']
+    with pytest.raises(ValueError):
+        regles_point({'inconnu': 1})
+    with pytest.raises(ValueError):
+        regles_point({'mage.pv_max': 80})
+
+
+def test_cle_depend_des_regles_et_reglages():
+    reglages = {'duels': 10, 'politique': 'aleatoire', 'max_tours': 200}
+    regles = regles_point({})
+    assert cle_point(regles, reglages) == cle_point(regles_point({}), dict(reglages))
+    assert cle_point(regles, reglages) != cle_point(regles_point({'pv_max': 80}), reglages)
+    assert cle_point(regles, reglages) != cle_point(regles, dict(reglages, duels=20))
+
+
+def test_cache_reutilise(tmp_path, monkeypatch):
+    cache = str(tmp_path / 'balance.jsonl')
+    premiers = balayer({'pv_max': [80, 100]}, duels=200, cache=cache)
+    assert [p['cache'] for p in premiers] == [False, False]
+    assert len(CacheBalayage(cache).resultats) == 2
+
+    appels = []
+    evaluer = balance.evaluer_point
+    monkeypatch.setattr(balance, 'evaluer_point', lambda tache: appels.append(tache) or evaluer(tache))
+    seconds = balayer({'pv_max': [80, 100, 120]}, duels=200, cache=cache)
+    assert len(appels) == 1
+    assert [p['cache'] for p in seconds] == [True, True, False]
+    assert [p['paires'] for p in seconds[:2]] == [p['paires'] for p in premiers]
+
+
+def test_resultats_independants_du_nombre_de_processus():
+    grille = {'archer.recharge': [2, 3]}
+    assert balayer(grille, duels=200, workers=2) == balayer(grille, duels=200, workers=1)
+
+
+def test_points_identiques_calcules_une_fois(monkeypatch):
+    appels = []
+    evaluer = balance.evaluer_point
+    monkeypatch.setattr(balance, 'evaluer_point', lambda tache: appels.append(tache) or evaluer(tache))
+    # Deux points de la grille aux mêmes règles
+    grille = {'special_cost': [30], 'pv_max': [100, 100]}
+    points = balayer(grille, duels=100)
+    assert len(points) == 2 and len(appels) == 1
+    assert points[0]['paires'] == points[1]['paires']
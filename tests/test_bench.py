@@ -0,0 +1,34 @@
+import json
+
+from benchmarks import bench
+
+
+def test_comparer_signale_les_regressions():
+    reference = {'a': 1000.0, 'b': 1000.0, 'c': 1000.0, 'absent': 10.0}
+    resultats = {'a': 700.0, 'b': 950.0, 'c': 1500.0, 'nouveau': 5.0}
+    lignes, regressions = bench.comparer(resultats, reference, seuil=0.2)
+    assert regressions == ['a']
+    texte = "\n".join(lignes)
+    assert 'RÉGRESSION' in texte and 'amélioration' in texte
+    assert 'absent' in texte and 'nouveau' in texte
+
+
+def test_executer_et_code_de_retour(tmp_path, monkeypatch):
+    def bench_factice():
+        return {'factice': bench._meilleur_debit(lambda: sum(range(100)), 100, repetitions=2)}
+
+    executer = bench.executer
+    monkeypatch.setattr(bench, 'executer', lambda: executer((bench_factice,)))
+    reference = tmp_path / 'reference.json'
+    reference.write_text(json.dumps({'resultats': {'factice': 1e18}}))
+    assert bench.main(['--reference', str(reference)]) == 1
+    reference.write_text(json.dumps({'resultats': {'factice': 1.0}}))
+    sortie = tmp_path / 'sortie.json'
+    assert bench.main(['--reference', str(reference), '--sortie', str(sortie)]) == 0
+    assert json.loads(sortie.read_text())['resultats']['factice'] > 0
+
+
+def test_mesures_de_l_ia():
+    resultats = bench.bench_ia(nb_positions=3)
+    assert set(resultats) == {f"ia/{niveau}" for niveau in bench.NIVEAUX}
+    assert all(debit > 0 for debit in resultats.values())
@@ -0,0 +1,125 @@
+import random
+
+from core.chronologie import Chronologie
+from core.game import Game, ACTIONS
+from core.replay import EnregistreurReplay, LecteurReplays
+
+CHOIX = ['attaquer', 'special', 'defendre', 'recharger']
+
+
+def _partie(journalisation=True, intervalle=4):
+    game = Game(journalisation=journalisation)
+    game.chronologie = Chronologie(intervalle)
+    game.creer_personnage('guerrier', 'Conan', 1)
+    game.creer_personnage('mage', 'Merlin', 2)
+    game.demarrer_combat()
+    return game
+
+
+def _jouer(game, rng, nombre):
+    """Joue des coups au hasard ; retourne (instantané, historique) avant chaque coup puis à la fin"""
+    vues = [(game.instantane(), list(game.historique))]
+    while len(vues) <= nombre and game.gagnant is None:
+        if game.executer_action(rng.choice(CHOIX))[0]:
+            vues.append((game.instantane(), list(game.historique)))
+    return vues
+
+
+def test_annuler_retablir_restaurent_etat_et_journal():
+    game = _partie()
+    vues = _jouer(game, random.Random(1), 12)
+    for instantane, historique in reversed(vues[:-1]):
+        assert game.annuler()
+        assert game.instantane() == instantane
+        assert list(game.historique) == historique
+    assert not game.annuler()
+    for instantane, historique in vues[1:]:
+        assert game.retablir()
+        assert game.instantane() == instantane
+        assert list(game.historique) == historique
+    assert not game.retablir()
+
+
+def test_sans_chronologie():
+    game = Game()
+    game.creer_personnage('guerrier', 'A', 1)
+    game.creer_personnage('mage', 'B', 2)
+    game.demarrer_combat()
+    game.executer_action('attaquer')
+    assert not game.annuler() and not game.retablir()
+
+
+def test_variantes_et_aller_a():
+    game = _partie()
+    game.executer_action('attaquer')
+    game.executer_action('defendre')
+    fin_attaque = game.chronologie.noeud
+    etat_attaque = game.instantane()
+    historique_attaque = list(game.historique)
+    game.annuler()
+    game.annuler()
+    game.executer_action('recharger')
+    game.executer_action('attaquer')
+    fin_recharge = game.chronologie.noeud
+    etat_recharge = game.instantane()
+
+    racine = game.chronologie.ancetre(fin_recharge, 0)
+    codes = [code for code, _ in game.chronologie.variantes(racine)]
+    assert codes == [ACTIONS.index('attaquer'), ACTIONS.index('recharger')]
+    assert game.chronologie.coups(fin_attaque) == [ACTIONS.index('attaquer'), ACTIONS.index('defendre')]
+    assert len(game.chronologie) == 5
+
+    game.chronologie.aller_a(game, fin_attaque)
+    assert game.instantane() == etat_attaque
+    assert list(game.historique) == historique_attaque
+    game.chronologie.aller_a(game, fin_recharge)
+    assert game.instantane() == etat_recharge
+
+
+def test_coup_rejoue_reutilise_le_noeud():
+    game = _partie()
+    game.executer_action('attaquer')
+    noeud = game.chronologie.noeud
+    game.annuler()
+    game.executer_action('attaquer')
+    assert game.chronologie.noeud == noeud
+    assert len(game.chronologie) == 2
+
+
+def test_etat_noeud_depuis_les_points_de_reprise():
+    game = _partie(journalisation=False, intervalle=3)
+    rng = random.Random(7)
+    noeuds = [game.chronologie.noeud]
+    etats = [game.chronologie.etat]
+    while len(noeuds) < 20 and game.gagnant is None:
+        if game.executer_action(rng.choice(CHOIX))[0]:
+            noeuds.append(game.chronologie.noeud)
+            etats.append(game.chronologie.etat)
+    for profondeur, (noeud, etat) in enumerate(zip(noeuds, etats)):
+        assert game.chronologie.etat_noeud(noeud) == etat
+        assert game.chronologie.profondeur(noeud) == profondeur
+
+
+def test_annuler_abandonne_l_enregistrement(tmp_path):
+    chemin = str(tmp_path / 'parties.rep')
+    enregistreur = EnregistreurReplay(chemin)
+    game = Game(journalisation=False)
+    game.enregistreur = enregistreur
+    game.chronologie = Chronologie()
+    game.creer_personnage('guerrier', 'A', 1)
+    game.creer_personnage('mage', 'B', 2)
+    game.demarrer_combat()
+    game.executer_action('attaquer')
+    game.executer_action('defendre')
+    game.annuler()
+    # Les coups suivants ne sont plus enregistrés
+    game.executer_action('recharger')
+    enregistreur.fermer()
+    lecteur = LecteurReplays(chemin)
+    try:
+        replays = list(lecteur)
+    finally:
+        lecteur.fermer()
+    assert len(replays) == 1
+    assert not replays[0].complet
+    assert list(replays[0].actions) == [ACTIONS.index('attaquer'), ACTIONS.index('defendre')]
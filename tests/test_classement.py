@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+import core.classement as classement
+from core.archive import ArchiveParties
+from core.classement import ClassementElo, recalculer_elo, resultats_archive, _lots_disjoints
+
+
+def _resultats(nb_joueurs, nb_parties, seed=0):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, nb_joueurs, nb_parties)
+    b = rng.integers(0, nb_joueurs, nb_parties)
+    s = rng.choice([0.0, 0.5, 1.0], nb_parties)
+    return a, b, s
+
+
+def _reference(a, b, s, nb_joueurs):
+    elo = ClassementElo()
+    for ja, jb, score in zip(a.tolist(), b.tolist(), s.tolist()):
+        elo.enregistrer(ja, jb, score)
+    return np.array([elo.cote(j) for j in range(nb_joueurs)])
+
+
+def test_classement_elo():
+    elo = ClassementElo(k=32)
+    assert elo.attendu('a', 'b') == 0.5
+    elo.enregistrer('a', 'b', 1)
+    assert (elo.cote('a'), elo.cote('b')) == (1516.0, 1484.0)
+    elo.enregistrer('b', 'c', 0.5)
+    assert elo.cote('c') < 1500 < elo.cote('a')
+    assert [j for j, _, _ in elo.classement()] == ['a', 'c', 'b']
+    assert elo.classement()[2] == ('b', elo.cote('b'), 2)
+
+
+def test_lots_disjoints():
+    a, b, _ = _resultats(50, 2000)
+    a[10] = b[10]  # Un joueur opposé à lui-même
+    bornes = _lots_disjoints(a, b)
+    assert bornes[0] == 0 and bornes[-1] == a.size
+    for debut, fin in zip(bornes[:-1], bornes[1:]):
+        joueurs = np.concatenate([a[debut:fin], b[debut:fin]])
+        joueurs = joueurs[np.r_[a[debut:fin] != b[debut:fin], np.ones(fin - debut, bool)]]
+        assert np.unique(joueurs).size == joueurs.size
+        if fin < a.size:  # Lot maximal : la partie suivante a un joueur déjà présent
+            assert {a[fin], b[fin]} & set(joueurs.tolist())
+
+
+def test_calcul_par_lots(monkeypatch):
+    def interdit(*args):
+        raise AssertionError("boucle partie par partie")
+    monkeypatch.setattr(classement, '_recalculer_partie_par_partie', interdit)
+    a, b, s = _resultats(100000, 30000)
+    a[:50] = b[:50]
+    cotes = recalculer_elo(a, b, s, 100000)
+    assert np.abs(cotes - _reference(a, b, s, 100000)).max() < 1e-9
+
+
+def test_calcul_partie_par_partie(monkeypatch):
+    appels = []
+    boucle = classement._recalculer_partie_par_partie
+    monkeypatch.setattr(classement, '_recalculer_partie_par_partie', lambda *args: appels.append(1) or boucle(*args))
+    a, b, s = _resultats(10, 5000)
+    cotes = recalculer_elo(a, b, s, 10)
+    assert appels
+    assert (cotes == _reference(a, b, s, 10)).all()
+
+
+@pytest.mark.parametrize('nb_joueurs', [10, 100000])
+def test_reprise(tmp_path, nb_joueurs):
+    a, b, s = _resultats(nb_joueurs, 20000, seed=1)
+    reprise = str(tmp_path / 'elo.npz')
+    complet = recalculer_elo(a, b, s, nb_joueurs)
+    debut = recalculer_elo(a[:12000], b[:12000], s[:12000], nb_joueurs, reprise=reprise, intervalle_reprise=1000)
+    with np.load(reprise) as sauvegarde:
+        assert int(sauvegarde['position']) == 12000
+        assert (sauvegarde['cotes'] == debut).all()
+    suite = recalculer_elo(a, b, s, nb_joueurs, reprise=reprise)
+    assert np.abs(suite - complet).max() < 1e-9
+    # Une reprise d'un autre nombre de joueurs est ignorée
+    assert np.abs(recalculer_elo(a, b, s, nb_joueurs + 1, reprise=reprise)[:nb_joueurs] - complet).max() < 1e-9
+
+
+def test_periode():
+    a, b, s = _resultats(30, 3000, seed=2)
+    # Une partie par période : le calcul partie par partie
+    assert np.abs(recalculer_elo(a, b, s, 30, periode=1) - _reference(a, b, s, 30)).max() < 1e-9
+    # Chaque joueur bouge au plus de k par période
+    cotes = recalculer_elo(a, b, s, 30, periode=500)
+    assert np.abs(cotes - 1500.0).max() <= 32.0 * 6
+    assert np.abs(cotes - _reference(a, b, s, 30)).max() > 1
+    # Un joueur qui gagne toutes ses parties ne bouge que d'une variation par période
+    cotes = recalculer_elo([0] * 10, [1] * 10, [1.0] * 10, 2, periode=10)
+    assert cotes.tolist() == [1516.0, 1484.0]
+
+
+def test_depuis_resultats():
+    a, b, s = _resultats(20, 2000, seed=3)
+    a[a == 7] = 8
+    b[b == 7] = 8
+    joueurs = [f"j{i}" for i in range(20)]
+    elo = ClassementElo.depuis_resultats(joueurs, a, b, s)
+    reference = ClassementElo()
+    for ja, jb, score in zip(a.tolist(), b.tolist(), s.tolist()):
+        reference.enregistrer(joueurs[ja], joueurs[jb], score)
+    assert 'j7' not in elo.cotes
+    assert elo.parties == reference.parties
+    assert all(abs(elo.cotes[j] - reference.cotes[j]) < 1e-9 for j in reference.cotes)
+
+
+def test_resultats_archive(tmp_path):
+    chemin = str(tmp_path / 'parties.db')
+    archive = ArchiveParties(chemin)
+    archive.ajouter('Zoé', 'Abel', 'archer', 'mage', 1, [0])
+    archive.ajouter('Abel', 'Yann', 'mage', 'guerrier', 2, [0])
+    archive.ajouter('Yann', 'Zoé', 'guerrier', 'archer', 0, [0])
+    archive.fermer()
+    joueurs, a, b, s = resultats_archive(chemin, cle='nom', taille_lot=2)
+    assert joueurs == ['Zoé', 'Abel', 'Yann']
+    assert a.tolist() == [0, 1, 2] and b.tolist() == [1, 2, 0]
+    assert s.tolist() == [1.0, 0.0, 0.5]
+    joueurs, a, b, _ = resultats_archive(chemin)
+    assert [joueurs[i] for i in a] == ['archer', 'mage', 'guerrier']
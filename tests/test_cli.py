@@ -0,0 +1,59 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.cli import main, construire_parser
+
+RACINE = Path(__file__).resolve().parent.parent
+
+
+def test_simuler(capsys):
+    assert main(['simuler', 'archer', 'mage', '-n', '500', '--seed', '1']) == 0
+    sortie = capsys.readouterr().out
+    assert sortie.startswith("archer contre mage : 500 duels")
+    assert "tours moyens" in sortie
+
+
+def test_simuler_deterministe_avec_hasard(capsys):
+    main(['simuler', 'guerrier', 'mage', '-n', '300', '--seed', '2', '--hasard', '5'])
+    premiere = capsys.readouterr().out
+    main(['simuler', 'guerrier', 'mage', '-n', '300', '--seed', '2', '--hasard', '5'])
+    assert capsys.readouterr().out == premiere
+
+
+def test_tournoi(capsys):
+    assert main(['tournoi', 'guerrier:agressif', 'archer', '--parties', '4']) == 0
+    lignes = capsys.readouterr().out.splitlines()
+    assert len(lignes) == 2
+    assert lignes[0].startswith('guerrier:agressif')
+    assert lignes[1].startswith('archer:aleatoire')
+
+
+def test_escarmouche(capsys):
+    assert main(['escarmouche', 'archer:3,mage:2', 'guerrier:4']) == 0
+    assert "survivants" in capsys.readouterr().out
+
+
+def test_commande_obligatoire():
+    with pytest.raises(SystemExit):
+        construire_parser().parse_args([])
+
+
+def test_demarrage_sans_tkinter():
+    script = (
+        "import sys\n"
+        "from core.cli import main\n"
+        "main(['simuler', 'archer', 'mage', '-n', '100', '--seed', '0'])\n"
+        "assert 'tkinter' not in sys.modules\n"
+    )
+    resultat = subprocess.run([sys.executable, '-c', script], cwd=RACINE, capture_output=True, text=True)
+    assert resultat.returncode == 0, resultat.stderr
+
+
+def test_point_d_entree_principal():
+    resultat = subprocess.run([sys.executable, 'main.py', 'simuler', 'archer', 'mage', '-n', '100'],
+                              cwd=RACINE, capture_output=True, text=True)
+    assert resultat.returncode == 0, resultat.stderr
+    assert "archer contre mage" in resultat.stdout
@@ -0,0 +1,44 @@
+import pytest
+
+tk = pytest.importorskip('tkinter')
+
+from core import journal as evt
+from core.journal import EvenementCombat
+
+
+@pytest.fixture
+def journal_affiche():
+    try:
+        racine = tk.Tk()
+    except tk.TclError:
+        pytest.skip("pas d'affichage disponible")
+    from ui.combat_log import CombatLog
+    widget = CombatLog(racine, max_lignes=5)
+    yield widget
+    racine.destroy()
+
+
+def _lignes(widget):
+    return [ligne for ligne in widget.get_content().splitlines() if ligne]
+
+
+def test_lignes_les_plus_anciennes_effacees(journal_affiche):
+    for i in range(8):
+        journal_affiche.add_message(f"message {i}")
+    assert _lignes(journal_affiche) == [f"message {i}" for i in range(3, 8)]
+
+
+def test_ajout_groupe(journal_affiche):
+    journal_affiche.add_messages([(f"ligne {i}", ('system',)) for i in range(7)])
+    assert _lignes(journal_affiche) == [f"ligne {i}" for i in range(2, 7)]
+    journal_affiche.clear()
+    journal_affiche.add_messages([])
+    assert _lignes(journal_affiche) == []
+
+
+def test_tags_des_evenements():
+    from ui.combat_log import CombatLog
+    attaque = EvenementCombat(evt.ATTAQUE, 2, 10, 10, 0, 3)
+    tour = EvenementCombat(evt.TOUR, 1, 0, 0, 0, 3)
+    assert CombatLog.tags_evenement(attaque) == ('player2', 'damage')
+    assert CombatLog.tags_evenement(tour) == ('system',)
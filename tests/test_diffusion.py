@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+from core.diffusion import Diffusion
+from core.game import Game
+
+
+def _partie():
+    game = Game()
+    game.creer_personnage('guerrier', 'Conan', 1)
+    game.creer_personnage('mage', 'Merlin', 2)
+    game.demarrer_combat()
+    return game
+
+
+def _decoder(lignes):
+    return [json.loads(ligne) for ligne in lignes]
+
+
+def test_instantane_initial_puis_evenements():
+    game = _partie()
+    diffusion = Diffusion(game)
+    abonnement = diffusion.abonner()
+    assert len(abonnement) == 1
+    complet, = _decoder(abonnement.lire())
+    assert complet['evt'] == 'complet' and complet['seq'] == 0
+    assert complet['noms'] == ['Conan', 'Merlin']
+    assert complet['messages'] == list(game.historique)
+    assert abonnement.lire() == []
+
+    game.executer_action('attaquer')
+    game.executer_action('defendre')
+    assert len(abonnement) == 2
+    messages = _decoder(abonnement.lire())
+    assert [m['seq'] for m in messages] == [1, 2]
+    assert messages[0]['pv2'] == 85 and messages[0]['tour'] == 2
+    assert messages[0]['messages'] + messages[1]['messages'] == list(game.historique)[2:]
+
+
+def test_etat_reconstruit_par_un_spectateur():
+    game = _partie()
+    diffusion = Diffusion(game)
+    abonnement = diffusion.abonner()
+    vue, historique = {}, []
+    for action in ('attaquer', 'special', 'recharger', 'attaquer', 'defendre', 'special') * 3:
+        game.executer_action(action)
+        for message in _decoder(abonnement.lire()):
+            if message.get('journal') == 0:
+                historique = []
+            historique += message.pop('messages', [])
+            vue.update(message)
+    assert (vue['pv1'], vue['pv2'], vue['energie1'], vue['energie2']) == (
+        game.joueur1.pv, game.joueur2.pv, game.joueur1.energie, game.joueur2.energie)
+    assert historique == list(game.historique)
+
+
+def test_lignes_partagees_entre_abonnes():
+    game = _partie()
+    diffusion = Diffusion(game)
+    abonnements = [diffusion.abonner() for _ in range(3)]
+    initiaux = [a.lire()[0] for a in abonnements]
+    assert all(ligne is initiaux[0] for ligne in initiaux)
+    game.executer_action('attaquer')
+    lues = [a.lire()[0] for a in abonnements]
+    assert all(ligne is lues[0] for ligne in lues)
+
+
+def test_politique_fusion():
+    game = _partie()
+    diffusion = Diffusion(game, taille=16)
+    abonnement = diffusion.abonner(capacite=3, politique='fusion')
+    abonnement.lire()
+    for _ in range(5):
+        game.executer_action('defendre')
+    assert len(abonnement) == 1
+    complet, = _decoder(abonnement.lire())
+    assert complet['evt'] == 'complet' and complet['seq'] == 5
+    assert abonnement.perdus == 5
+    game.executer_action('attaquer')
+    assert [m['seq'] for m in _decoder(abonnement.lire())] == [6]
+
+
+def test_politique_abandon():
+    game = _partie()
+    diffusion = Diffusion(game, taille=16)
+    abonnement = diffusion.abonner(capacite=3, politique='abandon')
+    abonnement.lire()
+    for _ in range(5):
+        game.executer_action('defendre')
+    assert len(abonnement) == 3
+    assert [m['seq'] for m in _decoder(abonnement.lire())] == [3, 4, 5]
+    assert abonnement.perdus == 2
+
+
+def test_nouveau_combat_rappelle_les_noms():
+    game = _partie()
+    diffusion = Diffusion(game)
+    abonnement = diffusion.abonner()
+    abonnement.lire()
+    game.executer_action('attaquer')
+    game.demarrer_combat()
+    dernier = _decoder(abonnement.lire())[-1]
+    assert dernier['journal'] == 0 and dernier['noms'] == ['Conan', 'Merlin']
+
+
+def test_abonnement_invalide():
+    diffusion = Diffusion(_partie(), taille=8)
+    with pytest.raises(ValueError):
+        diffusion.abonner(politique='inconnue')
+    with pytest.raises(ValueError):
+        diffusion.abonner(capacite=9)
+    with pytest.raises(ValueError):
+        diffusion.abonner(capacite=0)
+
+
+def test_attendre_et_fermer():
+    game = _partie()
+    diffusion = Diffusion(game)
+    abonnement = diffusion.abonner()
+    rappels = []
+    assert not abonnement.attendre(lambda: rappels.append(1))  # Instantané en attente
+    abonnement.lire()
+    assert abonnement.attendre(lambda: rappels.append(1))
+    game.executer_action('attaquer')
+    game.executer_action('attaquer')
+    assert rappels == [1]
+
+    abonnement.lire()
+    assert abonnement.attendre(lambda: rappels.append(2))
+    diffusion.fermer()
+    assert rappels == [1, 2] and abonnement.ferme
+    assert diffusion._publier not in game.observateurs
+    assert not abonnement.attendre(lambda: rappels.append(3))
+
+
+def test_desabonner():
+    diffusion = Diffusion(_partie())
+    abonnement = diffusion.abonner()
+    abonnement.lire()
+    rappels = []
+    abonnement.attendre(lambda: rappels.append(1))
+    diffusion.desabonner(abonnement)
+    assert abonnement.ferme and rappels == [1]
+    assert diffusion.abonnements == []
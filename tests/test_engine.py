@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from core.characters import NOMS_CLASSES
+from core.engine import step, etat_initial, REFUSEE, SUIVANT, KO, ISSUE, CombatEngine
+from core.game import Game, ATTAQUER, SPECIAL, DEFENDRE, RECHARGER
+
+
+def _pv(etat):
+    return etat & 0x7F, etat >> 7 & 0x7F
+
+
+def _energies(etat):
+    return etat >> 14 & 0x3F, etat >> 20 & 0x3F
+
+
+@pytest.mark.parametrize('classe1', NOMS_CLASSES)
+@pytest.mark.parametrize('classe2', NOMS_CLASSES)
+def test_step_comme_game(classe1, classe2):
+    rng = random.Random(f"{classe1}-{classe2}")
+    for _ in range(20):
+        game = Game(journalisation=False)
+        game.creer_personnage(classe1, 'A', 1)
+        game.creer_personnage(classe2, 'B', 2)
+        game.demarrer_combat()
+        etat = etat_initial(NOMS_CLASSES.index(classe1), NOMS_CLASSES.index(classe2))
+        assert game.instantane() == etat
+        while game.gagnant is None:
+            code = rng.randrange(4)
+            etat, issue, _ = step(etat, code)
+            succes, fini = game.executer_action(code)
+            assert succes == (issue != REFUSEE)
+            assert fini == (issue == KO)
+            assert game.instantane() == etat
+
+
+def test_special_refusee_sans_energie():
+    etat = etat_initial(0, 1, energie=0)
+    assert step(etat, SPECIAL) == (etat, REFUSEE, 0)
+    nouveau, issue, degats = step(etat, ATTAQUER)
+    assert issue == SUIVANT and degats > 0
+
+
+def test_combat_termine_refuse_tout():
+    etat = etat_initial(0, 1) & ~0x7F  # Joueur 1 à 0 PV
+    for code in (ATTAQUER, SPECIAL, DEFENDRE, RECHARGER):
+        assert step(etat, code) == (etat, REFUSEE, 0)
+
+
+def test_defense_divise_le_premier_coup():
+    etat = etat_initial(0, 0)
+    _, _, plein = step(etat, ATTAQUER)
+    etat, issue, _ = step(etat, DEFENDRE)
+    assert issue == SUIVANT
+    etat, _, _ = step(etat, DEFENDRE)
+    etat, _, reduit = step(etat, ATTAQUER)
+    assert reduit == plein // 2
+    assert not etat >> 26 & 1  # Défense consommée
+
+
+def test_recharge_plafonnee_et_tour():
+    etat = etat_initial(0, 0)
+    etat, issue, degats = step(etat, RECHARGER)
+    assert (issue, degats) == (SUIVANT, 0)
+    assert _energies(etat) == (50, 50)
+    assert etat >> 27 & 1 and etat >> 35 == 1
+
+
+def test_ko_ne_passe_pas_le_tour():
+    etat = etat_initial(0, 1, pv=1)
+    nouveau, issue, degats = step(etat, ATTAQUER)
+    assert issue & ISSUE == KO
+    assert _pv(nouveau) == (1, 0)
+    assert not nouveau >> 27 & 1 and nouveau >> 35 == 0
+
+
+def test_combat_engine():
+    game = Game(journalisation=False)
+    game.creer_personnage('archer', 'A', 1)
+    game.creer_personnage('mage', 'B', 2)
+    moteur = CombatEngine(game.joueur1, game.joueur2)
+    moteur.start_combat()
+    rng = random.Random(0)
+    while not moteur.is_combat_over:
+        code = rng.randrange(4)
+        attendu = step(moteur.etat(), code)
+        assert moteur.jouer(code) == attendu[1:]
+        if attendu[1] != REFUSEE:
+            assert moteur.etat() == attendu[0]
+    assert moteur.get_current_player().pv > 0
@@ -0,0 +1,91 @@
+import numpy as np
+
+from core.environnement import EnvironnementDuel
+from core.game import ATTAQUER, SPECIAL, DEFENDRE, RECHARGER
+from core.simulation import politique_aleatoire
+
+
+def test_reset_et_observations():
+    env = EnvironnementDuel(classes1=0, classes2=1, seed=0)
+    obs = env.reset(8)
+    assert obs.shape == (8, env.taille_observation) and obs.dtype == np.float32
+    assert (obs[:, 0] == 1).all() and (obs[:, 1] == 1).all()
+    assert (obs[:, 6:].sum(axis=1) == 2).all()
+    assert (obs[:, 6] == 1).all() and (obs[:, 6 + env.nb_classes + 1] == 1).all()
+
+
+def test_masque_actions_et_penalite():
+    env = EnvironnementDuel(classes1=0, classes2=0, penalite_invalide=-0.5, seed=0)
+    env.reset(4)
+    masque = env.masque_actions()
+    assert masque.shape == (4, 4)
+    assert masque[:, ATTAQUER].all() and masque[:, DEFENDRE].all() and masque[:, RECHARGER].all()
+    # Vider l'énergie du joueur courant : la spéciale devient impossible et refusée
+    env.sim.energie[:] = 0
+    assert not env.masque_actions()[:, SPECIAL].any()
+    _, recompenses, fins, infos = env.step(np.full(4, SPECIAL))
+    assert not infos['succes'].any()
+    assert (recompenses == -0.5).all() and not fins.any()
+
+
+def test_adversaire_toujours_special_ne_bloque_pas():
+    # L'adversaire ne joue que des spéciales : refusées faute d'énergie, elles
+    # doivent être remplacées par une recharge au lieu de faire tourner la boucle
+    env = EnvironnementDuel(classes1=0, classes2=1, adversaire=lambda sim, rng: np.full(sim.n, SPECIAL),
+                            max_tours=50, seed=0)
+    env.reset(16)
+    for _ in range(60):
+        env.step(np.full(16, DEFENDRE))
+    assert ((env.sim.joueur == 0) | (env.sim.gagnant >= 0)).all()
+
+
+def test_adversaire_action_inconnue_remplacee():
+    env = EnvironnementDuel(adversaire=lambda sim, rng: np.full(sim.n, 99), max_tours=20, seed=0)
+    env.reset(4)
+    _, _, _, infos = env.step(np.full(4, ATTAQUER))
+    assert infos['succes'].all()
+
+
+def test_troncature_et_observations_finales():
+    env = EnvironnementDuel(classes1=0, classes2=0, max_tours=4, seed=0)
+    env.reset(3)
+    for _ in range(3):
+        _, _, fins, infos = env.step(np.full(3, DEFENDRE))
+        assert not fins.any() and 'observations_finales' not in infos
+    obs, recompenses, fins, infos = env.step(np.full(3, DEFENDRE))
+    assert fins.all() and infos['tronques'].all()
+    assert (infos['gagnant'] == -1).all() and (recompenses == 0).all()
+    assert (infos['tours'] == 4).all()
+    # Observations d'avant la remise à zéro, distinctes des nouvelles
+    assert infos['observations_finales'][:, 5].all()
+    assert not obs[:, 5].any()
+    assert (env.sim.tours == 0).all()
+
+
+def test_victoire_et_remise_a_zero():
+    env = EnvironnementDuel(classes1=0, classes2=1, adversaire=politique_aleatoire, seed=3)
+    env.reset(32)
+    termines = 0
+    for _ in range(200):
+        obs, recompenses, fins, infos = env.step(np.full(32, ATTAQUER))
+        gagnants = infos['gagnant'][fins & ~infos['tronques']]
+        assert set(gagnants.tolist()) <= {0, 1}
+        assert (recompenses[fins & (infos['gagnant'] == 0)] == 1).all()
+        assert (recompenses[fins & (infos['gagnant'] == 1)] == -1).all()
+        termines += fins.sum()
+        assert (env.sim.gagnant < 0).all()
+        assert (obs[:, 0] > 0).all()
+    assert termines > 32
+
+
+def test_deterministe():
+    def episode():
+        env = EnvironnementDuel(adversaire=politique_aleatoire, seed=5)
+        env.reset(8)
+        rng = np.random.default_rng(1)
+        total = np.zeros(8)
+        for _ in range(50):
+            _, recompenses, _, _ = env.step(rng.integers(0, 4, 8))
+            total += recompenses
+        return total
+    assert (episode() == episode()).all()
@@ -0,0 +1,102 @@
+import random
+
+from core.equipes import CombatEquipes, creer_equipe
+from core.game import Game
+
+CHOIX = ['attaquer', 'special', 'defendre', 'recharger']
+
+
+def test_creer_equipe():
+    equipe = creer_equipe('Archer', 3, 'Robin')
+    assert [p.nom for p in equipe] == ['Robin 1', 'Robin 2', 'Robin 3']
+    assert all(type(p).__name__ == 'Archer' for p in equipe)
+
+
+def test_un_contre_un_comme_le_duel():
+    rng = random.Random(4)
+    game = Game(journalisation=False)
+    game.creer_personnage('guerrier', 'A', 1)
+    game.creer_personnage('guerrier', 'B', 2)
+    game.demarrer_combat()
+    combat = CombatEquipes(creer_equipe('guerrier', 1), creer_equipe('guerrier', 1))
+    while game.gagnant is None:
+        action = rng.choice(CHOIX)
+        assert combat.executer_action(action) == game.executer_action(action)
+        equipe = [(c.pv, c.energie, c.is_defending) for c in combat.combattants]
+        assert equipe == [(j.pv, j.energie, j.is_defending) for j in (game.joueur1, game.joueur2)]
+    assert combat.gagnant == (0 if game.gagnant is game.joueur1 else 1)
+
+
+def test_ordre_par_vitesse_et_initiative():
+    # Archer (vitesse 12) toutes les 10 unités, guerrier (vitesse 8) toutes les 15
+    combat = CombatEquipes(creer_equipe('guerrier', 1), creer_equipe('archer', 1))
+    ordre = []
+    for _ in range(7):
+        ordre.append(combat.acteur())
+        assert combat.executer_action('defendre') == (True, False)
+    assert ordre == [1, 0, 1, 0, 1, 1, 0]
+    # Initiatives imposées : le guerrier joue d'abord à l'instant 0
+    combat = CombatEquipes(creer_equipe('guerrier', 1), creer_equipe('archer', 1), initiatives=[20, 1])
+    assert combat.acteur() == 0
+
+
+def test_cible_auto_et_cible_invalide():
+    mages = creer_equipe('mage', 3)
+    mages[1].pv = 10
+    mages[2].pv = 0
+    combat = CombatEquipes(creer_equipe('guerrier', 2), mages, initiatives=[20, 19, 1, 1, 1])
+    assert combat.vivants == [2, 2]
+    assert combat.cible_auto(1) == 3
+    acteur = combat.acteur()
+    assert acteur == 0
+    # Un allié, un indice hors limites ou un adversaire K.O. ne sont pas des cibles
+    for cible in (1, 5, -1, '2'):
+        assert combat.executer_action('attaquer', cible) == (False, False)
+    assert combat.executer_action('attaquer', 4) == (False, False)
+    assert combat.acteur() == acteur and combat.tour == 0
+    assert combat.executer_action('attaquer') == (True, False)
+    assert combat.combattants[3].est_ko()
+    assert combat.vivants == [2, 1]
+    assert combat.cible_auto(1) == 2
+    assert combat.executer_action('inconnue') == (False, False)
+
+
+def test_special_refusee_sans_energie():
+    combat = CombatEquipes(creer_equipe('mage', 1), creer_equipe('mage', 1))
+    combat.combattants[0].energie = 0
+    assert combat.executer_action('special') == (False, False)
+    assert combat.acteur() == 0
+
+
+def test_simuler():
+    combat = CombatEquipes(creer_equipe('archer', 20), creer_equipe('guerrier', 5))
+    gagnant = combat.simuler()
+    assert gagnant == combat.gagnant == 0
+    assert combat.vivants[1] == 0 and combat.vivants[0] > 0
+    assert combat.acteur() is None
+    assert combat.executer_action('attaquer') == (False, False)
+
+    combat = CombatEquipes(creer_equipe('mage', 10), creer_equipe('mage', 10))
+    assert combat.simuler(max_actions=5) is None
+    assert combat.tour == 5
+
+
+def test_simuler_avec_choix():
+    combat = CombatEquipes(creer_equipe('guerrier', 2), creer_equipe('guerrier', 2))
+    # Toujours une spéciale sur l'adversaire le plus solide : refusée sans énergie, recharge à la place
+    energies = []
+
+    def choisir(c, i):
+        energies.append(c.combattants[i].energie)
+        adversaires = [j for j in range(4) if c.camps[j] != c.camps[i] and not c.combattants[j].est_ko()]
+        return 'special', max(adversaires, key=lambda j: c.combattants[j].pv)
+    assert combat.simuler(choisir) in (0, 1)
+    assert min(energies) < combat.combattants[0].special_cost
+
+
+def test_equipe_deja_eliminee():
+    mages = creer_equipe('mage', 2)
+    for mage in mages:
+        mage.pv = 0
+    combat = CombatEquipes(creer_equipe('archer', 1), mages)
+    assert combat.est_termine and combat.gagnant == 0
@@ -0,0 +1,57 @@
+import random
+
+from core.etat import EtatDuel, cle_position, MASQUE_POSITION
+from core.game import Game
+
+
+def _partie(classe1='guerrier', classe2='archer'):
+    game = Game()
+    game.creer_personnage(classe1, 'A', 1)
+    game.creer_personnage(classe2, 'B', 2)
+    game.demarrer_combat()
+    return game
+
+
+def _valeurs(game):
+    j1, j2 = game.joueur1, game.joueur2
+    return (type(j1), type(j2), j1.pv, j2.pv, j1.energie, j2.energie, j1.is_defending, j2.is_defending,
+            game.get_joueur_actuel(), game.moteur_combat.tour)
+
+
+def test_etat_duel_aller_retour():
+    rng = random.Random(2)
+    for _ in range(500):
+        etat = EtatDuel(rng.randrange(101), rng.randrange(101), rng.randrange(64), rng.randrange(64),
+                        rng.randrange(2), rng.randrange(2), rng.randrange(2), rng.randrange(3),
+                        rng.randrange(3), rng.randrange(10000))
+        cle = etat.compacter()
+        assert EtatDuel.decompacter(cle) == etat
+        assert EtatDuel.decompacter(cle).compacter() == cle
+
+
+def test_cle_de_position():
+    etat = EtatDuel(pv1=30, pv2=70, energie1=5, energie2=40, defense2=1, cote=0, classe1=2, tour=9)
+    assert etat.compacter() & MASQUE_POSITION == cle_position(30, 70, 5, 40, 1, 0)
+
+
+def test_instantane_et_restauration_de_partie():
+    rng = random.Random(4)
+    game = _partie()
+    instantanes = []
+    while game.gagnant is None and len(instantanes) < 40:
+        instantanes.append((game.instantane(), _valeurs(game)))
+        game.executer_action(rng.choice(['attaquer', 'special', 'defendre', 'recharger']))
+    for cle, valeurs in reversed(instantanes):
+        game.restaurer(cle)
+        assert _valeurs(game) == valeurs
+        assert game.instantane() == cle
+
+
+def test_restauration_change_les_classes():
+    source = _partie('mage', 'mage')
+    source.executer_action('special')
+    cle = source.instantane()
+    cible = _partie('guerrier', 'archer')
+    cible.restaurer(cle)
+    assert _valeurs(cible) == _valeurs(source)
+    assert cible.joueur1.nom == 'A'
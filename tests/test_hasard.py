@@ -0,0 +1,205 @@
+import random
+
+import numpy as np
+import pytest
+
+from core import journal as evt
+from core.archive import ArchiveParties
+from core.characters import NOMS_CLASSES
+from core.engine import step, etat_initial, SUIVANT, ISSUE, ECHEC, CRITIQUE, ETOURDISSEMENT
+from core.game import Game, ACTIONS, ATTAQUER, SPECIAL
+from core.hasard import (MecaniquesAleatoires, tirage, tirages, cle_graine, cles_graines, seuil,
+                         encoder_hasard, decoder_hasard, TIRAGE_ECHEC, TIRAGE_CRITIQUE)
+from core.replay import EnregistreurReplay, LecteurReplays, rejouer, verifier
+from core.session import encoder_session, decoder_session
+from core.simulation import SimulateurLot, AUCUNE, simuler_duels, politique_agressive
+
+CHOIX = ['attaquer', 'special', 'defendre', 'recharger']
+# Probabilités élevées : chaque partie courte rencontre tous les effets
+HASARD = MecaniquesAleatoires(11, echec=0.2, critique=0.3, multiplicateur_critique=3)
+
+
+def _partie(classe1, classe2, hasard, journalisation=True, nom1='A'):
+    game = Game(journalisation=journalisation)
+    game.hasard = hasard
+    game.creer_personnage(classe1, nom1, 1)
+    game.creer_personnage(classe2, 'B', 2)
+    game.demarrer_combat()
+    return game
+
+
+def _jouer(game, rng, limite=1000):
+    codes = []
+    while game.gagnant is None and len(codes) < limite:
+        action = rng.choice(CHOIX)
+        if game.executer_action(action)[0]:
+            codes.append(ACTIONS.index(action))
+    return codes
+
+
+def test_tirage_scalaire_egal_au_vectorise():
+    graines = np.array([0, 1, 2, 12345, (1 << 64) - 1], dtype=np.uint64)
+    cles = cles_graines(graines)
+    assert cles.tolist() == [cle_graine(int(g)) for g in graines]
+    tours = np.array([0, 1, 7, 1000, 1 << 20])
+    for evenement in (TIRAGE_ECHEC, TIRAGE_CRITIQUE, 255):
+        attendus = [tirage(int(c), int(t), evenement) for c, t in zip(cles, tours)]
+        assert tirages(cles, tours, evenement).tolist() == attendus
+        assert all(0 <= valeur < 1 << 32 for valeur in attendus)
+
+
+def test_tirages_uniformes():
+    valeurs = tirages(cles_graines(np.arange(20000)), np.zeros(20000), TIRAGE_ECHEC)
+    assert abs((valeurs < seuil(0.25)).mean() - 0.25) < 0.02
+
+
+def test_seuil():
+    assert (seuil(0.0), seuil(1.0), seuil(0.5)) == (0, 1 << 32, 1 << 31)
+    with pytest.raises(ValueError):
+        seuil(1.5)
+
+
+def test_reglages():
+    hasard = MecaniquesAleatoires(5, echec=0.1, critique=0.2, multiplicateur_critique=4, etourdissement=False)
+    assert hasard.tirer(3, TIRAGE_CRITIQUE) == tirage(cle_graine(5), 3, TIRAGE_CRITIQUE)
+    copie = hasard.pour_graine(6)
+    assert (copie.graine, copie.seuil_echec, copie.multiplicateur_critique) == (6, hasard.seuil_echec, 4)
+    assert copie.tirer(3, TIRAGE_CRITIQUE) == tirage(cle_graine(6), 3, TIRAGE_CRITIQUE)
+    assert hasard.graine == 5
+    relu = decoder_hasard(b'xy' + encoder_hasard(hasard), 2)
+    for nom in MecaniquesAleatoires.__slots__:
+        assert getattr(relu, nom) == getattr(hasard, nom)
+
+
+def test_effets_du_moteur():
+    echec = MecaniquesAleatoires(0, echec=1.0, critique=0.0)
+    etat = etat_initial(0, 1)
+    nouveau, issue, degats = step(etat, ATTAQUER, echec)
+    assert issue == SUIVANT | ECHEC and degats == 0
+    assert nouveau & 0x3FFF == etat & 0x3FFF  # PV intacts
+
+    critique = MecaniquesAleatoires(0, echec=0.0, critique=1.0, multiplicateur_critique=3)
+    _, _, normal = step(etat, ATTAQUER)
+    _, issue, degats = step(etat, ATTAQUER, critique)
+    assert issue == SUIVANT | CRITIQUE and degats == 3 * normal
+
+    # Spéciale du guerrier : la cible étourdie perd son tour, le guerrier rejoue
+    etourdissements = [graine for graine in range(200)
+                       if step(etat, SPECIAL, MecaniquesAleatoires(graine))[1] & ETOURDISSEMENT]
+    assert 20 < len(etourdissements) < 100
+    nouveau, issue, _ = step(etat, SPECIAL, MecaniquesAleatoires(etourdissements[0]))
+    assert issue & ISSUE == SUIVANT
+    assert not nouveau >> 27 & 1 and nouveau >> 35 == 1
+
+
+def test_game_journalise_les_effets():
+    types = set()
+    for graine in range(30):
+        game = _partie('guerrier', 'mage', HASARD.pour_graine(graine))
+        _jouer(game, random.Random(graine))
+        types.update(e.type for e in game.journal.evenements())
+    assert {evt.ECHEC, evt.CRITIQUE, evt.ETOURDISSEMENT} <= types
+
+
+def test_lot_suit_game_avec_hasard():
+    rng = random.Random(8)
+    n = 150
+    classes1 = np.array([rng.randrange(len(NOMS_CLASSES)) for _ in range(n)])
+    classes2 = np.array([rng.randrange(len(NOMS_CLASSES)) for _ in range(n)])
+    graines = np.arange(n, dtype=np.uint64) * 7 + 3
+    sim = SimulateurLot(classes1, classes2, hasard=HASARD, graines=graines)
+    games = [_partie(NOMS_CLASSES[c1], NOMS_CLASSES[c2], HASARD.pour_graine(int(g)), False)
+             for c1, c2, g in zip(classes1, classes2, graines)]
+    for _ in range(300):
+        actions = np.array([rng.randrange(4) for _ in range(n)], dtype=np.int16)
+        actions[sim.termines] = AUCUNE
+        succes = sim.step(actions)
+        for i, game in enumerate(games):
+            if actions[i] == AUCUNE:
+                continue
+            assert game.executer_action(int(actions[i]))[0] == bool(succes[i])
+            j1, j2 = game.joueur1, game.joueur2
+            assert (j1.pv, j2.pv, j1.energie, j2.energie) == (
+                sim.pv[0, i], sim.pv[1, i], sim.energie[0, i], sim.energie[1, i])
+            if game.gagnant is None:
+                assert game.moteur_combat.tour == sim.tours[i]
+                assert game.get_joueur_actuel() - 1 == sim.joueur[i]
+                assert (j1.is_defending, j2.is_defending) == tuple(sim.is_defending[:, i])
+        if sim.termines.all():
+            break
+    assert sim.termines.all()
+
+
+def test_simuler_duels_avec_hasard():
+    # Les tirages ne dépendent que de la graine de chaque duel, pas de la taille du lot
+    a = simuler_duels('guerrier', 'archer', 3000, politique_agressive, hasard=HASARD)
+    assert a == simuler_duels('guerrier', 'archer', 3000, politique_agressive, hasard=HASARD, taille_lot=500)
+    assert a != simuler_duels('guerrier', 'archer', 3000, politique_agressive)
+
+
+def test_replay_avec_hasard(tmp_path):
+    chemin = str(tmp_path / 'parties.rep')
+    enregistreur = EnregistreurReplay(chemin, intervalle=4)
+    rng = random.Random(2)
+    etats = []
+    for graine in range(4):
+        game = _partie('guerrier', 'mage', HASARD.pour_graine(graine), False)
+        game.enregistreur = enregistreur
+        game.demarrer_combat()
+        _jouer(game, rng)
+        etats.append(game.instantane())
+    enregistreur.fermer()
+    lecteur = LecteurReplays(chemin)
+    try:
+        replays = list(lecteur)
+        assert [r.hasard.graine for r in replays] == [0, 1, 2, 3]
+        for replay, etat in zip(replays, etats):
+            for game in rejouer(replay):
+                pass
+            assert game.instantane() == etat
+        assert all(valide for _, valide in verifier(lecteur))
+        assert lecteur.aller_a(2, 1 << 30).instantane() == etats[2]
+    finally:
+        lecteur.fermer()
+
+
+def test_session_avec_hasard():
+    game = _partie('guerrier', 'archer', HASARD.pour_graine(4))
+    _jouer(game, random.Random(1), limite=6)
+    reprise = decoder_session(encoder_session(game))
+    assert encoder_hasard(reprise.hasard) == encoder_hasard(game.hasard)
+    # Les tirages continuent à l'identique
+    _jouer(game, random.Random(3))
+    _jouer(reprise, random.Random(3))
+    assert reprise.instantane() == game.instantane()
+    assert list(reprise.historique) == list(game.historique)
+
+
+def test_archive_avec_hasard(tmp_path):
+    archive = ArchiveParties(str(tmp_path / 'parties.db'))
+    try:
+        rng = random.Random(5)
+        terminees = []
+        for graine in range(6):
+            game = _partie('guerrier', 'mage', HASARD.pour_graine(graine))
+            game.enregistreur = archive
+            game.demarrer_combat()
+            codes = _jouer(game, rng, limite=1000 if graine != 2 else 3)
+            if game.gagnant is not None:
+                terminees.append((graine, codes, list(game.historique)))
+        assert len(archive) == len(terminees) == 5
+        for numero, (graine, codes, historique) in enumerate(terminees, 1):
+            replay = archive.partie(numero)
+            assert replay.hasard.graine == graine and list(replay.actions) == codes
+            assert archive.historique(numero) == historique
+
+        # Sans acteurs, ils sont retrouvés en rejouant : même histogramme que depuis la partie
+        avant = archive.histogramme_actions('guerrier')
+        for graine, codes, _ in terminees:
+            archive.ajouter('A', 'B', 'guerrier', 'mage', 1, codes, hasard=HASARD.pour_graine(graine))
+        apres = archive.histogramme_actions('guerrier')
+        assert apres == {action: 2 * n for action, n in avant.items()}
+        with pytest.raises(ValueError):
+            archive.ajouter('A', 'B', 'mage', 'mage', 1, [SPECIAL] * 10, hasard=HASARD)
+    finally:
+        archive.fermer()
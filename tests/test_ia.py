@@ -0,0 +1,76 @@
+import time
+
+from core.engine import step, KO, ISSUE
+from core.game import Game, ACTIONS
+from core.ia import IA
+from core.politiques import get_politique
+from core.registre import SPECIAL
+from core.tournoi import lancer_tournoi
+
+GUERRIER, MAGE = 0, 1
+
+
+def _compact(classes, etat):
+    return IA._compacter(classes, etat)
+
+
+def test_ia_acheve_un_adversaire_a_portee():
+    ia = IA('normal')
+    classes, etat = (GUERRIER, MAGE), (40, 5, 0, 50, 0, 0)
+    action = ia.rechercher(classes, etat)
+    assert step(_compact(classes, etat), action)[1] & ISSUE == KO
+
+
+def test_ia_ne_choisit_pas_une_speciale_impossible():
+    ia = IA('difficile')
+    for pv in (10, 50, 100):
+        assert ia.rechercher((MAGE, GUERRIER), (pv, 60, 0, 0, 0, 0)) != SPECIAL
+
+
+def test_partie_entre_ia_jusqu_au_bout():
+    game = Game(niveau_ia='facile')
+    game.creer_personnage('archer', 'A', 1)
+    game.creer_personnage('mage', 'B', 2)
+    game.demarrer_combat()
+    for _ in range(200):
+        succes, fini = game.executer_action_ia()
+        assert succes
+        if fini:
+            break
+    if game.gagnant is not None:
+        assert game.executer_action_ia() == (False, False)
+
+
+def test_latence_bornee_par_le_budget():
+    ia = IA('difficile')
+    game = Game()
+    game.creer_personnage('guerrier', 'A', 1)
+    game.creer_personnage('guerrier', 'B', 2)
+    game.demarrer_combat()
+    debut = time.perf_counter()
+    for _ in range(10):
+        ia.choisir_action(game)
+    assert (time.perf_counter() - debut) / 10 < 0.05  # Budget de 5 ms, large marge
+
+
+def test_politique_de_tournoi_independante_de_l_historique():
+    politique = get_politique('ia_normal')
+    game = Game(journalisation=False)
+    game.creer_personnage('guerrier', 'A', 1)
+    game.creer_personnage('mage', 'B', 2)
+    game.demarrer_combat()
+    premiere = politique(game, None)
+    autre = Game(journalisation=False)
+    autre.creer_personnage('archer', 'C', 1)
+    autre.creer_personnage('archer', 'D', 2)
+    autre.demarrer_combat()
+    for _ in range(5):
+        autre.executer_action(politique(autre, None))
+    assert politique(game, None) == premiere
+    assert premiere in ACTIONS
+
+
+def test_tournoi_d_ia_independant_du_nombre_de_processus():
+    participants = [('guerrier', 'ia_facile'), ('mage', 'ia_normal'), ('archer', 'prudent')]
+    reference = lancer_tournoi(participants, nb_parties=4, workers=1, seed=2)
+    assert lancer_tournoi(participants, nb_parties=4, workers=2, seed=2) == reference
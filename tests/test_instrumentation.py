@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from core import instrumentation
+from core.game import Game
+from core.instrumentation import Histogramme
+
+
+@pytest.fixture
+def mesures():
+    actives = instrumentation.activer()
+    yield actives
+    instrumentation.desactiver()
+
+
+def _partie():
+    game = Game()
+    game.creer_personnage('guerrier', 'A', 1)
+    game.creer_personnage('mage', 'B', 2)
+    game.demarrer_combat()
+    return game
+
+
+def test_desactivee_par_defaut():
+    assert instrumentation.mesures is None
+    game = _partie()
+    assert game.executer_action('attaquer') == (True, False)
+
+
+def test_compteurs_et_crochets(mesures):
+    vues = []
+    mesures.ajouter_crochet('action', lambda game, action: vues.append(action))
+    mesures.ajouter_crochet('degats', lambda personnage, degats: vues.append(degats))
+    game = _partie()
+    game.executer_action('attaquer')
+    game.joueur2.energie = 0
+    game.executer_action('special')
+    game.executer_action('inconnue')
+    game.executer_action('defendre')
+    compteurs = mesures.instantane()['compteurs']
+    assert compteurs['action/attaquer'] == 1 and compteurs['action/defendre'] == 1
+    assert compteurs['refus/special'] == 1 and compteurs['refus/inconnue'] == 1
+    assert compteurs['coups'] == 1 and compteurs['degats'] == 100 - game.joueur2.pv
+    assert vues == ['attaquer', 15, 'defendre']
+    assert mesures.instantane()['durees']['regles']['nombre'] == 2
+
+
+def test_regles_mesurees_sans_les_observateurs(mesures):
+    game = _partie()
+    game.abonner(lambda changements: time.sleep(0.02))
+    game.executer_action('attaquer')
+    assert mesures.instantane()['durees']['regles']['total_s'] < 0.02
+
+
+def test_histogramme():
+    histogramme = Histogramme()
+    for duree in (1e-6, 3e-6, 1e-3):
+        histogramme.ajouter(duree)
+    resume = histogramme.resume()
+    assert resume['nombre'] == 3 and sum(resume['classes']) == 3
+    assert 1e-6 <= histogramme.quantile(0.5) <= 4e-6
+    assert histogramme.quantile(1.0) >= 1e-3
+
+
+def test_profiler_restaure_l_etat():
+    with instrumentation.profiler() as session:
+        _partie().executer_action('attaquer')
+    assert instrumentation.mesures is None
+    assert session.mesures.compteurs['action/attaquer'] == 1
+    assert 'executer_action' in session.rapport(20)
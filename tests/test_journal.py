@@ -0,0 +1,61 @@
+from core import journal as evt
+from core.game import Game
+from core.journal import JournalCombat
+
+
+def _partie(journalisation=True):
+    game = Game(journalisation=journalisation)
+    game.creer_personnage('guerrier', 'Conan', 1)
+    game.creer_personnage('mage', 'Merlin', 2)
+    game.demarrer_combat()
+    return game
+
+
+def test_messages_rendus_a_la_lecture():
+    game = _partie()
+    for action in ('attaquer', 'defendre', 'special'):
+        assert game.executer_action(action) == (True, False)
+    assert list(game.historique) == [
+        'Le combat commence ! Conan vs Merlin',
+        "C'est au tour de Conan !",
+        'Conan frappe avec son épée (-15 PV)',
+        'Au tour de Merlin !',
+        'Merlin se met en position défensive',
+        'Au tour de Conan !',
+        'Conan lance une frappe puissante ! (-12 PV)',
+        'Au tour de Merlin !',
+    ]
+    attaque = game.journal.evenement(2)
+    assert (attaque.type, attaque.acteur, attaque.degats_bruts, attaque.degats_subis) == (evt.ATTAQUE, 1, 15, 15)
+
+
+def test_historique_se_lit_comme_une_liste():
+    game = _partie()
+    game.executer_action('attaquer')
+    historique = game.historique
+    assert len(historique) == len(game.journal) == 4
+    assert historique[-1] == 'Au tour de Merlin !'
+    assert historique[1:3] == ["C'est au tour de Conan !", 'Conan frappe avec son épée (-15 PV)']
+    assert game.journal.exporter_texte().splitlines() == list(historique)
+
+
+def test_export_import_et_troncature():
+    game = _partie()
+    game.executer_actions(['attaquer', 'recharger', 'attaquer'])
+    copie = JournalCombat()
+    copie.demarrer(game.joueur1, game.joueur2)
+    copie.importer(game.journal.exporter())
+    assert list(copie) == list(game.journal)
+    assert list(copie.messages()) == list(game.historique)
+
+    version = copie.version
+    copie.tronquer(2)
+    assert len(copie) == 2 and copie.version != version
+    assert list(copie) == list(game.journal)[:2]
+
+
+def test_journal_inactif_n_enregistre_rien():
+    game = _partie(journalisation=False)
+    game.executer_action('attaquer')
+    assert len(game.journal) == 0
+    assert game.joueur2.pv < game.joueur2.pv_max
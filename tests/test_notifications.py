@@ -0,0 +1,85 @@
+from core.game import Game
+
+
+def _partie():
+    game = Game()
+    game.creer_personnage('guerrier', 'Conan', 1)
+    game.creer_personnage('mage', 'Merlin', 2)
+    game.demarrer_combat()
+    return game
+
+
+def test_seules_les_valeurs_modifiees_sont_notifiees():
+    game = _partie()
+    notifications = []
+    game.abonner(notifications.append)
+    game.executer_action('attaquer')
+    game.executer_action('special')
+    assert notifications == [
+        {'pv2': 85, 'tour': 2, 'journal': 2},
+        {'pv1': 65, 'energie2': 20, 'tour': 1, 'journal': 4},
+    ]
+
+
+def test_action_refusee_non_notifiee():
+    game = _partie()
+    game.joueur1.energie = 0
+    notifications = []
+    game.abonner(notifications.append)
+    assert game.executer_action('special') == (False, False)
+    assert notifications == []
+
+
+def test_executer_actions_notifie_une_fois():
+    game = _partie()
+    notifications = []
+    game.abonner(notifications.append)
+    assert game.executer_actions(['attaquer', 'defendre', 'recharger']) == (3, False)
+    assert notifications == [{'pv2': 85, 'tour': 2, 'journal': 2}]
+    notifications.clear()
+    # Arrêt à la première action refusée
+    game.joueur1.energie = 0
+    assert game.executer_actions(['defendre', 'special', 'attaquer']) == (1, False)
+    assert len(notifications) == 1
+
+
+def test_notifications_groupees_imbriquees():
+    game = _partie()
+    notifications = []
+    game.abonner(notifications.append)
+    with game.notifications_groupees():
+        game.executer_action('attaquer')
+        with game.notifications_groupees():
+            game.executer_action('attaquer')
+        assert notifications == []
+    assert notifications == [{'pv1': 80, 'pv2': 85, 'journal': 2}]
+
+
+def test_aucun_changement_net_non_notifie():
+    game = _partie()
+    avant = game.instantane()
+    notifications = []
+    game.abonner(notifications.append)
+    with game.notifications_groupees():
+        game.executer_action('defendre')
+        game.restaurer(avant)
+    # Seul le journal a grandi
+    assert notifications == [{'journal': 2}]
+
+
+def test_journal_recommence():
+    game = _partie()
+    game.executer_action('attaquer')
+    notifications = []
+    game.abonner(notifications.append)
+    game.demarrer_combat()
+    assert notifications[-1]['journal'] == 0
+
+
+def test_desabonner():
+    game = _partie()
+    notifications = []
+    game.abonner(notifications.append)
+    game.desabonner(notifications.append)
+    game.executer_action('attaquer')
+    assert notifications == []
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from core import engine
+from core.characters import CLASSES, NOMS_CLASSES, REGISTRE, charger_classes, classe_id, regles_classe
+from core.game import Game
+from core.registre import (ACTIONS, ATTAQUER, SPECIAL, DEFENDRE, RECHARGER, FRAPPE, DEFENSE, RECHARGE,
+                           completer_definition, compiler_actions, lire_definitions)
+
+PALADIN = {
+    'nom': 'Paladin',
+    'degats_normale': 10,
+    'coups_normale': 3,
+    'degats_speciale': 30,
+    'special_cost': 25,
+    'message_normale': "{nom} frappe trois fois : {premier} puis {suivant} (-{degats} PV)",
+}
+
+
+@pytest.fixture
+def registre_temporaire():
+    """Retire à la fin du test les classes qu'il a enregistrées"""
+    nombre = len(CLASSES)
+    yield
+    for classe in CLASSES[nombre:]:
+        for cle in [cle for cle, valeur in REGISTRE.items() if valeur is classe]:
+            del REGISTRE[cle]
+    del CLASSES[nombre:]
+    del NOMS_CLASSES[nombre:]
+    del engine._REGLES[nombre * len(ACTIONS):]
+
+
+def test_classes_par_defaut():
+    definitions = lire_definitions()
+    assert [d['nom'] for d in definitions] == NOMS_CLASSES[:len(definitions)]
+    assert classe_id('mage') == 1 and classe_id('Archer') == 2 and classe_id(0) == 0
+    assert regles_classe('archer')['coups_normale'] == 2
+
+
+def test_definition_completee_et_validee():
+    definition = completer_definition(PALADIN)
+    assert definition['nom'] == 'paladin' and definition['libelle'] == 'Paladin'
+    assert definition['recharge'] == 10 and definition['ignore_defense'] is False
+    with pytest.raises(ValueError):
+        completer_definition({'nom': 'x', 'degats_normale': 1})
+    with pytest.raises(ValueError):
+        completer_definition(dict(PALADIN, special_cost=-1))
+    with pytest.raises(ValueError):
+        completer_definition(dict(PALADIN, coups_normale=0))
+    with pytest.raises(ValueError):
+        completer_definition(dict(PALADIN, etourdissement=1.5))
+
+
+def test_table_d_actions():
+    table = compiler_actions(completer_definition(PALADIN))
+    assert table[ATTAQUER] == (FRAPPE, 10, 3, 0, False)
+    assert table[SPECIAL] == (FRAPPE, 30, 1, 25, False)
+    assert table[DEFENDRE][0] == DEFENSE and table[RECHARGER] == (RECHARGE, 10, 0, 0, False)
+
+
+def test_classe_chargee_depuis_un_fichier(tmp_path, registre_temporaire):
+    fichier = tmp_path / 'classes.json'
+    fichier.write_text(json.dumps([PALADIN]), encoding='utf-8')
+    paladin, = charger_classes(str(fichier))
+    assert REGISTRE['paladin'] is paladin and paladin.identifiant == len(CLASSES) - 1
+    assert charger_classes(str(fichier)) == [paladin]  # Déjà enregistrée
+
+    game = Game()
+    game.creer_personnage('paladin', 'Arthur', 1)
+    game.creer_personnage('guerrier', 'Conan', 2)
+    game.demarrer_combat()
+    game.joueur2.defendre()
+    game.executer_action('attaquer')
+    assert game.joueur2.pv == 100 - (5 + 10 + 10)
+    assert game.historique[2] == "Arthur frappe trois fois : 5 puis 10 (-25 PV)"
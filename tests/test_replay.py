@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from core.game import Game, ACTIONS
+from core.replay import EnregistreurReplay, LecteurReplays, rejouer, verifier
+
+CHOIX = ['attaquer', 'special', 'defendre', 'recharger']
+
+
+def _jouer(game, rng, jusqu_a_la_fin=True, limite=300):
+    """Joue une partie au hasard ; retourne les codes joués et l'instantané après chaque action"""
+    codes, instantanes = [], [game.instantane()]
+    while game.gagnant is None and len(codes) < limite:
+        action = rng.choice(CHOIX)
+        succes, _ = game.executer_action(action)
+        if succes:
+            codes.append(ACTIONS.index(action))
+            instantanes.append(game.instantane())
+        if not jusqu_a_la_fin and len(codes) == 5:
+            break
+    return codes, instantanes
+
+
+@pytest.fixture
+def fichier(tmp_path):
+    """Trois parties : terminée, abandonnée par une nouvelle partie, terminée ; une dernière abandonnée à la fermeture"""
+    chemin = str(tmp_path / 'parties.rep')
+    rng = random.Random(3)
+    game = Game(journalisation=False)
+    enregistreur = EnregistreurReplay(chemin, intervalle=4)
+    game.enregistreur = enregistreur
+    parties = []
+    for nom, complete in (('Élodie', True), ('Abel', False), ('Zoé', True), ('Dernier', False)):
+        game.creer_personnage(rng.choice(['guerrier', 'mage', 'archer']), nom, 1)
+        game.creer_personnage(rng.choice(['guerrier', 'mage', 'archer']), 'B', 2)
+        game.demarrer_combat()
+        parties.append((nom, complete) + _jouer(game, rng, complete))
+    enregistreur.fermer()
+    lecteur = LecteurReplays(chemin)
+    yield lecteur, parties
+    lecteur.fermer()
+
+
+def test_parties_relues(fichier):
+    lecteur, parties = fichier
+    replays = list(lecteur)
+    assert [(r.nom1, r.complet) for r in replays] == [(nom, complete) for nom, complete, _, _ in parties]
+    for replay, (_, _, codes, _) in zip(replays, parties):
+        assert list(replay.actions) == codes
+        assert lecteur.lire(replay.offset) == replay
+
+
+def test_index_des_parties_terminees(fichier):
+    lecteur, parties = fichier
+    terminees = [p for p in parties if p[1]]
+    assert len(lecteur) == len(terminees)
+    for numero, (_, _, codes, instantanes) in enumerate(terminees):
+        for tour in (0, 1, 5, len(codes) // 2, len(codes), len(codes) + 10):
+            game = lecteur.aller_a(numero, tour)
+            assert game.instantane() == instantanes[min(tour, len(codes))]
+
+
+def test_rejouer(fichier):
+    lecteur, parties = fichier
+    replay = next(iter(lecteur))
+    etats = [game.instantane() for game in rejouer(replay)]
+    assert etats == parties[0][3][1:]
+
+
+def test_verifier(fichier):
+    lecteur, _ = fichier
+    assert all(valide for _, valide in verifier(lecteur))
+
+
+def test_verifier_refuse_une_partie_complete_inachevee(fichier):
+    lecteur, _ = fichier
+    replay = next(iter(lecteur))
+    tronquee = replay._replace(actions=replay.actions[:-1])
+    assert [valide for _, valide in verifier([tronquee])] == [False]
+    impossible = replay._replace(actions=bytes([len(ACTIONS)]) + replay.actions)
+    assert [valide for _, valide in verifier([impossible])] == [False]
+    abandonnee = replay._replace(actions=replay.actions[:-1], complet=False)
+    assert [valide for _, valide in verifier([abandonnee])] == [True]
+
+
+def test_partie_interrompue_sans_marque_de_fin(fichier, tmp_path):
+    lecteur, parties = fichier
+    with open(lecteur.chemin, 'rb') as f:
+        donnees = f.read()
+    interrompu = tmp_path / 'interrompu.rep'
+    interrompu.write_bytes(donnees[:-1])  # Sans l'octet ABANDON de la dernière partie
+    copie = LecteurReplays(str(interrompu))
+    derniere = list(copie)[-1]
+    copie.fermer()
+    assert derniere.nom1 == 'Dernier' and not derniere.complet
+    assert list(derniere.actions) == parties[-1][2]
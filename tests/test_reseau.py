@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from core.reseau import ServeurDuels, ClientDuel
+
+
+def _executer(scenario):
+    async def principal():
+        serveur = ServeurDuels()
+        port = await serveur.demarrer()
+        try:
+            return await asyncio.wait_for(scenario(serveur, port), 10)
+        finally:
+            await serveur.arreter()
+    return asyncio.run(principal())
+
+
+async def _partie(port):
+    client1 = await ClientDuel.connecter(port=port)
+    client2 = await ClientDuel.connecter(port=port)
+    partie = (await client1.creer('mage', 'Merlin'))['partie']
+    return client1, client2, partie
+
+
+def test_partie_complete_avec_deltas():
+    async def scenario(serveur, port):
+        client1, client2, partie = await _partie(port)
+        rejoint = await client2.rejoindre(partie, 'guerrier', 'Conan')
+        assert rejoint['ok'] and rejoint['joueur'] == 2
+        assert rejoint['noms'] == ['Merlin', 'Conan'] and rejoint['pv'] == [100, 100]
+        debut = await client1.evenements.get()
+        assert debut['evt'] == 'debut' and debut['noms'] == ['Merlin', 'Conan']
+
+        reponse = await client1.agir(partie, 'attaquer')
+        assert reponse['ok'] and 'pv' in reponse and 'energie' not in reponse
+        notification = await client2.evenements.get()
+        assert notification['evt'] == 'action' and notification['pv'] == reponse['pv']
+        assert await client1.agir(partie, 'attaquer') == {'ok': False, 'erreur': "Ce n'est pas votre tour"}
+        assert (await client2.etat(partie)) == {'ok': True}  # Rien de nouveau depuis la notification
+        complet = await client2.etat(partie, complet=True)
+        assert complet['noms'] == ['Merlin', 'Conan'] and len(complet['messages']) >= 3
+
+        clients = (client1, client2)
+        cote = 1
+        while True:
+            reponse = await clients[cote].agir(partie, 'attaquer')
+            assert reponse['ok']
+            await clients[1 - cote].evenements.get()
+            if reponse.get('gagnant'):
+                break
+            cote = 1 - cote
+        assert reponse['gagnant'] == cote + 1
+        await client1.fermer()
+        await client2.fermer()
+    _executer(scenario)
+
+
+@pytest.mark.parametrize('requete', [
+    {'op': 'creer', 'classe': 3, 'nom': 'x'},
+    {'op': 'creer', 'classe': 'mage', 'nom': ['x']},
+    {'op': 'creer', 'classe': 'mage'},
+    {'op': 'rejoindre', 'partie': '1', 'classe': 'mage', 'nom': 'x'},
+    {'op': 'agir', 'partie': True, 'action': 'attaquer'},
+    {'op': 'agir', 'partie': 1, 'action': 7},
+    {'op': 'etat', 'partie': 1, 'complet': 'oui'},
+    {'op': 7},
+    {'op': 'inconnue', 'partie': 1},
+    {'op': 'creer', 'classe': 'dragon', 'nom': 'x'},
+])
+def test_requetes_mal_formees_refusees_sans_perdre_le_siege(requete):
+    async def scenario(serveur, port):
+        client1, client2, partie = await _partie(port)
+        await client2.rejoindre(partie, 'archer', 'Robin')
+        await client1.evenements.get()
+        reponse = await client1.requete(**requete)
+        assert reponse['ok'] is False and reponse['erreur']
+        client1._writer.write(b'[1, 2]\n{"op"\n')
+        assert (await client1._reponses.get())['ok'] is False
+        assert (await client1._reponses.get())['ok'] is False
+        assert partie in serveur.parties
+        assert (await client1.agir(partie, 'attaquer'))['ok']
+        await client1.fermer()
+        await client2.fermer()
+    _executer(scenario)
+
+
+def test_requete_en_attente_echoue_a_la_deconnexion():
+    async def scenario(serveur, port):
+        client = await ClientDuel.connecter(port=port)
+        await client.creer('mage', 'Merlin')
+        for partie in serveur.parties.values():
+            partie.connexions[0].close()
+        with pytest.raises(ConnectionError):
+            await client.etat(1)
+        with pytest.raises(ConnectionError):
+            await client.etat(1)
+        await client.fermer()
+    _executer(scenario)
+
+
+def test_partie_sans_joueur_supprimee():
+    async def scenario(serveur, port):
+        client1, client2, partie = await _partie(port)
+        await client1.fermer()
+        for _ in range(100):
+            if partie not in serveur.parties:
+                break
+            await asyncio.sleep(0.01)
+        assert partie not in serveur.parties
+        assert (await client2.rejoindre(partie, 'mage', 'x')) == {'ok': False, 'erreur': "Partie inconnue"}
+        await client2.fermer()
+    _executer(scenario)
@@ -0,0 +1,142 @@
+import random
+
+import pytest
+
+from core.game import Game
+from core.replay import EnregistreurReplay, LecteurReplays
+from core.session import encoder_session, decoder_session, FichierSessions, _ENTETE
+
+CHOIX = ['attaquer', 'special', 'defendre', 'recharger']
+
+
+def _partie(journalisation=True, nom1='Élodie', classe2='archer'):
+    game = Game(journalisation=journalisation)
+    game.creer_personnage('mage', nom1, 1)
+    game.creer_personnage(classe2, 'Abel', 2)
+    game.demarrer_combat()
+    return game
+
+
+def _jouer(game, rng, nombre):
+    joues = 0
+    while joues < nombre and game.gagnant is None:
+        joues += game.executer_action(rng.choice(CHOIX))[0]
+
+
+def _vue(game):
+    return (game.instantane(), game.joueur1.nom, game.joueur2.nom, game.get_joueur_actuel(),
+            game.moteur_combat.tour, None if game.gagnant is None else game.gagnant.nom, list(game.historique))
+
+
+@pytest.mark.parametrize('journalisation', [True, False])
+def test_aller_retour(journalisation):
+    rng = random.Random(2)
+    game = _partie(journalisation)
+    _jouer(game, rng, 7)
+    reprise = decoder_session(encoder_session(game))
+    assert reprise.journal.actif == journalisation
+    assert _vue(reprise) == _vue(game)
+    # La partie reprise continue comme l'originale
+    suite = random.Random(9)
+    _jouer(game, suite, 1000)
+    suite = random.Random(9)
+    _jouer(reprise, suite, 1000)
+    assert _vue(reprise) == _vue(game)
+
+
+def test_partie_terminee():
+    game = _partie()
+    _jouer(game, random.Random(4), 1000)
+    reprise = decoder_session(encoder_session(game))
+    assert reprise.gagnant is not None and reprise.gagnant.nom == game.gagnant.nom
+    assert reprise.moteur_combat.is_combat_over
+    assert reprise.executer_action('attaquer') == (False, False)
+
+
+def test_partie_non_demarree():
+    game = Game()
+    game.creer_personnage('guerrier', 'A', 1)
+    game.creer_personnage('mage', 'B', 2)
+    reprise = decoder_session(encoder_session(game))
+    assert reprise.moteur_combat is None
+    assert (type(reprise.joueur1).__name__, reprise.joueur1.nom) == ('Guerrier', 'A')
+    assert (type(reprise.joueur2).__name__, reprise.joueur2.nom) == ('Mage', 'B')
+    assert list(reprise.historique) == []
+    reprise.demarrer_combat()
+    assert reprise.executer_action('attaquer') == (True, False)
+
+
+def test_sans_personnages():
+    game = Game()
+    game.creer_personnage('guerrier', 'A', 1)
+    with pytest.raises(ValueError):
+        encoder_session(game)
+
+
+def test_sessions_refusees():
+    donnees = encoder_session(_partie(), version_regles=1)
+    with pytest.raises(ValueError, match="autres règles"):
+        decoder_session(donnees, version_regles=2)
+    assert decoder_session(donnees, version_regles=1).joueur1.nom == 'Élodie'
+    with pytest.raises(ValueError, match="tronquée"):
+        decoder_session(donnees[:-1], version_regles=1)
+    with pytest.raises(ValueError, match="invalide"):
+        decoder_session(b'XX' + donnees[2:], version_regles=1)
+    # Version 1 du format, plus lue
+    with pytest.raises(ValueError, match="invalide"):
+        decoder_session(donnees[:2] + b'\x01' + donnees[3:], version_regles=1)
+
+
+def test_reprise_dans_une_partie_existante(tmp_path):
+    chemin = str(tmp_path / 'parties.rep')
+    sauvegarde = encoder_session(_partie(nom1='Zoé'))
+    game = _partie(journalisation=False)
+    enregistreur = EnregistreurReplay(chemin)
+    game.enregistreur = enregistreur
+    game.demarrer_combat()
+    game.executer_action('attaquer')
+    notifications = []
+    game.abonner(notifications.append)
+    assert decoder_session(sauvegarde, game) is game
+    assert game.joueur1.nom == 'Zoé'
+    assert notifications
+    # La partie en cours d'enregistrement est abandonnée, la reprise n'est pas enregistrée
+    game.executer_action('attaquer')
+    enregistreur.fermer()
+    lecteur = LecteurReplays(chemin)
+    try:
+        replays = list(lecteur)
+    finally:
+        lecteur.fermer()
+    assert [(r.nom1, r.complet, len(r.actions)) for r in replays] == [('Élodie', False, 1)]
+
+
+def test_fichier_sessions(tmp_path):
+    chemin = str(tmp_path / 'sessions.bin')
+    rng = random.Random(6)
+    fichier = FichierSessions(chemin)
+    parties, positions = [], []
+    for nom in ('A', 'B', 'C'):
+        game = _partie(nom1=nom)
+        _jouer(game, rng, 5)
+        parties.append(_vue(game))
+        positions.append(fichier.sauvegarder(game))
+    assert list(fichier) == positions
+    assert [_vue(fichier.charger(p)) for p in positions] == parties
+    fichier.fermer()
+
+    fichier = FichierSessions(chemin)
+    try:
+        game = Game()
+        game.creer_personnage('guerrier', 'D', 1)
+        game.creer_personnage('guerrier', 'E', 2)
+        positions.append(fichier.sauvegarder(game))
+        assert list(fichier) == positions
+        assert _vue(fichier.charger(positions[1])) == parties[1]
+        assert fichier.charger(positions[3]).joueur1.nom == 'D'
+        with pytest.raises(ValueError):
+            fichier.lire(positions[3] + len(fichier.lire(positions[3])))
+        assert len(fichier.lire(positions[0])) == positions[1]
+        assert len(fichier.lire(positions[0])) > _ENTETE.size
+    finally:
+        fichier.fermer()
@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+
+from core.characters import NOMS_CLASSES
+from core.game import Game, ACTIONS
+from core.registre import SPECIAL
+from core.simulation import SimulateurLot, AUCUNE, politique_agressive, simuler_duels
+
+
+def _parties(classes1, classes2):
+    games = []
+    for c1, c2 in zip(classes1, classes2):
+        game = Game(journalisation=False)
+        game.creer_personnage(NOMS_CLASSES[c1], 'A', 1)
+        game.creer_personnage(NOMS_CLASSES[c2], 'B', 2)
+        game.demarrer_combat()
+        games.append(game)
+    return games
+
+
+def test_lot_suit_les_regles_de_game():
+    rng = random.Random(1)
+    n = 200
+    classes1 = np.array([rng.randrange(len(NOMS_CLASSES)) for _ in range(n)])
+    classes2 = np.array([rng.randrange(len(NOMS_CLASSES)) for _ in range(n)])
+    sim = SimulateurLot(classes1, classes2)
+    games = _parties(classes1, classes2)
+
+    for _ in range(150):
+        actions = np.array([rng.randrange(4) for _ in range(n)], dtype=np.int16)
+        actions[sim.termines] = AUCUNE
+        succes = sim.step(actions)
+        for i, game in enumerate(games):
+            if actions[i] == AUCUNE:
+                continue
+            ok, _ = game.executer_action(ACTIONS[actions[i]])
+            assert ok == bool(succes[i])
+            j1, j2 = game.joueur1, game.joueur2
+            assert (j1.pv, j2.pv) == (sim.pv[0, i], sim.pv[1, i])
+            assert (j1.energie, j2.energie) == (sim.energie[0, i], sim.energie[1, i])
+            gagnant = -1 if game.gagnant is None else (0 if game.gagnant is j1 else 1)
+            assert gagnant == sim.gagnant[i]
+            if game.gagnant is None:
+                assert game.get_joueur_actuel() - 1 == sim.joueur[i]
+                assert (j1.is_defending, j2.is_defending) == tuple(sim.is_defending[:, i])
+        if sim.termines.all():
+            break
+    assert sim.termines.any()
+
+
+def test_special_refusee_sans_energie():
+    sim = SimulateurLot('mage', 'archer', 1)
+    sim.energie[0] = 0
+    assert not sim.step(np.array([SPECIAL], dtype=np.int16))[0]
+    assert not sim.joueur[0] and sim.tours[0] == 0
+    assert not sim.actions_valides()[0, SPECIAL]
+
+
+def test_simuler_duels_reproductible():
+    a = simuler_duels('archer', 'mage', 5000, seed=3)
+    b = simuler_duels('archer', 'mage', 5000, seed=3)
+    assert a == b
+    assert a['victoires_j1'] + a['victoires_j2'] + a['nuls'] == 5000
+
+
+def test_taille_de_lot_sans_effet_sur_politique_deterministe():
+    a = simuler_duels('guerrier', 'mage', 3000, politique_agressive, taille_lot=256)
+    b = simuler_duels('guerrier', 'mage', 3000, politique_agressive, taille_lot=3000)
+    assert a == b
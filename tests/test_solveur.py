@@ -0,0 +1,78 @@
+import random
+import struct
+
+import pytest
+
+from core.game import Game
+from core.solveur import TableSolution, ecrire_tables, VERSION
+
+
+@pytest.fixture(scope='module')
+def tables(tmp_path_factory):
+    chemin = str(tmp_path_factory.mktemp('solveur') / 'tables.bin')
+    ecrire_tables(chemin, [('guerrier', 'mage')])
+    table = TableSolution(chemin)
+    yield chemin, table
+    table.fermer()
+
+
+def _partie(classe1, classe2):
+    game = Game(journalisation=False)
+    game.creer_personnage(classe1, 'A', 1)
+    game.creer_personnage(classe2, 'B', 2)
+    game.demarrer_combat()
+    return game
+
+
+@pytest.mark.parametrize('classes', [('guerrier', 'mage'), ('mage', 'guerrier')])
+def test_jeu_parfait_atteint_la_valeur(tables, classes):
+    _, table = tables
+    game = _partie(*classes)
+    valeur, _ = table.consulter_partie(game)
+    coups = 0
+    while game.gagnant is None and coups < 500:
+        _, action = table.consulter_partie(game)
+        assert game.executer_action(action)[0]
+        coups += 1
+    if valeur > 0:
+        assert game.gagnant is game.joueur1 and coups == valeur
+    elif valeur < 0:
+        assert game.gagnant is game.joueur2 and coups == -valeur
+    else:
+        assert game.gagnant is None
+
+
+def test_le_camp_gagnant_bat_un_joueur_aleatoire(tables):
+    _, table = tables
+    rng = random.Random(0)
+    game = _partie('guerrier', 'mage')
+    valeur, _ = table.consulter_partie(game)
+    if valeur == 0:
+        pytest.skip("position initiale nulle")
+    parfait = 1 if valeur > 0 else 2
+    for _ in range(30):
+        game.demarrer_combat()
+        while game.gagnant is None:
+            if game.get_joueur_actuel() == parfait:
+                action = table.consulter_partie(game)[1]
+            else:
+                action = rng.choice(['attaquer', 'special', 'defendre', 'recharger'])
+            game.executer_action(action)
+        assert game.gagnant is (game.joueur1 if parfait == 1 else game.joueur2)
+
+
+def test_tables_d_autres_regles_refusees(tables, tmp_path):
+    chemin, _ = tables
+    with open(chemin, 'rb') as f:
+        donnees = bytearray(f.read())
+    autres_regles = tmp_path / 'autres.bin'
+    magic, version, nb_tables, regles = struct.unpack_from('<8sHHI', donnees)
+    struct.pack_into('<8sHHI', donnees, 0, magic, version, nb_tables, regles ^ 1)
+    autres_regles.write_bytes(bytes(donnees))
+    with pytest.raises(ValueError):
+        TableSolution(str(autres_regles))
+
+    invalide = tmp_path / 'invalide.bin'
+    invalide.write_bytes(struct.pack('<8sHHI', b'PASDUEL!', VERSION, 0, 0))
+    with pytest.raises(ValueError):
+        TableSolution(str(invalide))
@@ -0,0 +1,26 @@
+from core.tournoi import lancer_tournoi, jouer_rencontre, graine_rencontre
+
+PARTICIPANTS = [('guerrier', 'agressif'), ('mage', 'prudent'), ('archer', 'aleatoire'), ('mage', 'aleatoire')]
+
+
+def test_resultats_independants_du_nombre_de_processus():
+    reference = lancer_tournoi(PARTICIPANTS, nb_parties=20, workers=1, seed=7)
+    for workers in (1, 2, 3):
+        assert lancer_tournoi(PARTICIPANTS, nb_parties=20, workers=workers, seed=7) == reference
+
+
+def test_matrices_coherentes():
+    resultats = lancer_tournoi(PARTICIPANTS, nb_parties=10, seed=1)
+    n = len(PARTICIPANTS)
+    for i in range(n):
+        assert resultats['victoires'][i][i] == 0
+        for j in range(i + 1, n):
+            total = resultats['victoires'][i][j] + resultats['victoires'][j][i] + resultats['nuls'][i][j]
+            assert total == 10
+            assert resultats['tours'][i][j] == resultats['tours'][j][i] > 0
+
+
+def test_graine_et_rencontre_deterministes():
+    assert graine_rencontre(0, 3) == graine_rencontre(0, 3) != graine_rencontre(1, 3)
+    spec = (0, graine_rencontre(0, 0), 10, 200, 'archer', 'aleatoire', 'mage', 'aleatoire', None)
+    assert jouer_rencontre(spec) == jouer_rencontre(spec)
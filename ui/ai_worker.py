@@ -0,0 +1,69 @@
+import queue
+import threading
+from core.etat import cle_position
+from core.ia import IA
+
+class AIWorker:
+    def __init__(self, niveau='normal'):
+        """
+        Calcule les coups de l'IA dans un thread séparé de la boucle Tk
+        Les demandes et les réponses passent par deux files thread-safe ; la
+        fenêtre relève les réponses périodiquement avec poll().
+        Args:
+            niveau (str): Difficulté de l'IA
+        """
+        self.ia = IA(niveau)
+        self.requetes = queue.Queue()
+        self.resultats = queue.Queue()
+        self._reponses = {}  # Coups préparés pendant que le joueur réfléchit
+        self._thread = threading.Thread(target=self._boucle, daemon=True)
+        self._thread.start()
+
+    def request_move(self, numero, classes, etat):
+        """
+        Demande le coup de l'IA pour un instantané de la partie
+        Args:
+            numero (int): Identifiant de la demande, renvoyé avec la réponse
+            classes, etat: Instantané produit par IA.etat_partie
+        """
+        self.requetes.put(('jouer', numero, classes, etat))
+
+    def ponder(self, classes, etat):
+        """Prépare les réponses aux coups possibles du joueur humain"""
+        self.requetes.put(('anticiper', None, classes, etat))
+
+    def poll(self):
+        """
+        Relève une réponse sans bloquer
+        Returns:
+            tuple|None: (numero, identifiant d'action) ou None si rien n'est prêt
+        """
+        try:
+            return self.resultats.get_nowait()
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        """Arrête le thread après la demande en cours"""
+        self.requetes.put(None)
+
+    def _boucle(self):
+        """Traite les demandes dans l'ordre, une demande de coup interrompt l'anticipation"""
+        while True:
+            requete = self.requetes.get()
+            if requete is None:
+                return
+            genre, numero, classes, etat = requete
+            if genre == 'jouer':
+                action = self._reponses.get((classes, cle_position(*etat)))
+                if action is None:
+                    action = self.ia.rechercher(classes, etat)
+                self._reponses.clear()
+                self.resultats.put((numero, action))
+                continue
+
+            self._reponses.clear()
+            for cle, action in self.ia.anticiper(classes, etat):
+                self._reponses[classes, cle] = action
+                if not self.requetes.empty():
+                    break
@@ -1,8 +1,18 @@
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
-from core.game import Game
+from core import instrumentation
+from core.characters import CLASSES
+from core.chronologie import Chronologie
+from core.game import Game, ACTIONS
+from core.ia import IA
+from .ai_worker import AIWorker
 from .combat_log import CombatLog
 
+AI_MIN_DELAY_MS = 1000  # Délai minimal avant d'afficher le coup de l'IA
+AI_POLL_MS = 20  # Intervalle de relève des réponses du thread de l'IA
+LIBELLES_CLASSES = [classe.definition['libelle'] for classe in CLASSES]
+
 class DuelApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -11,6 +21,12 @@ class DuelApp(tk.Tk):
         self.resizable(False, False)
         
         self.game = Game()
+        self.game.chronologie = Chronologie()
+        self.game.abonner(self.update_combat_display)
+        self.ai_worker = AIWorker(self.game.niveau_ia)
+        self.ai_request = 0  # Identifiant de la dernière demande faite à l'IA
+        self.ai_poll = None  # Identifiant after de la prochaine relève de l'IA
+        self.ai_started = 0.0
         self.create_widgets()
         self.show_character_selection()
 
@@ -27,14 +43,14 @@ class DuelApp(tk.Tk):
         ttk.Label(self.selection_frame, text="Joueur 1").grid(row=0, column=0)
         self.p1_name = ttk.Entry(self.selection_frame)
         self.p1_name.grid(row=1, column=0)
-        self.p1_class = ttk.Combobox(self.selection_frame, values=["Guerrier", "Mage", "Archer"])
+        self.p1_class = ttk.Combobox(self.selection_frame, values=LIBELLES_CLASSES)
         self.p1_class.grid(row=2, column=0)
         self.p1_class.current(0)
         
         ttk.Label(self.selection_frame, text="Joueur 2").grid(row=0, column=1)
         self.p2_name = ttk.Entry(self.selection_frame)
         self.p2_name.grid(row=1, column=1)
-        self.p2_class = ttk.Combobox(self.selection_frame, values=["Guerrier", "Mage", "Archer"])
+        self.p2_class = ttk.Combobox(self.selection_frame, values=LIBELLES_CLASSES)
         self.p2_class.grid(row=2, column=1)
         self.p2_class.current(1)
         
@@ -64,19 +80,21 @@ class DuelApp(tk.Tk):
         
         self.back_btn = ttk.Button(self.combat_frame, text="Nouveau duel", command=self.show_character_selection)
         self.back_btn.grid(row=3, column=0, columnspan=2)
+        self.undo_btn = ttk.Button(self.combat_frame, text="Annuler le coup", command=self.undo_turn)
+        self.undo_btn.grid(row=4, column=0, columnspan=2)
 
         # Journal de combat
         self.log = CombatLog(self)
         self.log.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
 
     def show_character_selection(self):
+        self.cancel_ai_request()
         self.combat_frame.grid_remove()
         self.selection_frame.grid(row=0, column=0, sticky="nsew")
 
     def show_combat_interface(self):
         self.selection_frame.grid_remove()
         self.combat_frame.grid(row=0, column=0, sticky="nsew")
-        self.update_combat_display()
 
     def start_duel(self):
         p1_name = self.p1_name.get().strip() or "Joueur 1"
@@ -94,8 +112,9 @@ class DuelApp(tk.Tk):
             messagebox.showerror("Erreur", "Impossible de démarrer le combat")
             return
             
-        self.log.clear()
+        self.cancel_ai_request()
         self.show_combat_interface()
+        self.ai_worker.ponder(*IA.etat_partie(self.game))
 
     def execute_action(self, action):
         """Gère une action du joueur puis lance le tour de l'IA"""
@@ -105,48 +124,118 @@ class DuelApp(tk.Tk):
             messagebox.showwarning("Action impossible", "Cette action n'est pas disponible maintenant")
             return
             
-        self.update_combat_display()
-        
         if is_finished:
             self.disable_actions()
             messagebox.showinfo("Combat terminé", f"{self.game.gagnant.nom} a gagné !")
         else:
-            # Lancer le tour de l'IA après un délai
-            self.after(1000, self.execute_ia_turn)
+            # Le coup de l'IA est calculé hors de la boucle Tk
+            self.request_ai_turn()
+
+    def undo_turn(self):
+        """Revient au dernier tour du joueur, avant son coup et la réponse de l'IA"""
+        with self.game.notifications_groupees():
+            if not self.game.annuler():
+                return
+            while self.game.get_joueur_actuel() != 1 and self.game.annuler():
+                pass
+        self.cancel_ai_request()
+        if self.game.get_joueur_actuel() == 1:
+            self.ai_worker.ponder(*IA.etat_partie(self.game))
+        else:
+            self.request_ai_turn()  # Début du combat avec l'IA au trait
+
+    def cancel_ai_request(self):
+        """Ignore la réponse de l'IA encore en cours et arrête sa relève"""
+        self.ai_request += 1
+        if self.ai_poll is not None:
+            self.after_cancel(self.ai_poll)
+            self.ai_poll = None
+
+    def request_ai_turn(self):
+        """Envoie l'état de la partie au thread de l'IA et attend sa réponse"""
+        self.cancel_ai_request()
+        self.ai_started = time.monotonic()
+        self.ai_worker.request_move(self.ai_request, *IA.etat_partie(self.game))
+        self.ai_poll = self.after(AI_POLL_MS, self.poll_ai_turn, self.ai_request)
 
-    def execute_ia_turn(self):
+    def poll_ai_turn(self, numero):
+        """Relève la réponse de l'IA ; le coup est affiché après le délai minimal"""
+        if numero != self.ai_request:
+            return  # Demande abandonnée : la relève s'arrête
+        self.ai_poll = None
+        result = self.ai_worker.poll()
+        while result is not None and result[0] != numero:
+            result = self.ai_worker.poll()  # Réponse d'un duel abandonné
+        if result is None:
+            self.ai_poll = self.after(AI_POLL_MS, self.poll_ai_turn, numero)
+            return
+        action = result[1]
+        elapsed_ms = int((time.monotonic() - self.ai_started) * 1000)
+        self.after(max(0, AI_MIN_DELAY_MS - elapsed_ms), lambda: self.execute_ia_turn(numero, action))
+
+    def execute_ia_turn(self, numero, action):
         """Exécute le tour de l'IA et met à jour l'interface"""
-        success, is_finished = self.game.executer_action_ia()
-        self.update_combat_display()
+        if numero != self.ai_request:
+            return
+        success, is_finished = self.game.executer_action(ACTIONS[action])
         
         if is_finished:
             self.disable_actions()
             messagebox.showinfo("Combat terminé", f"{self.game.gagnant.nom} a gagné !")
+        else:
+            # Prépare les réponses pendant que le joueur choisit son action
+            self.ai_worker.ponder(*IA.etat_partie(self.game))
+
+    def update_combat_display(self, changements):
+        """Observateur de la partie : ne redessine que les widgets concernés par les changements"""
+        mesures = instrumentation.mesures
+        if mesures is not None:
+            self._update_combat_display_mesure(changements, mesures)
+            return
+        self._update_widgets(changements, self._journal_entries(changements))
+
+    def _update_combat_display_mesure(self, changements, mesures):
+        """update_combat_display quand l'instrumentation est active : durées du journal et de Tk"""
+        debut = mesures.horloge()
+        entrees = self._journal_entries(changements)
+        mesures.duree('historique', debut)
+        debut = mesures.horloge()
+        self._update_widgets(changements, entrees)
+        mesures.duree('tk', debut)
+
+    def _journal_entries(self, changements):
+        """Met en forme les seuls nouveaux événements du journal"""
+        if 'journal' not in changements:
+            return None
+        if changements['journal'] == 0:
+            self.log.clear()
+        journal = self.game.journal
+        return [
+            (journal.rendre(e), CombatLog.tags_evenement(e))
+            for e in journal.evenements(changements['journal'])
+        ]
+
+    def _update_widgets(self, changements, entrees):
+        """Redessine les stats, le journal, les boutons et le label de tour concernés"""
+        game = self.game
 
-    def update_combat_display(self):
-        state = self.game.get_etat_combat()
-        
         # Mise à jour des stats
-        self.p1_stats.config(text=f"{state['joueur1']['nom']}\nPV: {state['joueur1']['pv']}\nÉnergie: {state['joueur1']['energie']}")
-        self.p2_stats.config(text=f"{state['joueur2']['nom']}\nPV: {state['joueur2']['pv']}\nÉnergie: {state['joueur2']['energie']}")
-        
-        # Mise à jour du journal
-        for msg in state['historique']:
-            self.log.add_message(msg)
-        
+        for numero, joueur, label in ((1, game.joueur1, self.p1_stats), (2, game.joueur2, self.p2_stats)):
+            if f'pv{numero}' in changements or f'energie{numero}' in changements:
+                label.config(text=f"{joueur.nom}\nPV: {joueur.pv}\nÉnergie: {joueur.energie}")
+        if entrees:
+            self.log.add_messages(entrees)
+
         # Gestion des boutons et label de tour
-        current_turn = state['tour']
-        is_player_turn = (current_turn == 1)
-        
-        self.attack_btn.state(["!disabled" if is_player_turn else "disabled"])
-        self.special_btn.state(["!disabled" if is_player_turn else "disabled"])
-        self.defend_btn.state(["!disabled" if is_player_turn else "disabled"])
-        self.recharge_btn.state(["!disabled" if is_player_turn else "disabled"])
-        
-        if current_turn == 1:
-            self.tour_label.config(text=f"À vous de jouer !", foreground="green")
-        else:
-            self.tour_label.config(text=f"L'IA réfléchit...", foreground="red")
+        if 'tour' in changements or 'gagnant' in changements:
+            is_player_turn = game.get_joueur_actuel() == 1 and game.gagnant is None
+            for btn in (self.attack_btn, self.special_btn, self.defend_btn, self.recharge_btn):
+                btn.state(["!disabled" if is_player_turn else "disabled"])
+        if 'tour' in changements:
+            if changements['tour'] == 1:
+                self.tour_label.config(text=f"À vous de jouer !", foreground="green")
+            else:
+                self.tour_label.config(text=f"L'IA réfléchit...", foreground="red")
 
     def disable_actions(self):
         for btn in [self.attack_btn, self.special_btn, self.defend_btn, self.recharge_btn]:
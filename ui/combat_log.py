@@ -1,15 +1,28 @@
 import tkinter as tk
 from tkinter import scrolledtext, font as tkfont
+from core import journal as evt
+
+# Tags d'affichage par type d'événement du journal
+_TAGS_EVENEMENT = {
+    evt.ATTAQUE: ('damage',),
+    evt.SPECIALE: ('special',),
+    evt.CRITIQUE: ('special',),
+    evt.ECHEC: ('warning',),
+    evt.ETOURDISSEMENT: ('warning',),
+}
 
 class CombatLog(tk.Frame):
-    def __init__(self, master, **kwargs):
+    def __init__(self, master, max_lignes=1000, **kwargs):
         """
         Widget personnalisé pour afficher le journal de combat
         Args:
             master: Widget parent
+            max_lignes (int): Nombre de lignes conservées, les plus anciennes sont effacées
             **kwargs: Arguments supplémentaires pour Frame
         """
         super().__init__(master, **kwargs)
+        self.max_lignes = max_lignes
+        self._nb_lignes = 0
         self.configure(bg='#333')
         
         # Configuration de la grille
@@ -51,9 +64,51 @@ class CombatLog(tk.Frame):
         tags = self._detect_tags(message)
         
         self.text_area.insert(tk.END, message + "\n", tags)
+        self._nb_lignes += 1
+        self._limiter()
+        self.text_area.see(tk.END)  # Auto-scroll
+        self.text_area.configure(state='disabled')
+
+    def add_messages(self, entrees):
+        """
+        Ajoute plusieurs messages en un seul appel à Text.insert
+        Args:
+            entrees (list): Couples (message, tags) à afficher dans l'ordre
+        """
+        if not entrees:
+            return
+        args = []
+        for message, tags in entrees:
+            args.append(message + "\n")
+            args.append(tags)
+        self.text_area.configure(state='normal')
+        self.text_area.insert(tk.END, *args)
+        self._nb_lignes += len(entrees)
+        self._limiter()
         self.text_area.see(tk.END)  # Auto-scroll
         self.text_area.configure(state='disabled')
 
+    def _limiter(self):
+        """Efface les lignes les plus anciennes au-delà de max_lignes"""
+        excedent = self._nb_lignes - self.max_lignes
+        if excedent > 0:
+            self.text_area.delete(1.0, f"{excedent + 1}.0")
+            self._nb_lignes = self.max_lignes
+
+    @staticmethod
+    def tags_evenement(evenement):
+        """
+        Tags d'affichage d'un événement du journal structuré
+        Args:
+            evenement (EvenementCombat): Événement à afficher
+        Returns:
+            tuple: Tags à appliquer
+        """
+        if evenement.type in _TAGS_EVENEMENT:
+            joueur = 'player1' if evenement.acteur == 1 else 'player2'
+            return (joueur,) + _TAGS_EVENEMENT[evenement.type]
+        return ('system',)
+
     def _detect_tags(self, message):
         """
         Détecte les tags appropriés en fonction du contenu du message
@@ -88,6 +143,7 @@ class CombatLog(tk.Frame):
         """Efface tout le contenu du journal"""
         self.text_area.configure(state='normal')
         self.text_area.delete(1.0, tk.END)
+        self._nb_lignes = 0
         self.text_area.configure(state='disabled')
 
     def get_content(self):